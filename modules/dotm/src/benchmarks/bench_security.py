@@ -0,0 +1,171 @@
+"""Secret-scanner benchmarks over a synthetic dotfiles corpus.
+
+Run from modules/dotm/src:
+
+    python -m benchmarks.bench_security                    # compare with baseline.json
+    python -m benchmarks.bench_security --update-baseline  # record a new baseline
+
+Each benchmark runs against a cold scan cache. Throughput is the best of
+--repeat runs; peak memory is measured in one extra run under tracemalloc,
+so it covers this process only (not pool workers or mmap'd pages).
+Numbers depend on the machine: refresh the baseline on the machine that
+compares against it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from rich.console import Console
+from rich.table import Table
+
+from benchmarks.corpus import DEFAULT_SPEC, commit_and_modify, generate_corpus
+from dotm import config, scancache
+from dotm.security import scan_changed_files, scan_diff, scan_file, scan_module, scan_repo
+
+console = Console()
+
+BASELINE_FILE = Path(__file__).with_name("baseline.json")
+
+# Allowed slowdown / memory growth relative to the baseline before failing
+DEFAULT_TOLERANCE = 0.25
+
+
+def _cold_cache(cache_dir: Path) -> None:
+    """Point the scan cache at an empty file and drop in-process state."""
+    scancache.SCAN_CACHE = cache_dir / "scan-cache.json"
+    scancache.SCAN_CACHE.unlink(missing_ok=True)
+    scancache.invalidate()
+
+
+def _measure(run, cache_dir: Path, repeat: int) -> tuple[float, int]:
+    """Return (best wall seconds, peak traced bytes) for run()."""
+    best = float("inf")
+    for _ in range(repeat):
+        _cold_cache(cache_dir)
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    _cold_cache(cache_dir)
+    tracemalloc.start()
+    run()
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def run_benchmarks(spec: dict, *, repeat: int = 3, jobs: int = 1) -> dict:
+    """Generate the corpus in a temp dir and time each scanner entry point."""
+    workdir = Path(tempfile.mkdtemp(prefix="dotm-bench-"))
+    # Defaults only: a user's scan settings must not skew the numbers
+    config.CONFIG_FILE = workdir / "config.yml"
+    try:
+        repo = workdir / "repo"
+        manifest = generate_corpus(repo, spec)
+        sizes = {p: p.stat().st_size for p in manifest["text_files"]}
+        changed = commit_and_modify(repo, spec, manifest)
+        modules = sorted(p for p in (repo / "modules").iterdir() if p.is_dir())
+        files = sorted(p for mod in modules for p in mod.rglob("*") if p.is_file())
+        total_bytes = sum(p.stat().st_size for p in files)
+        changed_bytes = sum(p.stat().st_size for p in changed)
+        # scan_diff reads only the appended lines, so its throughput is over those
+        added_bytes = sum(p.stat().st_size - sizes[p] for p in changed)
+
+        cases = {
+            "scan_file": (lambda: [scan_file(f, use_cache=False) for f in files], len(files), total_bytes),
+            "scan_module": (lambda: [scan_module(m, jobs=1) for m in modules], len(files), total_bytes),
+            "scan_repo": (lambda: scan_repo(repo, jobs=jobs), len(files), total_bytes),
+            "scan_changed_files": (lambda: scan_changed_files(repo, jobs=jobs), len(changed), changed_bytes),
+            "scan_diff": (lambda: scan_diff(repo, jobs=jobs), len(changed), added_bytes),
+        }
+        results = {}
+        for name, (run, n_files, n_bytes) in cases.items():
+            seconds, peak = _measure(run, workdir, repeat)
+            results[name] = {
+                "seconds": round(seconds, 4),
+                "files_per_s": round(n_files / seconds, 1),
+                "mb_per_s": round(n_bytes / seconds / 1e6, 2),
+                "peak_kb": peak // 1024,
+            }
+        return {
+            "spec": spec,
+            "corpus": {"files": len(files), "bytes": total_bytes, "binary_files": manifest["binary_files"],
+                       "secrets": manifest["secrets"], "changed_files": len(changed)},
+            "results": results,
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def compare(current: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> list[str]:
+    """Return regressions: throughput below or peak memory above baseline by more than tolerance."""
+    regressions = []
+    for name, now in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if before is None:
+            continue
+        if now["mb_per_s"] < before["mb_per_s"] * (1 - tolerance):
+            regressions.append(f"{name}: {now['mb_per_s']} MB/s vs baseline {before['mb_per_s']} MB/s")
+        if now["peak_kb"] > before["peak_kb"] * (1 + tolerance) + 64:
+            regressions.append(f"{name}: peak {now['peak_kb']} KiB vs baseline {before['peak_kb']} KiB")
+    return regressions
+
+
+def print_results(current: dict, baseline: dict | None) -> None:
+    """Print a results table, with baseline figures alongside when available."""
+    corpus = current["corpus"]
+    console.print(f"[bold]Corpus:[/bold] {corpus['files']} files, {corpus['bytes'] / 1e6:.1f} MB, "
+                  f"{corpus['binary_files']} binary, {corpus['secrets']} planted secrets, "
+                  f"{corpus['changed_files']} changed")
+    table = Table()
+    for column in ("benchmark", "seconds", "files/s", "MB/s", "peak KiB", "baseline MB/s"):
+        table.add_column(column, justify="left" if column == "benchmark" else "right")
+    for name, r in current["results"].items():
+        before = (baseline or {}).get("results", {}).get(name)
+        table.add_row(name, f"{r['seconds']:.3f}", f"{r['files_per_s']:.0f}", f"{r['mb_per_s']:.2f}",
+                      str(r["peak_kb"]), f"{before['mb_per_s']:.2f}" if before else "-")
+    console.print(table)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes for scan_repo/scan_changed_files/scan_diff")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--update-baseline", action="store_true")
+    for key, default in DEFAULT_SPEC.items():
+        parser.add_argument(f"--{key.replace('_', '-')}", type=type(default), default=default)
+    args = parser.parse_args(argv)
+
+    spec = {key: getattr(args, key) for key in DEFAULT_SPEC}
+    current = run_benchmarks(spec, repeat=args.repeat, jobs=args.jobs)
+
+    if args.update_baseline:
+        BASELINE_FILE.write_text(json.dumps(current, indent=2) + "\n")
+        print_results(current, None)
+        console.print(f"[green]Baseline written to {BASELINE_FILE.name}[/green]")
+        return 0
+
+    baseline = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else None
+    print_results(current, baseline)
+    if baseline is None:
+        console.print("[yellow]No baseline yet; run with --update-baseline.[/yellow]")
+        return 0
+    if baseline.get("spec") != spec:
+        console.print("[yellow]Corpus spec differs from the baseline's; not comparing.[/yellow]")
+        return 0
+    regressions = compare(current, baseline, args.tolerance)
+    for line in regressions:
+        console.print(f"[red]Regression:[/red] {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
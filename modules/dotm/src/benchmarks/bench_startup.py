@@ -0,0 +1,117 @@
+"""Cold-start benchmark for the dotm CLI.
+
+Run from modules/dotm/src:
+
+    python -m benchmarks.bench_startup             # check against TARGETS_MS
+    python -m benchmarks.bench_startup --imports   # also show the slowest imports
+
+Each command runs in a fresh interpreter with HOME pointing at a temp dir
+holding a small generated dotfiles repo. One untimed run first warms the
+module index and bytecode caches, so `status` is measured on a cached index.
+The "floor" line is a bare `import click` in the same interpreter: the part
+of every command's cost dotm cannot remove. On slower machines scale the
+targets with --scale rather than editing them.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.corpus import DEFAULT_SPEC, generate_corpus
+
+# Median wall-clock budget per command, in milliseconds. `status` prints
+# through rich, whose import alone costs about 35 ms on top of click.
+TARGETS_MS = {
+    "--version": 80,
+    "status --help": 80,
+    "status": 120,
+}
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+
+
+def _setup_home(root: Path, modules: int) -> dict:
+    """Create HOME with a dotm config and dotfiles repo; return the subprocess env."""
+    home = root / "home"
+    repo = home / "src" / "dotfiles"
+    generate_corpus(repo, {**DEFAULT_SPEC, "modules": modules, "files_per_module": 2})
+    (repo / "playbooks").mkdir()
+    names = sorted(p.name for p in (repo / "modules").iterdir())
+    (repo / "playbooks" / "profiles.yml").write_text(
+        "---\nbase_modules:\n" + "".join(f"  - {name}\n" for name in names[: len(names) // 2])
+    )
+    env = {**os.environ, "HOME": str(home), "PYTHONPATH": str(SRC_DIR)}
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    return env
+
+
+def _run(args: list[str], env: dict) -> float:
+    """Run `python -m dotm args` once and return wall-clock milliseconds."""
+    return _time([sys.executable, "-m", "dotm", *args], env)
+
+
+def _time(cmd: list[str], env: dict) -> float:
+    """Run cmd once and return wall-clock milliseconds."""
+    start = time.perf_counter()
+    subprocess.run(cmd, env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return (time.perf_counter() - start) * 1000
+
+
+def _slowest_imports(args: list[str], env: dict, top: int = 10) -> list[tuple[int, str]]:
+    """Return the top cumulative import times (microseconds) from -X importtime."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-m", "dotm", *args],
+                            env=env, capture_output=True, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self, cumulative, name = line.removeprefix("import time:").split("|")
+        rows.append((int(cumulative), name.rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--modules", type=int, default=60)
+    parser.add_argument("--imports", action="store_true", help="Show the slowest imports per command")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every target by this factor")
+    args = parser.parse_args(argv)
+
+    root = Path(tempfile.mkdtemp(prefix="dotm-startup-"))
+    try:
+        env = _setup_home(root, args.modules)
+        over = []
+        floor = [_time([sys.executable, "-c", "import click"], env) for _ in range(args.runs)]
+        print(f"{'command':<16}{'median ms':>10}{'min ms':>9}{'target':>8}")
+        print(f"{'(floor)':<16}{statistics.median(floor):>10.1f}{min(floor):>9.1f}{'-':>8}")
+        for command, target in TARGETS_MS.items():
+            target = round(target * args.scale)
+            cmd = command.split()
+            _run(cmd, env)  # warm caches
+            times = [_run(cmd, env) for _ in range(args.runs)]
+            median = statistics.median(times)
+            print(f"{command:<16}{median:>10.1f}{min(times):>9.1f}{target:>8}")
+            if median > target:
+                over.append(command)
+            if args.imports:
+                for cumulative, name in _slowest_imports(cmd, env):
+                    print(f"    {cumulative / 1000:8.1f} ms  {name.strip()}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    for command in over:
+        print(f"Over target: dotm {command}")
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""Reproducible synthetic dotfiles tree for scanner benchmarks."""
+
+from __future__ import annotations
+
+import random
+import string
+import subprocess
+from pathlib import Path
+
+# Everyday config lines; several contain prefilter keywords without being secrets
+FILLER_LINES = (
+    "export PATH=\"$HOME/.local/bin:$PATH\"",
+    "alias ll='ls -la'",
+    "set -g mouse on",
+    "bind r source-file ~/.tmux.conf",
+    "[user]",
+    "  name = Example User",
+    "  email = user@example.com",
+    "# password prompt is handled by the keychain helper",
+    "auth_method = keychain",
+    "api_version = 2",
+    "access_log = /var/log/access.log",
+    "setopt HIST_IGNORE_ALL_DUPS",
+    "zstyle ':completion:*' menu select",
+    "defaults write com.apple.dock autohide -bool true",
+    "    \"editor.fontSize\": 13,",
+    "if [ -f ~/.bashrc ]; then . ~/.bashrc; fi",
+)
+
+TEXT_SUFFIXES = (".conf", ".sh", ".zsh", ".toml", ".json", ".yml", ".md", "")
+
+# Shape of a generated corpus; the same spec always yields the same tree
+DEFAULT_SPEC = {
+    "modules": 40,
+    "files_per_module": 25,
+    "file_bytes": 4096,
+    "binary_ratio": 0.05,
+    "secret_density": 0.002,
+    "changed_ratio": 0.1,
+    "seed": 1234,
+}
+
+
+def _token(rng: random.Random, length: int, alphabet: str = string.ascii_letters + string.digits) -> str:
+    return "".join(rng.choice(alphabet) for _ in range(length))
+
+
+def secret_line(rng: random.Random) -> str:
+    """Return one line that a secret pattern matches."""
+    kind = rng.randrange(6)
+    if kind == 0:
+        return f"aws_access_key_id = AKIA{_token(rng, 16, string.ascii_uppercase + string.digits)}"
+    if kind == 1:
+        return f"export GITHUB_TOKEN=ghp_{_token(rng, 36)}"
+    if kind == 2:
+        return f"password = \"{_token(rng, 14)}\""
+    if kind == 3:
+        return f"api_key: {_token(rng, 32)}"
+    if kind == 4:
+        return f"Authorization: Bearer {_token(rng, 40)}"
+    return f"SLACK_TOKEN=xoxb-{_token(rng, 24)}"
+
+
+def _text_body(rng: random.Random, size: int, density: float) -> tuple[str, int]:
+    """Build roughly size bytes of config-like text; returns (text, secrets planted)."""
+    lines = []
+    total = secrets = 0
+    while total < size:
+        if rng.random() < density:
+            line = secret_line(rng)
+            secrets += 1
+        else:
+            line = rng.choice(FILLER_LINES)
+        lines.append(line)
+        total += len(line) + 1
+    return "\n".join(lines) + "\n", secrets
+
+
+def generate_corpus(root: Path, spec: dict) -> dict:
+    """Write a dotfiles repo with spec["modules"] modules under root/modules.
+
+    Returns a manifest with file, byte, binary and planted-secret counts.
+    """
+    rng = random.Random(spec["seed"])
+    modules_dir = root / "modules"
+    manifest = {"files": 0, "bytes": 0, "binary_files": 0, "secrets": 0, "text_files": []}
+    for m in range(spec["modules"]):
+        mod_dir = modules_dir / f"mod{m:03d}"
+        (mod_dir / "files").mkdir(parents=True)
+        (mod_dir / "config.yml").write_text(f"---\nhomebrew_packages:\n  - pkg{m}\nstow_dirs:\n  - mod{m:03d}\n")
+        for i in range(spec["files_per_module"]):
+            depth = rng.randrange(3)
+            parent = mod_dir / "files" / Path(*[f"d{rng.randrange(4)}" for _ in range(depth)])
+            parent.mkdir(parents=True, exist_ok=True)
+            size = rng.randint(spec["file_bytes"] // 2, spec["file_bytes"] * 3 // 2)
+            if rng.random() < spec["binary_ratio"]:
+                path = parent / f"blob{i}.dat"
+                data = rng.randbytes(size) + b"\0"
+                path.write_bytes(data)
+                manifest["binary_files"] += 1
+            else:
+                path = parent / f"file{i}{rng.choice(TEXT_SUFFIXES)}"
+                text, planted = _text_body(rng, size, spec["secret_density"])
+                path.write_text(text)
+                data = text.encode()
+                manifest["secrets"] += planted
+                manifest["text_files"].append(path)
+            manifest["files"] += 1
+            manifest["bytes"] += len(data)
+    return manifest
+
+
+def _git(root: Path, *args: str) -> None:
+    subprocess.run(["git", *args], cwd=root, check=True, capture_output=True)
+
+
+def commit_and_modify(root: Path, spec: dict, manifest: dict) -> list[Path]:
+    """Commit the corpus, then append to spec["changed_ratio"] of its text files.
+
+    Returns the modified files, i.e. what scan_changed_files() will see.
+    """
+    _git(root, "init", "-q")
+    _git(root, "add", "-A")
+    _git(root, "-c", "user.name=bench", "-c", "user.email=bench@example.com",
+         "commit", "-q", "-m", "corpus")
+    rng = random.Random(spec["seed"] + 1)
+    text_files = manifest["text_files"]
+    changed = rng.sample(text_files, max(1, int(len(text_files) * spec["changed_ratio"])))
+    for path in changed:
+        text, _planted = _text_body(rng, spec["file_bytes"] // 4, spec["secret_density"])
+        with open(path, "a") as f:
+            f.write(text)
+    return sorted(changed)
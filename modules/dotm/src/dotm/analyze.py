@@ -2,26 +2,24 @@
 
 from __future__ import annotations
 
-import subprocess
+import os
+import threading
+import time
+from collections.abc import Iterator
 from pathlib import Path
 
 from rich.console import Console
 from rich.table import Table
 
+from dotm.config import ANALYSIS_TIMEOUT, get_analyze_settings
+from dotm.inventory import gather_inventory
 from dotm.modules import list_all_modules
+from dotm.targets import managed_sources
 
 console = Console()
 
-
-def _run(cmd: list[str]) -> list[str]:
-    """Run a command and return output lines, empty list on failure."""
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-        if result.returncode != 0:
-            return []
-        return [line.strip() for line in result.stdout.strip().splitlines() if line.strip()]
-    except (FileNotFoundError, subprocess.TimeoutExpired):
-        return []
+# Stop the orphan-symlink walk once this many have been found
+ORPHAN_LIMIT = 50
 
 
 def get_managed_packages() -> set[str]:
@@ -41,7 +39,7 @@ def get_managed_mas() -> set[int]:
 
 def analyze_brew() -> dict:
     """Find unmanaged Homebrew formulae."""
-    installed = set(_run(["brew", "list", "--formula", "-1"]))
+    installed = gather_inventory({"formulae"})["formulae"]
     managed = get_managed_packages()
     unmanaged = sorted(installed - managed)
     return {"installed": len(installed), "managed": len(managed & installed), "unmanaged": unmanaged}
@@ -49,7 +47,7 @@ def analyze_brew() -> dict:
 
 def analyze_cask() -> dict:
     """Find unmanaged Homebrew casks."""
-    installed = set(_run(["brew", "list", "--cask", "-1"]))
+    installed = gather_inventory({"casks"})["casks"]
     managed = get_managed_casks()
     unmanaged = sorted(installed - managed)
     return {"installed": len(installed), "managed": len(managed & installed), "unmanaged": unmanaged}
@@ -57,77 +55,138 @@ def analyze_cask() -> dict:
 
 def analyze_mas() -> dict:
     """Find unmanaged Mac App Store apps."""
-    raw = _run(["mas", "list"])
-    installed = {}
-    for line in raw:
-        parts = line.split(None, 1)
-        if parts:
-            try:
-                app_id = int(parts[0])
-                app_name = parts[1] if len(parts) > 1 else str(app_id)
-                # Strip version info in parentheses
-                if "(" in app_name:
-                    app_name = app_name[:app_name.rfind("(")].strip()
-                installed[app_id] = app_name
-            except ValueError:
-                continue
+    installed = gather_inventory({"mas"})["mas"]
     managed = get_managed_mas()
     unmanaged = {k: v for k, v in installed.items() if k not in managed}
     return {"installed": len(installed), "managed": len(managed & set(installed.keys())), "unmanaged": unmanaged}
 
 
-def analyze_dotfiles() -> dict:
-    """Find dotfiles in ~/ not managed by any module."""
-    home = Path.home()
-    dotmodules = home / ".dotmodules"
-
-    # Collect all managed symlink targets
-    managed_targets: set[Path] = set()
-    if dotmodules.exists():
-        for mod_dir in dotmodules.iterdir():
-            files_dir = mod_dir / "files"
-            if files_dir.exists():
-                for f in files_dir.rglob("*"):
-                    if not f.is_dir():
-                        managed_targets.add(f.resolve())
-
-    # Scan common config locations for orphan symlinks pointing outside dotmodules
-    orphan_symlinks: list[str] = []
-    scan_paths = [
-        home / ".config",
-        home / ".local" / "bin",
-    ]
-    # Also check top-level dotfiles
-    for item in home.iterdir():
-        if item.name.startswith(".") and item.is_symlink():
-            target = item.resolve()
-            if target not in managed_targets and ".dotmodules" not in str(target):
-                orphan_symlinks.append(str(item.relative_to(home)))
-
-    for scan_dir in scan_paths:
-        if not scan_dir.exists():
+def iter_symlinks(root: str, *, max_depth: int, prune: set[str], stats: dict) -> Iterator[os.DirEntry]:
+    """Yield symlinks under root using os.scandir, without following symlinked dirs.
+
+    Directories deeper than max_depth or named in prune are not descended into.
+    stats["visited"] is incremented for every directory entry seen.
+    """
+    stack = [(root, 0)]
+    while stack:
+        path, depth = stack.pop()
+        try:
+            it = os.scandir(path)
+        except OSError:
             continue
-        for item in scan_dir.rglob("*"):
-            if item.is_symlink():
-                target = item.resolve()
-                if target not in managed_targets and ".dotmodules" not in str(target):
-                    orphan_symlinks.append(str(item.relative_to(home)))
+        with it:
+            for entry in it:
+                stats["visited"] += 1
+                if entry.is_symlink():
+                    yield entry
+                elif depth < max_depth and entry.name not in prune and entry.is_dir(follow_symlinks=False):
+                    stack.append((entry.path, depth + 1))
 
-    return {"orphan_symlinks": sorted(orphan_symlinks[:50])}  # Cap at 50
+
+def _is_orphan(link_path: str, managed_targets: set[Path]) -> bool:
+    """Check a symlink via readlink — no full resolution of the target chain."""
+    try:
+        dest = os.readlink(link_path)
+    except OSError:
+        return False
+    dest = os.path.normpath(os.path.join(os.path.dirname(link_path), dest))
+    return ".dotmodules" not in dest and Path(dest) not in managed_targets
+
+
+def analyze_dotfiles(*, limit: int = ORPHAN_LIMIT) -> dict:
+    """Find dotfiles in ~/ not managed by any module.
+
+    Stops at the first orphan beyond `limit`, which only sets "truncated";
+    "visited" reports how many directory entries were examined.
+    """
+    home = Path.home()
+    settings = get_analyze_settings()
+    max_depth = settings["max_depth"]
+    prune = set(settings["prune"])
+    managed_targets = managed_sources()
+
+    stats = {"visited": 0}
+    orphan_symlinks: list[str] = []
+    truncated = False
+
+    def candidates() -> Iterator[os.DirEntry]:
+        # Top-level dotfiles first, then common config locations
+        with os.scandir(home) as it:
+            for entry in it:
+                stats["visited"] += 1
+                if entry.name.startswith(".") and entry.is_symlink():
+                    yield entry
+        for scan_dir in (home / ".config", home / ".local" / "bin"):
+            if scan_dir.is_dir():
+                yield from iter_symlinks(str(scan_dir), max_depth=max_depth, prune=prune, stats=stats)
+
+    for entry in candidates():
+        if _is_orphan(entry.path, managed_targets):
+            if len(orphan_symlinks) >= limit:
+                truncated = True
+                break
+            orphan_symlinks.append(os.path.relpath(entry.path, home))
+
+    return {
+        "orphan_symlinks": sorted(orphan_symlinks),
+        "visited": stats["visited"],
+        "truncated": truncated,
+    }
 
 
 def run_analysis(*, brew: bool = False, cask: bool = False, mas: bool = False,
-                 dotfiles: bool = False, all_: bool = False) -> dict:
-    """Run requested analyses and return combined results."""
-    results = {}
+                 dotfiles: bool = False, all_: bool = False,
+                 timeout: float = ANALYSIS_TIMEOUT) -> dict:
+    """Run requested analyses concurrently and return combined results.
+
+    Each analysis gets `timeout` seconds. One that fails or times out is left
+    out of the results and reported under results["errors"] instead, so the
+    others still come back. Analyses run on daemon threads, so one that
+    timed out does not keep the process alive after it returns.
+    """
+    jobs = {}
     if all_ or brew:
-        results["brew"] = analyze_brew()
+        jobs["brew"] = analyze_brew
     if all_ or cask:
-        results["cask"] = analyze_cask()
+        jobs["cask"] = analyze_cask
     if all_ or mas:
-        results["mas"] = analyze_mas()
+        jobs["mas"] = analyze_mas
     if all_ or dotfiles:
-        results["dotfiles"] = analyze_dotfiles()
+        jobs["dotfiles"] = analyze_dotfiles
+    if not jobs:
+        return {}
+
+    # Warm the shared module snapshot once rather than racing to build it
+    list_all_modules()
+
+    results: dict = {}
+    errors: dict[str, str] = {}
+    outcomes: dict[str, tuple[bool, object]] = {}
+
+    def _run(key, fn):
+        try:
+            outcomes[key] = (True, fn())
+        except Exception as exc:
+            outcomes[key] = (False, exc)
+
+    threads = {key: threading.Thread(target=_run, args=(key, fn), name=f"dotm-analyze-{key}", daemon=True)
+               for key, fn in jobs.items()}
+    for thread in threads.values():
+        thread.start()
+    deadline = time.monotonic() + timeout
+    for key, thread in threads.items():
+        thread.join(max(0.0, deadline - time.monotonic()))
+        if key not in outcomes:
+            errors[key] = f"timed out after {timeout:g}s"
+            continue
+        ok, value = outcomes[key]
+        if ok:
+            results[key] = value
+        else:
+            errors[key] = str(value) or type(value).__name__
+
+    if errors:
+        results["errors"] = errors
     return results
 
 
@@ -176,9 +235,15 @@ def print_analysis(results: dict) -> None:
     if "dotfiles" in results:
         data = results["dotfiles"]
         console.print(f"\n[bold]Dotfiles[/bold]")
+        if "visited" in data:
+            console.print(f"  Scanned {data['visited']} entries")
         if data["orphan_symlinks"]:
-            console.print(f"  Found {len(data['orphan_symlinks'])} orphan symlinks:")
+            more = "+" if data.get("truncated") else ""
+            console.print(f"  Found {len(data['orphan_symlinks'])}{more} orphan symlinks:")
             for s in data["orphan_symlinks"]:
                 console.print(f"    {s}", style="yellow")
         else:
             console.print("  [green]No orphan symlinks found.[/green]")
+
+    for key, error in results.get("errors", {}).items():
+        console.print(f"\n[red]{key} analysis failed:[/red] {error}")
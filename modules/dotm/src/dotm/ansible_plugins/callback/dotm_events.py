@@ -0,0 +1,95 @@
+"""Ansible stdout callback that prints playbook events as JSON lines for dotm.
+
+Loaded by ansible-playbook from this directory (see dotm.playbook); dotm
+itself never imports it.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import time
+
+from ansible.plugins.callback import CallbackBase
+
+DOCUMENTATION = """
+    name: dotm_events
+    type: stdout
+    short_description: JSON-lines playbook events with durations
+    description:
+      - One JSON object per line for every task start, task or loop item
+        result and the final stats, each result timed since the previous
+        event of its task.
+"""
+
+MAX_MSG = 500
+
+
+class CallbackModule(CallbackBase):
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = "stdout"
+    CALLBACK_NAME = "dotm_events"
+
+    def __init__(self):
+        super().__init__()
+        self._mark = time.monotonic()
+
+    def _emit(self, event: str, **data) -> None:
+        sys.stdout.write(json.dumps({"event": event, **data}, default=str) + "\n")
+        sys.stdout.flush()
+
+    def _elapsed(self) -> float:
+        now = time.monotonic()
+        elapsed, self._mark = now - self._mark, now
+        return round(elapsed, 4)
+
+    def _result(self, status: str, result, item=None) -> None:
+        res = result._result
+        data = {
+            "task": result._task.get_name(),
+            "role": result._task._role.get_name() if result._task._role else None,
+            "status": status,
+            "changed": bool(res.get("changed")),
+            "duration": self._elapsed(),
+        }
+        if item is not None:
+            data["item"] = item
+        if status in ("failed", "unreachable"):
+            data["msg"] = str(res.get("msg") or res.get("stderr") or "")[:MAX_MSG]
+        self._emit("result", **data)
+
+    def v2_playbook_on_start(self, playbook):
+        self._mark = time.monotonic()
+        self._emit("playbook_start", playbook=playbook._file_name)
+
+    def v2_playbook_on_task_start(self, task, is_conditional):
+        self._mark = time.monotonic()
+        self._emit("task_start", task=task.get_name(), role=task._role.get_name() if task._role else None)
+
+    def v2_playbook_on_handler_task_start(self, task):
+        self.v2_playbook_on_task_start(task, False)
+
+    def v2_runner_on_ok(self, result):
+        self._result("ok", result)
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self._result("ignored" if ignore_errors else "failed", result)
+
+    def v2_runner_on_skipped(self, result):
+        self._result("skipped", result)
+
+    def v2_runner_on_unreachable(self, result):
+        self._result("unreachable", result)
+
+    def v2_runner_item_on_ok(self, result):
+        self._result("ok", result, self._get_item_label(result._result))
+
+    def v2_runner_item_on_failed(self, result):
+        self._result("failed", result, self._get_item_label(result._result))
+
+    def v2_runner_item_on_skipped(self, result):
+        self._result("skipped", result, self._get_item_label(result._result))
+
+    def v2_playbook_on_stats(self, stats):
+        hosts = {host: stats.summarize(host) for host in sorted(stats.processed)}
+        self._emit("stats", hosts=hosts)
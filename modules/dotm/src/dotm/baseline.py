@@ -0,0 +1,70 @@
+"""Committed allowlist of known secret-scan findings, matched by fingerprint."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from collections.abc import Callable
+from pathlib import Path
+
+# Lives at the dotfiles repo root and is committed alongside the modules
+BASELINE_NAME = ".dotm-baseline.json"
+BASELINE_VERSION = 1
+
+
+def baseline_path(repo_path: Path) -> Path:
+    """Return the baseline file for a dotfiles repo."""
+    return repo_path / BASELINE_NAME
+
+
+def fingerprint(rel_path: str, pattern_name: str, text: str) -> str:
+    """Identify a finding by file, pattern and whitespace-normalised line.
+
+    The line number is left out so a known finding stays suppressed when
+    unrelated edits move it up or down the file.
+    """
+    normalised = " ".join(text.split())
+    material = "\0".join((rel_path, pattern_name, normalised))
+    return hashlib.sha256(material.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def finding_fingerprint(finding: tuple[Path, int, str, str], repo_path: Path) -> str:
+    """Fingerprint a (file, line, pattern, text) finding relative to repo_path."""
+    filepath, _line_num, pattern_name, text = finding
+    try:
+        rel = filepath.relative_to(repo_path).as_posix()
+    except ValueError:
+        rel = filepath.as_posix()
+    return fingerprint(rel, pattern_name, text)
+
+
+def load_baseline(repo_path: Path) -> set[str]:
+    """Load the fingerprint set; empty if missing or unreadable."""
+    try:
+        with open(baseline_path(repo_path)) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return set()
+    if not isinstance(data, dict) or data.get("version") != BASELINE_VERSION:
+        return set()
+    return set(data.get("fingerprints", []))
+
+
+def write_baseline(repo_path: Path, findings: list[tuple[Path, int, str, str]]) -> int:
+    """Replace the baseline with the given findings. Returns the fingerprint count."""
+    fingerprints = sorted({finding_fingerprint(f, repo_path) for f in findings})
+    path = baseline_path(repo_path)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump({"version": BASELINE_VERSION, "fingerprints": fingerprints}, f, indent=2)
+        f.write("\n")
+    os.replace(tmp, path)
+    return len(fingerprints)
+
+
+def new_findings_filter(repo_path: Path, known: set[str] | None = None) -> Callable[[tuple], bool]:
+    """Return a predicate that is True for findings not in the baseline."""
+    if known is None:
+        known = load_baseline(repo_path)
+    return lambda finding: finding_fingerprint(finding, repo_path) not in known
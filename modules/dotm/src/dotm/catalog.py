@@ -44,10 +44,29 @@ def suggest_groups(unmanaged: list[str]) -> dict[str, list[str]]:
 
 
 def run_catalog(dry_run: bool = False) -> None:
-    """Analyze unmanaged packages and create modules for them."""
+    """Analyze unmanaged packages and create modules for them.
+
+    New modules are added to profiles.yml in one batched write at the end.
+    """
     results = run_analysis(brew=True, cask=True, mas=True)
     created = []
+    try:
+        _catalog_results(results, created, dry_run)
+    finally:
+        # Also record modules created before an interrupted prompt
+        if created:
+            add_to_deploy(*created)
+
+    if dry_run:
+        console.print("\n[dim]Dry run — no modules created.[/dim]")
+    elif created:
+        console.print(f"\n[green]Created {len(created)} modules: {', '.join(created)}[/green]")
+    else:
+        console.print("\n[dim]No modules created.[/dim]")
 
+
+def _catalog_results(results: dict, created: list[str], dry_run: bool) -> None:
+    """Offer modules for each unmanaged package group, appending created names."""
     # Process formulae
     if "brew" in results and results["brew"]["unmanaged"]:
         groups = suggest_groups(results["brew"]["unmanaged"])
@@ -67,7 +86,6 @@ def run_catalog(dry_run: bool = False) -> None:
                         if scan_result:
                             console.print(f"  [red]Security warning:[/red] {scan_result}")
                         else:
-                            add_to_deploy(group_name)
                             created.append(group_name)
                             console.print(f"  [green]Created module '{group_name}'[/green]")
                     except FileExistsError:
@@ -83,7 +101,6 @@ def run_catalog(dry_run: bool = False) -> None:
                 if Confirm.ask(f"Create module [cyan]{cask}[/cyan]?"):
                     try:
                         create_module(cask, homebrew_casks=[cask])
-                        add_to_deploy(cask)
                         created.append(cask)
                         console.print(f"  [green]Created module '{cask}'[/green]")
                     except FileExistsError:
@@ -94,10 +111,3 @@ def run_catalog(dry_run: bool = False) -> None:
         console.print(f"\n[bold]Unmanaged MAS apps:[/bold]")
         for app_id, app_name in results["mas"]["unmanaged"].items():
             console.print(f"  [yellow]{app_name}[/yellow] ({app_id})")
-
-    if dry_run:
-        console.print("\n[dim]Dry run — no modules created.[/dim]")
-    elif created:
-        console.print(f"\n[green]Created {len(created)} modules: {', '.join(created)}[/green]")
-    else:
-        console.print("\n[dim]No modules created.[/dim]")
@@ -5,20 +5,46 @@ from __future__ import annotations
 import sys
 
 import click
-from rich.console import Console
 
-from dotm.config import ensure_config, exclude_module, include_module, get_dotfiles_repo
+from dotm.config import ANALYSIS_TIMEOUT, exclude_module, include_module, init_config, get_dotfiles_repo
 
-console = Console()
+# Created on first use: rich costs tens of milliseconds to import
+_console_instance = None
 
 
-@click.group(invoke_without_command=True)
+def _console():
+    """Return the shared rich Console, importing rich only when a command prints."""
+    global _console_instance
+    if _console_instance is None:
+        from rich.console import Console
+        _console_instance = Console()
+    return _console_instance
+
+
+class _ConfiguredCommand(click.Command):
+    """A subcommand that bootstraps the config just before it runs.
+
+    Click handles a subcommand's --help while parsing its arguments, so
+    help output exits before invoke() and never writes a config file.
+    """
+
+    def invoke(self, ctx):
+        init_config()
+        return super().invoke(ctx)
+
+
+class _Group(click.Group):
+    command_class = _ConfiguredCommand
+
+
+@click.group(cls=_Group, invoke_without_command=True)
 @click.version_option(version="0.1.0")
 @click.pass_context
 def main(ctx):
     """dotm — Universal dotfiles module manager."""
-    ensure_config()
+    # --version, top-level --help and shell completion never reach this callback
     if ctx.invoked_subcommand is None:
+        init_config()
         ctx.invoke(plan)
 
 
@@ -50,11 +76,13 @@ def status():
 
 @main.command()
 @click.argument("modules", nargs=-1)
-def verify(modules):
+@click.option("--max-age", type=float, default=0, show_default=True,
+              help="Reuse a cached package inventory younger than this many seconds")
+def verify(modules, max_age):
     """Verify module installations are correct."""
     from dotm.verify import run_verification, print_verification
     names = list(modules) if modules else None
-    results = run_verification(names)
+    results = run_verification(names, max_age=max_age)
     ok = print_verification(results)
     if not ok:
         sys.exit(1)
@@ -64,33 +92,42 @@ def verify(modules):
 
 
 @main.command()
-@click.argument("module")
-def install(module):
-    """Install a dotfiles module."""
-    from dotm.modules import list_all_modules, add_to_deploy, is_module_installed, run_ansible_for_module
+@click.argument("modules", nargs=-1, required=True)
+def install(modules):
+    """Install one or more dotfiles modules with a single ansible run."""
+    from dotm.modules import list_all_modules, profiles_document, run_ansible_for_modules
 
+    modules = list(dict.fromkeys(modules))
     available = [m["name"] for m in list_all_modules()]
-    if module not in available:
-        console.print(f"[red]Module '{module}' not found.[/red]")
-        console.print(f"Available: {', '.join(available)}")
+    missing = [name for name in modules if name not in available]
+    if missing:
+        for name in missing:
+            _console().print(f"[red]Module '{name}' not found.[/red]")
+        _console().print(f"Available: {', '.join(available)}")
         sys.exit(1)
 
-    if is_module_installed(module):
-        console.print(f"[yellow]Module '{module}' is already installed.[/yellow]")
-    else:
-        add_to_deploy(module)
-        console.print(f"Added '{module}' to deploy.yml")
+    with profiles_document() as doc:
+        added = doc.add(*modules)
+    for name in modules:
+        if name in added:
+            _console().print(f"Added '{name}' to deploy.yml")
+        else:
+            _console().print(f"[yellow]Module '{name}' is already installed.[/yellow]")
 
     # Remove from exclusion list if present
-    include_module(module)
+    include_module(*modules)
 
-    console.print(f"[dim]Running ansible for '{module}'...[/dim]")
-    result = run_ansible_for_module(module)
+    label = ", ".join(f"'{name}'" for name in modules)
+    _console().print(f"[dim]Running ansible for {label}...[/dim]")
+    result = run_ansible_for_modules(modules)
     if result.returncode == 0:
-        console.print(f"[green]Module '{module}' installed successfully.[/green]")
+        from dotm import targets
+        targets.refresh()
+        for name in modules:
+            _console().print(f"[green]Module '{name}' installed successfully.[/green]")
     else:
-        console.print(f"[red]Installation failed:[/red]")
-        console.print(result.stderr[:500] if result.stderr else result.stdout[:500])
+        _console().print(f"[red]Installation failed:[/red]")
+        _console().print(result.stderr[:500] if result.stderr else result.stdout[:500])
         sys.exit(1)
 
 
@@ -98,25 +135,29 @@ def install(module):
 
 
 @main.command()
-@click.argument("module")
-def uninstall(module):
-    """Uninstall a dotfiles module (removes symlinks, keeps packages)."""
-    from dotm.modules import remove_from_deploy, remove_module_symlinks, is_module_installed
-
-    if not is_module_installed(module):
-        console.print(f"[yellow]Module '{module}' is not installed.[/yellow]")
-        sys.exit(1)
-
-    remove_from_deploy(module)
-    removed = remove_module_symlinks(module)
-
-    console.print(f"Removed '{module}' from deploy.yml")
-    if removed:
-        console.print(f"Removed {len(removed)} symlinks")
-        for r in removed[:10]:
-            console.print(f"  {r}")
-    console.print(f"[green]Module '{module}' uninstalled.[/green]")
-    console.print("[dim]Note: Homebrew packages were NOT uninstalled (other modules may need them).[/dim]")
+@click.argument("modules", nargs=-1, required=True)
+def uninstall(modules):
+    """Uninstall one or more dotfiles modules (removes symlinks, keeps packages)."""
+    from dotm.modules import profiles_document, remove_module_symlinks
+
+    modules = list(dict.fromkeys(modules))
+    with profiles_document() as doc:
+        not_installed = [name for name in modules if name not in doc.base_modules]
+        if not_installed:
+            for name in not_installed:
+                _console().print(f"[yellow]Module '{name}' is not installed.[/yellow]")
+            sys.exit(1)
+        doc.remove(*modules)
+
+    for name in modules:
+        removed = remove_module_symlinks(name)
+        _console().print(f"Removed '{name}' from deploy.yml")
+        if removed:
+            _console().print(f"Removed {len(removed)} symlinks")
+            for r in removed[:10]:
+                _console().print(f"  {r}")
+        _console().print(f"[green]Module '{name}' uninstalled.[/green]")
+    _console().print("[dim]Note: Homebrew packages were NOT uninstalled (other modules may need them).[/dim]")
 
 
 # --- create ---
@@ -154,18 +195,18 @@ def create(name, brew_pkgs, cask_pkgs, mas_ids, interactive):
         mod_dir = create_module(name, homebrew_packages=pkgs, homebrew_casks=casks,
                                 mas_apps=mas, stow=has_stow)
     except FileExistsError:
-        console.print(f"[red]Module '{name}' already exists.[/red]")
+        _console().print(f"[red]Module '{name}' already exists.[/red]")
         sys.exit(1)
 
     # Security scan
     findings = scan_module(mod_dir)
     if findings:
-        console.print(f"[red]Security warning: {len(findings)} potential secret(s) found![/red]")
+        _console().print(f"[red]Security warning: {len(findings)} potential secret(s) found![/red]")
         sys.exit(1)
 
     add_to_deploy(name)
-    console.print(f"[green]Created module '{name}' at {mod_dir}[/green]")
-    console.print(f"Added to deploy.yml install list")
+    _console().print(f"[green]Created module '{name}' at {mod_dir}[/green]")
+    _console().print(f"Added to deploy.yml install list")
 
 
 # --- analyze ---
@@ -177,12 +218,15 @@ def create(name, brew_pkgs, cask_pkgs, mas_ids, interactive):
 @click.option("--mas", is_flag=True, help="Analyze Mac App Store apps")
 @click.option("--dotfiles", is_flag=True, help="Analyze dotfiles")
 @click.option("--all", "all_", is_flag=True, help="Run all analyses")
-def analyze(brew, cask, mas, dotfiles, all_):
+@click.option("--timeout", type=float, default=ANALYSIS_TIMEOUT, show_default=True,
+              help="Seconds each analysis may run before it is skipped")
+def analyze(brew, cask, mas, dotfiles, all_, timeout):
     """Detect drift — packages installed outside module management."""
     from dotm.analyze import run_analysis, print_analysis
     if not any([brew, cask, mas, dotfiles, all_]):
         all_ = True
-    results = run_analysis(brew=brew, cask=cask, mas=mas, dotfiles=dotfiles, all_=all_)
+    results = run_analysis(brew=brew, cask=cask, mas=mas, dotfiles=dotfiles, all_=all_,
+                           timeout=timeout)
     print_analysis(results)
 
 
@@ -202,10 +246,12 @@ def catalog(dry_run):
 
 @main.command()
 @click.option("--quiet", is_flag=True, help="Only output errors (for launchd)")
-def sync(quiet):
+@click.option("--full", is_flag=True, help="Apply every module, not just those changed since the last sync")
+@click.option("--jobs", "-j", type=int, default=None, help="Modules applied in parallel (default: auto)")
+def sync(quiet, full, jobs):
     """Pull latest changes and apply modules."""
     from dotm.sync import run_sync
-    ok = run_sync(quiet=quiet)
+    ok = run_sync(quiet=quiet, full=full, jobs=jobs)
     if not ok:
         sys.exit(1)
 
@@ -218,7 +264,7 @@ def sync(quiet):
 def exclude(module):
     """Exclude a module from sync/apply."""
     exclude_module(module)
-    console.print(f"[yellow]Excluded '{module}' — it will be skipped during sync.[/yellow]")
+    _console().print(f"[yellow]Excluded '{module}' — it will be skipped during sync.[/yellow]")
 
 
 # --- include ---
@@ -229,7 +275,7 @@ def exclude(module):
 def include_cmd(module):
     """Re-include an excluded module."""
     include_module(module)
-    console.print(f"[green]Included '{module}' — it will be applied during sync.[/green]")
+    _console().print(f"[green]Included '{module}' — it will be applied during sync.[/green]")
 
 
 # --- push ---
@@ -238,22 +284,59 @@ def include_cmd(module):
 @main.command()
 @click.option("--message", "-m", help="Commit message")
 @click.option("--dry-run", is_flag=True, help="Scan and preview without pushing")
-def push(message, dry_run):
+@click.option("--jobs", "-j", type=int, default=None, help="Secret-scan worker processes (default: auto)")
+@click.option("--full-files", is_flag=True, help="Scan changed files in full, not just added lines")
+@click.option("--index", is_flag=True, help="Stage first and scan the staged blobs that will be committed")
+@click.option("--fail-fast", is_flag=True, help="Stop scanning at the first new finding")
+def push(message, dry_run, jobs, full_files, index, fail_fast):
     """Security scan, commit, and push module changes."""
     from dotm.sync import run_push
-    ok = run_push(message=message, dry_run=dry_run)
+    ok = run_push(message=message, dry_run=dry_run, jobs=jobs, full_files=full_files, index=index,
+                  fail_fast=fail_fast)
     if not ok:
         sys.exit(1)
 
 
+# --- scan ---
+
+
+@main.command()
+@click.option("--staged", is_flag=True, help="Scan staged blobs only (for a pre-commit hook)")
+@click.option("--jobs", "-j", type=int, default=None, help="Worker processes (default: auto)")
+@click.option("--fail-fast", is_flag=True, help="Stop at the first new finding")
+@click.option("--update-baseline", is_flag=True, help="Accept all current findings, in any file push scans, into the baseline")
+def scan(staged, jobs, fail_fast, update_baseline):
+    """Scan the dotfiles repo for secrets.
+
+    Findings recorded in the repo's baseline file are not reported.
+    As a git pre-commit hook: `dotm scan --staged`.
+    """
+    from dotm.baseline import BASELINE_NAME, new_findings_filter, write_baseline
+    from dotm.security import print_scan_results, scan_baseline_candidates, scan_repo, scan_staged
+    repo = get_dotfiles_repo()
+    if update_baseline:
+        count = write_baseline(repo, scan_baseline_candidates(repo, jobs=jobs))
+        _console().print(f"[green]Baseline updated:[/green] {count} finding(s) recorded in {BASELINE_NAME}")
+        return
+    keep = new_findings_filter(repo)
+    if staged:
+        findings = scan_staged(repo, keep=keep, fail_fast=fail_fast)
+    else:
+        findings = scan_repo(repo, jobs=jobs, keep=keep, fail_fast=fail_fast)
+    if print_scan_results(findings, base_path=repo):
+        sys.exit(1)
+
+
 # --- doctor ---
 
 
 @main.command()
-def doctor():
+@click.option("--jobs", "-j", type=int, default=None, help="Secret-scan worker processes (default: auto)")
+@click.option("--fail-fast", is_flag=True, help="Stop the secret scan at the first new finding")
+def doctor(jobs, fail_fast):
     """Diagnose common issues with the dotfiles system."""
     from dotm.verify import run_doctor, print_doctor
-    checks = run_doctor()
+    checks = run_doctor(jobs=jobs, fail_fast=fail_fast)
     ok = print_doctor(checks)
     if not ok:
         sys.exit(1)
@@ -270,11 +353,11 @@ def bootstrap(host, user):
     import subprocess
 
     if not host:
-        console.print("[red]--host is required[/red]")
+        _console().print("[red]--host is required[/red]")
         sys.exit(1)
 
     repo = get_dotfiles_repo()
-    console.print(f"[dim]Bootstrapping {user}@{host}...[/dim]")
+    _console().print(f"[dim]Bootstrapping {user}@{host}...[/dim]")
 
     # Copy the repo to the remote host
     result = subprocess.run(
@@ -282,22 +365,22 @@ def bootstrap(host, user):
         capture_output=True,
     )
     if result.returncode != 0:
-        console.print("[dim]Cloning dotfiles repo on remote...[/dim]")
+        _console().print("[dim]Cloning dotfiles repo on remote...[/dim]")
         subprocess.run(
             ["ssh", f"{user}@{host}", "git", "clone",
              "https://github.com/getfatday/dotfiles.git", "~/src/dotfiles"],
             check=True,
         )
 
-    console.print("[dim]Running sync on remote...[/dim]")
+    _console().print("[dim]Running sync on remote...[/dim]")
     result = subprocess.run(
         ["ssh", f"{user}@{host}", "~/.local/bin/dotm", "sync"],
         text=True,
     )
     if result.returncode == 0:
-        console.print(f"[green]Bootstrap complete for {user}@{host}.[/green]")
+        _console().print(f"[green]Bootstrap complete for {user}@{host}.[/green]")
     else:
-        console.print(f"[red]Bootstrap failed.[/red]")
+        _console().print(f"[red]Bootstrap failed.[/red]")
         sys.exit(1)
 
 
@@ -313,19 +396,19 @@ def plan(prompt):
 
     claude_bin = shutil.which("claude")
     if not claude_bin:
-        console.print("[red]Claude Code CLI not found.[/red]")
-        console.print("Install it: npm install -g @anthropic-ai/claude-code")
+        _console().print("[red]Claude Code CLI not found.[/red]")
+        _console().print("Install it: npm install -g @anthropic-ai/claude-code")
         sys.exit(1)
 
     repo_path = get_dotfiles_repo()
     if not repo_path.exists():
-        console.print(f"[red]Dotfiles repo not found at {repo_path}[/red]")
+        _console().print(f"[red]Dotfiles repo not found at {repo_path}[/red]")
         sys.exit(1)
 
     cmd = [claude_bin]
     if prompt:
         cmd.extend(["-p", " ".join(prompt)])
 
-    console.print(f"[dim]Launching Claude Code in {repo_path}...[/dim]")
+    _console().print(f"[dim]Launching Claude Code in {repo_path}...[/dim]")
     result = subprocess.run(cmd, cwd=repo_path)
     sys.exit(result.returncode)
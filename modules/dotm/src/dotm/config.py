@@ -2,9 +2,11 @@
 
 from __future__ import annotations
 
+import json
+import os
+from collections import namedtuple
 from pathlib import Path
-
-import yaml
+from types import MappingProxyType
 
 DEFAULT_CONFIG = {
     "dotfiles_repo": "~/src/dotfiles",
@@ -13,75 +15,217 @@ DEFAULT_CONFIG = {
         "interval_minutes": 30,
         "auto_apply": True,
     },
+    "analyze": {
+        "max_depth": 6,
+        "prune": [
+            ".git", "node_modules", "__pycache__", ".venv", "venv",
+            "Cache", "Caches", "cache", "CachedData", "Code Cache", "GPUCache",
+            "IndexedDB", "Service Worker",
+        ],
+    },
+    "scan": {
+        "max_file_bytes": 50 * 1024 * 1024,
+    },
 }
 
 CONFIG_DIR = Path.home() / ".config" / "dotm"
 CONFIG_FILE = CONFIG_DIR / "config.yml"
 LOG_DIR = CONFIG_DIR / "logs"
 
+# config.yml parsed to JSON, so a run with an unchanged config never imports yaml
+CONFIG_CACHE = CONFIG_DIR / "config-cache.json"
 
-def ensure_config() -> dict:
-    """Create default config if it doesn't exist, then return it."""
+# Seconds each `dotm analyze` analysis may run before it is reported as timed out
+ANALYSIS_TIMEOUT = 60
+
+# Immutable, pre-resolved view of config.yml; getters read its attributes
+ConfigSnapshot = namedtuple(
+    "ConfigSnapshot",
+    ["stamp", "config", "dotfiles_repo", "modules_dir", "excluded_modules", "analyze", "scan"],
+)
+
+_snapshot: ConfigSnapshot | None = None
+
+
+def init_config() -> None:
+    """First-run setup: create the config and log dirs and a default config.yml.
+
+    Costs two stat() calls once everything exists; nothing is written and
+    yaml is not imported.
+    """
+    if CONFIG_FILE.exists() and LOG_DIR.is_dir():
+        return
     CONFIG_DIR.mkdir(parents=True, exist_ok=True)
     LOG_DIR.mkdir(parents=True, exist_ok=True)
 
     if not CONFIG_FILE.exists():
+        import yaml
         CONFIG_FILE.write_text(yaml.dump(DEFAULT_CONFIG, default_flow_style=False, sort_keys=False))
 
+
+def ensure_config() -> dict:
+    """Create default config if it doesn't exist, then return it."""
+    init_config()
     return load_config()
 
 
-def load_config() -> dict:
-    """Load the local dotm config."""
+def _read_config(stamp: tuple) -> dict:
+    """Parse config.yml, merging defaults for any missing keys.
+
+    The parsed data is kept in CONFIG_CACHE under the file's stamp and reused
+    while the stamp matches.
+    """
     if not CONFIG_FILE.exists():
         return dict(DEFAULT_CONFIG)
-    with open(CONFIG_FILE) as f:
-        data = yaml.safe_load(f) or {}
-    # Merge defaults for any missing keys
+    data = _read_cached_config(stamp)
+    if data is None:
+        import yaml
+        with open(CONFIG_FILE) as f:
+            data = yaml.safe_load(f) or {}
+        _write_cached_config(stamp, data)
     merged = dict(DEFAULT_CONFIG)
     merged.update(data)
     return merged
 
 
+def _read_cached_config(stamp: tuple) -> dict | None:
+    """Parsed config.yml from CONFIG_CACHE, None unless cached for this stamp."""
+    try:
+        with open(CONFIG_CACHE) as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cached, dict) or cached.get("stamp") != list(stamp):
+        return None
+    return cached.get("config")
+
+
+def _write_cached_config(stamp: tuple, data: dict) -> None:
+    """Atomically cache parsed config unless JSON cannot round-trip it (dates, int keys)."""
+    try:
+        text = json.dumps({"stamp": list(stamp), "config": data})
+    except (TypeError, ValueError):
+        return
+    if json.loads(text)["config"] != data:
+        return
+    tmp = CONFIG_CACHE.with_suffix(".tmp")
+    try:
+        tmp.write_text(text)
+        os.replace(tmp, CONFIG_CACHE)
+    except OSError:
+        pass
+
+
+def _stamp() -> tuple:
+    """Identify the config file's current version: path plus mtime, size and inode."""
+    try:
+        st = os.stat(CONFIG_FILE)
+    except OSError:
+        return (str(CONFIG_FILE), None)
+    return (str(CONFIG_FILE), st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _freeze(value):
+    """Read-only copy: dicts become mappingproxies, lists become tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _thaw(value):
+    """Mutable deep copy of a frozen value."""
+    if isinstance(value, MappingProxyType):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return value
+
+
+def snapshot() -> ConfigSnapshot:
+    """Return the in-process config snapshot, re-parsing config.yml only when it changed.
+
+    A stat() per call replaces an open-and-parse; save_config() invalidates
+    explicitly so in-process writes are seen even within one mtime tick.
+    """
+    global _snapshot
+    stamp = _stamp()
+    if _snapshot is None or _snapshot.stamp != stamp:
+        config = _read_config(stamp)
+        dotfiles_repo = Path(config["dotfiles_repo"]).expanduser()
+        _snapshot = ConfigSnapshot(
+            stamp=stamp,
+            config=_freeze(config),
+            dotfiles_repo=dotfiles_repo,
+            modules_dir=dotfiles_repo / "modules",
+            excluded_modules=tuple(config.get("excluded_modules") or ()),
+            analyze=_freeze({**DEFAULT_CONFIG["analyze"], **(config.get("analyze") or {})}),
+            scan=_freeze({**DEFAULT_CONFIG["scan"], **(config.get("scan") or {})}),
+        )
+    return _snapshot
+
+
+def invalidate() -> None:
+    """Drop the config snapshot; the next getter re-reads config.yml."""
+    global _snapshot
+    _snapshot = None
+
+
+def load_config() -> dict:
+    """Load the local dotm config as a mutable copy of the current snapshot."""
+    return _thaw(snapshot().config)
+
+
 def save_config(config: dict) -> None:
     """Write the local dotm config."""
+    import yaml
     CONFIG_DIR.mkdir(parents=True, exist_ok=True)
     with open(CONFIG_FILE, "w") as f:
         yaml.dump(config, f, default_flow_style=False, sort_keys=False)
+    invalidate()
 
 
 def get_dotfiles_repo() -> Path:
     """Return the resolved path to the dotfiles repo."""
-    config = load_config()
-    return Path(config["dotfiles_repo"]).expanduser()
+    return snapshot().dotfiles_repo
 
 
 def get_modules_dir() -> Path:
     """Return the path to the modules directory."""
-    return get_dotfiles_repo() / "modules"
+    return snapshot().modules_dir
 
 
 def get_excluded_modules() -> list[str]:
     """Return the list of excluded module names."""
-    config = load_config()
-    return config.get("excluded_modules", [])
+    return list(snapshot().excluded_modules)
+
+
+def get_analyze_settings() -> MappingProxyType:
+    """Return the orphan-symlink walker settings (max_depth, prune)."""
+    return snapshot().analyze
 
 
-def exclude_module(name: str) -> None:
-    """Add a module to the exclusion list."""
+def get_scan_settings() -> MappingProxyType:
+    """Return the secret scanner settings (max_file_bytes)."""
+    return snapshot().scan
+
+
+def exclude_module(*names: str) -> None:
+    """Add modules to the exclusion list (one write at most)."""
     config = load_config()
     excluded = config.get("excluded_modules", [])
-    if name not in excluded:
-        excluded.append(name)
+    new = [name for name in dict.fromkeys(names) if name not in excluded]
+    if new:
+        excluded.extend(new)
         config["excluded_modules"] = excluded
         save_config(config)
 
 
-def include_module(name: str) -> None:
-    """Remove a module from the exclusion list."""
+def include_module(*names: str) -> None:
+    """Remove modules from the exclusion list (one write at most)."""
     config = load_config()
     excluded = config.get("excluded_modules", [])
-    if name in excluded:
-        excluded.remove(name)
-        config["excluded_modules"] = excluded
+    if any(name in excluded for name in names):
+        config["excluded_modules"] = [m for m in excluded if m not in names]
         save_config(config)
@@ -0,0 +1,145 @@
+"""Module dependency graph (depends_on) and a bounded parallel apply scheduler."""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable
+
+# Per-module outcomes reported by run_graph()
+OK, FAILED, SKIPPED = "ok", "failed", "skipped"
+
+
+def default_jobs() -> int:
+    """Worker threads for apply steps: small, since most of them wait on I/O or ansible."""
+    return min(4, os.cpu_count() or 1)
+
+
+def dependency_graph(modules: list[dict]) -> dict[str, list[str]]:
+    """Map each module to the modules it depends on, dropping unknown names."""
+    names = {m["name"] for m in modules}
+    return {m["name"]: [d for d in m["depends_on"] if d in names] for m in modules}
+
+
+def find_cycle(graph: dict[str, list[str]]) -> list[str] | None:
+    """Return one dependency cycle as [a, b, ..., a], or None if the graph is acyclic."""
+    state: dict[str, int] = {}  # 1 = on the current path, 2 = done
+    for root in sorted(graph):
+        if root in state:
+            continue
+        path = [root]
+        stack = [iter(graph[root])]
+        state[root] = 1
+        while stack:
+            dep = next(stack[-1], None)
+            if dep is None:
+                state[path.pop()] = 2
+                stack.pop()
+            elif state.get(dep) == 1:
+                return path[path.index(dep):] + [dep]
+            elif dep not in state:
+                state[dep] = 1
+                path.append(dep)
+                stack.append(iter(graph.get(dep, ())))
+    return None
+
+
+def check_acyclic(graph: dict[str, list[str]]) -> None:
+    """Raise ValueError naming the cycle if depends_on loops."""
+    cycle = find_cycle(graph)
+    if cycle:
+        raise ValueError(f"Module dependency cycle: {' -> '.join(cycle)}")
+
+
+def ordered(names: list[str], graph: dict[str, list[str]]) -> list[str]:
+    """names with every module after its dependencies, otherwise in the given order."""
+    check_acyclic(graph)
+    wanted = set(names)
+    out: list[str] = []
+    done: set[str] = set()
+
+    def visit(name: str) -> None:
+        if name in done:
+            return
+        done.add(name)
+        for dep in sorted(_deps_within(name, graph, wanted)):
+            visit(dep)
+        out.append(name)
+
+    for name in names:
+        visit(name)
+    return out
+
+
+def _deps_within(name: str, graph: dict[str, list[str]], names: set[str]) -> set[str]:
+    """Dependencies of name among names, looking through modules not being applied."""
+    found: set[str] = set()
+    seen = {name}
+    stack = list(graph.get(name, ()))
+    while stack:
+        dep = stack.pop()
+        if dep in seen:
+            continue
+        seen.add(dep)
+        if dep in names:
+            found.add(dep)
+        else:
+            stack.extend(graph.get(dep, ()))
+    return found
+
+
+def run_graph(names: list[str], graph: dict[str, list[str]], run: Callable[[list[str]], bool | dict[str, bool]], *,
+              jobs: int | None = None, serial: set[str] | frozenset[str] = frozenset(),
+              on_error: Callable[[list[str], Exception], None] | None = None) -> dict[str, str]:
+    """Run run() for each module once its dependencies among names succeeded.
+
+    Independent modules run concurrently on up to jobs threads. Modules
+    in serial are not run one by one: whatever of them is ready is
+    handed to run() as one batch, one batch at a time. run() returns one
+    bool for its batch or {name: ok} per module, a name missing from it
+    counting as failed. A module whose run fails or raises fails on its
+    own; modules depending on it are skipped. An exception from run() is passed to on_error with
+    its batch. Returns {name: OK | FAILED | SKIPPED}.
+    """
+    check_acyclic(graph)
+    pending = set(names)
+    deps = {n: _deps_within(n, graph, pending) for n in names}
+    status: dict[str, str] = {}
+    running: dict = {}
+
+    def _run(batch: list[str]) -> bool | dict[str, bool]:
+        try:
+            return run(batch)
+        except Exception as e:
+            if on_error:
+                on_error(batch, e)
+            return False
+
+    with ThreadPoolExecutor(max_workers=jobs or default_jobs()) as pool:
+        while pending or running:
+            blocked = True
+            while blocked:
+                blocked = False
+                for n in sorted(pending):
+                    if any(status.get(d) in (FAILED, SKIPPED) for d in deps[n]):
+                        status[n] = SKIPPED
+                        pending.discard(n)
+                        blocked = True
+            ready = [n for n in names if n in pending and all(status.get(d) == OK for d in deps[n])]
+            for n in ready:
+                if n not in serial:
+                    pending.discard(n)
+                    running[pool.submit(_run, [n])] = [n]
+            batch = [n for n in ready if n in serial]
+            if batch and not any(b[0] in serial for b in running.values()):
+                pending.difference_update(batch)
+                running[pool.submit(_run, batch)] = batch
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                for n in running.pop(future):
+                    ok = result.get(n, False) if isinstance(result, dict) else result
+                    status[n] = OK if ok else FAILED
+    return {n: status.get(n, SKIPPED) for n in names}
@@ -0,0 +1,198 @@
+"""Installed package inventory (brew formulae/casks/taps, MAS apps) gathered once per run."""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+from dotm.config import CONFIG_DIR
+
+INVENTORY_CACHE = CONFIG_DIR / "inventory.json"
+CACHE_VERSION = 2
+
+# Standard Homebrew prefixes (Apple Silicon, Intel, Linuxbrew); $HOMEBREW_PREFIX wins
+HOMEBREW_PREFIXES = ("/opt/homebrew", "/usr/local", "/home/linuxbrew/.linuxbrew")
+
+KINDS = ("formulae", "casks", "taps", "mas")
+
+_COMMANDS = {
+    "formulae": ["brew", "list", "--formula", "-1"],
+    "casks": ["brew", "list", "--cask", "-1"],
+    "taps": ["brew", "tap"],
+    "mas": ["mas", "list"],
+}
+
+
+def _run(cmd: list[str]) -> list[str]:
+    """Run a command and return output lines, empty list on failure."""
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        if result.returncode != 0:
+            return []
+        return [line.strip() for line in result.stdout.strip().splitlines() if line.strip()]
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        return []
+
+
+def parse_mas_list(lines: list[str]) -> dict[int, str]:
+    """Parse `mas list` output into {app_id: app_name}."""
+    installed = {}
+    for line in lines:
+        parts = line.split(None, 1)
+        if parts:
+            try:
+                app_id = int(parts[0])
+            except ValueError:
+                continue
+            app_name = parts[1] if len(parts) > 1 else str(app_id)
+            # Strip version info in parentheses
+            if "(" in app_name:
+                app_name = app_name[:app_name.rfind("(")].strip()
+            installed[app_id] = app_name
+    return installed
+
+
+def kinds_for_modules(modules: list[dict]) -> set[str]:
+    """Return the inventory kinds needed to verify the given modules."""
+    kinds = set()
+    for mod in modules:
+        if mod["homebrew_packages"]:
+            kinds.add("formulae")
+        if mod["homebrew_casks"]:
+            kinds.add("casks")
+        if mod["homebrew_taps"]:
+            kinds.add("taps")
+        if mod["mas_installed_apps"]:
+            kinds.add("mas")
+    return kinds
+
+
+def find_homebrew_prefix() -> Path | None:
+    """Return the Homebrew prefix containing a Cellar, or None if not found."""
+    env = os.environ.get("HOMEBREW_PREFIX")
+    candidates = [env] if env else HOMEBREW_PREFIXES
+    for candidate in candidates:
+        if os.path.isdir(os.path.join(candidate, "Cellar")):
+            return Path(candidate)
+    return None
+
+
+def _scan_names(path: Path) -> set[str]:
+    """Return the names of visible subdirectories of path."""
+    with os.scandir(path) as it:
+        return {e.name for e in it if not e.name.startswith(".") and e.is_dir()}
+
+
+def _scan_taps(prefix: Path) -> set[str] | None:
+    """Return tapped repos as user/repo from Library/Taps, None if not found."""
+    for taps_dir in (prefix / "Library" / "Taps", prefix / "Homebrew" / "Library" / "Taps"):
+        if taps_dir.is_dir():
+            break
+    else:
+        return None
+    taps = set()
+    for user in _scan_names(taps_dir):
+        for repo in _scan_names(taps_dir / user):
+            if repo.startswith("homebrew-"):
+                taps.add(f"{user}/{repo.removeprefix('homebrew-')}")
+    return taps
+
+
+def scan_homebrew(kind: str, prefix: Path | None = None) -> set[str] | None:
+    """Read installed formulae/casks/taps straight from the Homebrew prefix.
+
+    Avoids booting brew's Ruby runtime. Returns None when the prefix layout is
+    not recognised so the caller can fall back to the brew subprocess.
+    """
+    prefix = prefix or find_homebrew_prefix()
+    if prefix is None:
+        return None
+    try:
+        if kind == "formulae":
+            return _scan_names(prefix / "Cellar")
+        if kind == "casks":
+            caskroom = prefix / "Caskroom"
+            return _scan_names(caskroom) if caskroom.is_dir() else set()
+        if kind == "taps":
+            return _scan_taps(prefix)
+    except OSError:
+        return None
+    return None
+
+
+def _collect(kind: str) -> set[str] | dict[int, str]:
+    """Collect a single inventory kind, preferring the filesystem over brew."""
+    if kind != "mas":
+        scanned = scan_homebrew(kind)
+        if scanned is not None:
+            return scanned
+    lines = _run(_COMMANDS[kind])
+    if kind == "mas":
+        return parse_mas_list(lines)
+    return set(lines)
+
+
+def _read_cache() -> dict:
+    """Return the cached {kind: {"gathered_at": ..., "items": ...}}, empty if unusable."""
+    try:
+        with open(INVENTORY_CACHE) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+        return {}
+    return data.get("kinds", {})
+
+
+def _load_cached(kinds: set[str], max_age: float) -> dict:
+    """Return the requested kinds whose cached snapshot is younger than max_age."""
+    now = time.time()
+    inventory = {}
+    for kind, entry in _read_cache().items():
+        if kind not in kinds or now - entry.get("gathered_at", 0) > max_age:
+            continue
+        if kind == "mas":
+            inventory[kind] = {int(k): v for k, v in entry["items"].items()}
+        else:
+            inventory[kind] = set(entry["items"])
+    return inventory
+
+
+def _save_cached(inventory: dict) -> None:
+    """Merge freshly gathered kinds into the cache, keeping the others; failures are ignored."""
+    kinds = _read_cache()
+    now = time.time()
+    for kind, items in inventory.items():
+        kinds[kind] = {"gathered_at": now, "items": items if isinstance(items, dict) else sorted(items)}
+    # Per-thread temp name: concurrent analyses may save at the same time
+    tmp = INVENTORY_CACHE.with_name(f"{INVENTORY_CACHE.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        INVENTORY_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "w") as f:
+            json.dump({"version": CACHE_VERSION, "kinds": kinds}, f)
+        os.replace(tmp, INVENTORY_CACHE)
+    except OSError:
+        pass
+
+
+def gather_inventory(kinds: set[str] | None = None, *, max_age: float = 0) -> dict:
+    """Gather one inventory snapshot: at most one lookup per kind, not per module.
+
+    With max_age > 0 each kind cached less than max_age seconds ago is
+    reused, and the kinds gathered now are merged into the cache; without
+    a TTL nothing is read or written. Returns {"formulae": set, "casks":
+    set, "taps": set, "mas": {id: name}} restricted to the requested kinds.
+    """
+    kinds = set(KINDS) if kinds is None else set(kinds)
+    if max_age <= 0:
+        return {kind: _collect(kind) for kind in kinds}
+
+    inventory = _load_cached(kinds, max_age)
+    fresh = {kind: _collect(kind) for kind in kinds - inventory.keys()}
+    if fresh:
+        _save_cached(fresh)
+    return {**inventory, **fresh}
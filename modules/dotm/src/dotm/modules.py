@@ -2,56 +2,42 @@
 
 from __future__ import annotations
 
+import json
 import shutil
 import subprocess
 from pathlib import Path
 
-import yaml
-from rich.console import Console
-from rich.table import Table
-
+from dotm import registry
 from dotm.config import get_dotfiles_repo, get_excluded_modules, get_modules_dir
+from dotm.profiles import ProfilesDocument
+from dotm.targets import module_targets
+
+# Created on first use: rich costs tens of milliseconds to import
+_console_instance = None
+
 
-console = Console()
+def _console():
+    """Return the shared rich Console, importing rich only when output is printed."""
+    global _console_instance
+    if _console_instance is None:
+        from rich.console import Console
+        _console_instance = Console()
+    return _console_instance
 
 
 def list_all_modules() -> list[dict]:
-    """List all modules with their metadata."""
-    modules_dir = get_modules_dir()
-    if not modules_dir.exists():
-        return []
+    """List all modules with their metadata (served from the shared module index)."""
+    return registry.get_modules(get_modules_dir())
 
-    modules = []
-    for mod_dir in sorted(modules_dir.iterdir()):
-        config_file = mod_dir / "config.yml"
-        if not mod_dir.is_dir() or not config_file.exists():
-            continue
-        with open(config_file) as f:
-            config = yaml.safe_load(f) or {}
-        modules.append({
-            "name": mod_dir.name,
-            "path": mod_dir,
-            "config": config,
-            "homebrew_packages": config.get("homebrew_packages", []),
-            "homebrew_casks": config.get("homebrew_casks", []),
-            "homebrew_taps": config.get("homebrew_taps", []),
-            "mas_installed_apps": config.get("mas_installed_apps", []),
-            "stow_dirs": config.get("stow_dirs", []),
-            "mergeable_files": config.get("mergeable_files", []),
-        })
-    return modules
+
+def profiles_document() -> ProfilesDocument:
+    """Open playbooks/profiles.yml for batched edits (see ProfilesDocument)."""
+    return ProfilesDocument(get_dotfiles_repo() / "playbooks" / "profiles.yml")
 
 
 def get_deploy_modules() -> list[str]:
-    """Read the base_modules list from profiles.yml."""
-    profiles_yml = get_dotfiles_repo() / "playbooks" / "profiles.yml"
-    if not profiles_yml.exists():
-        return []
-    with open(profiles_yml) as f:
-        data = yaml.safe_load(f)
-    if not data or not isinstance(data, dict):
-        return []
-    return data.get("base_modules", [])
+    """Read the base_modules list from profiles.yml, cached in the module index."""
+    return registry.get_base_modules(get_dotfiles_repo() / "playbooks" / "profiles.yml")
 
 
 def is_module_installed(name: str) -> bool:
@@ -59,79 +45,22 @@ def is_module_installed(name: str) -> bool:
     return name in get_deploy_modules()
 
 
-def add_to_deploy(name: str) -> None:
-    """Add a module to the base_modules list in profiles.yml."""
-    profiles_yml = get_dotfiles_repo() / "playbooks" / "profiles.yml"
-    with open(profiles_yml) as f:
-        data = yaml.safe_load(f)
-
-    base_modules = data.get("base_modules", [])
-    if name in base_modules:
-        return
-
-    # Insert alphabetically
-    base_modules.append(name)
-    base_modules.sort()
-    data["base_modules"] = base_modules
-
-    # Rewrite the file preserving structure
-    with open(profiles_yml) as f:
-        lines = f.readlines()
-
-    # Find the base_modules: block and reconstruct it
-    new_lines = []
-    in_base_block = False
-    base_indent = ""
-    for line in lines:
-        stripped = line.lstrip()
-        if stripped.startswith("base_modules:"):
-            in_base_block = True
-            base_indent = line[: len(line) - len(stripped)]
-            new_lines.append(line)
-            for mod in base_modules:
-                new_lines.append(f"{base_indent}  - {mod}\n")
-            continue
-        if in_base_block:
-            if stripped.startswith("- ") and not stripped.startswith("- name:"):
-                continue  # Skip old entries
-            else:
-                in_base_block = False
-                new_lines.append(line)
-        else:
-            new_lines.append(line)
-
-    with open(profiles_yml, "w") as f:
-        f.writelines(new_lines)
-
-
-def remove_from_deploy(name: str) -> None:
-    """Remove a module from the base_modules list in profiles.yml."""
-    profiles_yml = get_dotfiles_repo() / "playbooks" / "profiles.yml"
-    with open(profiles_yml) as f:
-        lines = f.readlines()
-
-    # Only remove entries within the base_modules block
-    new_lines = []
-    in_base_block = False
-    for line in lines:
-        stripped = line.lstrip()
-        if stripped.startswith("base_modules:"):
-            in_base_block = True
-            new_lines.append(line)
-            continue
-        if in_base_block:
-            if stripped.startswith("- "):
-                if stripped.strip() == f"- {name}":
-                    continue  # Skip this entry
-                new_lines.append(line)
-            else:
-                in_base_block = False
-                new_lines.append(line)
-        else:
-            new_lines.append(line)
+def add_to_deploy(*names: str) -> list[str]:
+    """Add modules to the base_modules list in profiles.yml with one read and one write.
+
+    Returns the names that were not already listed.
+    """
+    with profiles_document() as doc:
+        return doc.add(*names)
 
-    with open(profiles_yml, "w") as f:
-        f.writelines(new_lines)
+
+def remove_from_deploy(*names: str) -> list[str]:
+    """Remove modules from the base_modules list in profiles.yml with one read and one write.
+
+    Returns the names that were listed.
+    """
+    with profiles_document() as doc:
+        return doc.remove(*names)
 
 
 def create_module(name: str, *, homebrew_packages: list[str] | None = None,
@@ -158,27 +87,20 @@ def create_module(name: str, *, homebrew_packages: list[str] | None = None,
         config["stow_dirs"] = [name]
         (mod_dir / "files").mkdir()
 
+    import yaml
+
     with open(mod_dir / "config.yml", "w") as f:
         yaml.dump(config, f, default_flow_style=False, sort_keys=False)
 
+    registry.invalidate()
     return mod_dir
 
 
 def remove_module_symlinks(name: str) -> list[Path]:
     """Remove symlinks from ~/ that point into a module's files/ directory."""
-    dotmodules_dir = Path.home() / ".dotmodules" / name / "files"
-    if not dotmodules_dir.exists():
-        return []
-
     removed = []
-    home = Path.home()
-
-    for src_file in dotmodules_dir.rglob("*"):
-        if src_file.is_dir():
-            continue
-        rel = src_file.relative_to(dotmodules_dir)
-        target = home / rel
-        if target.is_symlink() and target.resolve() == src_file.resolve():
+    for target, src_file in module_targets(name).items():
+        if target.is_symlink() and target.resolve() == src_file:
             target.unlink()
             removed.append(target)
 
@@ -187,6 +109,11 @@ def remove_module_symlinks(name: str) -> list[Path]:
 
 def run_ansible_for_module(name: str) -> subprocess.CompletedProcess:
     """Run ansible-playbook targeting a specific module."""
+    return run_ansible_for_modules([name])
+
+
+def run_ansible_for_modules(names: list[str]) -> subprocess.CompletedProcess:
+    """Run one ansible-playbook invocation with all names as final_modules."""
     repo = get_dotfiles_repo()
     deploy_yml = repo / "playbooks" / "deploy.yml"
 
@@ -195,7 +122,7 @@ def run_ansible_for_module(name: str) -> subprocess.CompletedProcess:
         [
             "ansible-playbook", str(deploy_yml),
             "-i", str(inventory),
-            "--extra-vars", f'{{"final_modules": ["{name}"]}}',
+            "--extra-vars", json.dumps({"final_modules": list(names)}),
         ],
         capture_output=True,
         text=True,
@@ -205,6 +132,8 @@ def run_ansible_for_module(name: str) -> subprocess.CompletedProcess:
 
 def print_module_list(filter_mode: str | None = None) -> None:
     """Print a formatted table of modules."""
+    from rich.table import Table
+
     modules = list_all_modules()
     deployed = get_deploy_modules()
     excluded = get_excluded_modules()
@@ -238,7 +167,7 @@ def print_module_list(filter_mode: str | None = None) -> None:
             str(len(mod["mas_installed_apps"])) if mod["mas_installed_apps"] else "",
         )
 
-    console.print(table)
+    _console().print(table)
 
 
 def print_status() -> None:
@@ -254,7 +183,7 @@ def print_status() -> None:
     total_casks = sum(len(m["homebrew_casks"]) for m in modules)
     total_mas = sum(len(m["mas_installed_apps"]) for m in modules)
 
-    console.print(f"[bold]Dotfiles Status[/bold]")
-    console.print(f"  Modules: {len(modules)} total, {installed_count} installed, {excluded_count} excluded")
-    console.print(f"  Managed: {total_pkgs} packages, {total_casks} casks, {total_mas} MAS apps")
-    console.print(f"  Repo: {get_dotfiles_repo()}")
+    _console().print(f"[bold]Dotfiles Status[/bold]")
+    _console().print(f"  Modules: {len(modules)} total, {installed_count} installed, {excluded_count} excluded")
+    _console().print(f"  Managed: {total_pkgs} packages, {total_casks} casks, {total_mas} MAS apps")
+    _console().print(f"  Repo: {get_dotfiles_repo()}")
@@ -0,0 +1,188 @@
+"""Run ansible-playbook with streamed JSON events and record apply timings."""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from rich.console import Console
+
+from dotm.config import LOG_DIR
+
+console = Console()
+
+# Bundled stdout callback; see ansible_plugins/callback/dotm_events.py
+PLUGIN_DIR = Path(__file__).with_name("ansible_plugins") / "callback"
+CALLBACK_NAME = "dotm_events"
+
+# One JSON line per playbook run: per-task and per-module seconds
+TIMINGS_LOG = LOG_DIR / "apply-timings.jsonl"
+
+
+def playbook_env() -> dict:
+    """Environment that makes ansible-playbook report through the dotm_events callback."""
+    env = dict(os.environ)
+    extra = env.get("ANSIBLE_CALLBACK_PLUGINS")
+    env["ANSIBLE_CALLBACK_PLUGINS"] = f"{PLUGIN_DIR}{os.pathsep}{extra}" if extra else str(PLUGIN_DIR)
+    env["ANSIBLE_STDOUT_CALLBACK"] = CALLBACK_NAME
+    env["ANSIBLE_LOAD_CALLBACK_PLUGINS"] = "1"
+    env["PYTHONUNBUFFERED"] = "1"
+    return env
+
+
+def _item_module(item, modules: set[str]) -> str | None:
+    """Module a loop item belongs to: the item itself or its name/module key."""
+    if isinstance(item, str):
+        return item if item in modules else None
+    if isinstance(item, dict):
+        for key in ("name", "module"):
+            if item.get(key) in modules:
+                return item[key]
+    return None
+
+
+def run_playbook(cmd: list[str], cwd, modules: list[str], quiet: bool = False,
+                 timeout: int = 600) -> dict:
+    """Run cmd, streaming its events, and return a timing summary.
+
+    The summary has "ok", "seconds", "modules" (the final_modules list),
+    "tasks" (name, role, seconds, status; in run order), "module_seconds"
+    for time spent in loop items naming a module, "errors", and
+    "failed_modules": the modules whose loop items failed, or None when a
+    failure could not be tied to a module (a task outside a module loop,
+    a crash, a timeout). Lines that are not events (warnings, a different
+    callback) are echoed unless quiet, and kept for errors.
+    """
+    wanted = set(modules)
+    failed_modules: set[str] = set()
+    unattributed = False
+    tasks: dict[tuple, dict] = {}
+    module_seconds: dict[str, float] = {}
+    errors: list[str] = []
+    other: list[str] = []
+    start = time.monotonic()
+
+    proc = subprocess.Popen(cmd, cwd=cwd, env=playbook_env(), text=True,
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    timer = threading.Timer(timeout, proc.kill)
+    timer.start()
+    try:
+        for line in proc.stdout:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                event = None
+            if not isinstance(event, dict) or "event" not in event:
+                other.append(line.rstrip())
+                del other[:-20]
+                if not quiet and line.strip():
+                    console.print(line.rstrip(), markup=False, highlight=False)
+                continue
+            kind = event["event"]
+            if kind == "task_start":
+                key = (event.get("role"), event["task"])
+                tasks.setdefault(key, {"task": event["task"], "role": event.get("role"),
+                                       "seconds": 0.0, "status": "ok"})
+                if not quiet:
+                    role = f"{event['role']} : " if event.get("role") else ""
+                    console.print(f"[dim]• {role}{event['task']}[/dim]")
+            elif kind == "result":
+                key = (event.get("role"), event["task"])
+                entry = tasks.setdefault(key, {"task": event["task"], "role": event.get("role"),
+                                               "seconds": 0.0, "status": "ok"})
+                entry["seconds"] += event.get("duration", 0.0)
+                mod = _item_module(event.get("item"), wanted)
+                if mod:
+                    module_seconds[mod] = module_seconds.get(mod, 0.0) + event.get("duration", 0.0)
+                status = event.get("status")
+                if status in ("failed", "unreachable"):
+                    entry["status"] = "failed"
+                    if mod:
+                        failed_modules.add(mod)
+                    else:
+                        unattributed = True
+                    label = f" ({mod or event.get('item')})" if event.get("item") is not None else ""
+                    errors.append(f"{event['task']}{label}: {event.get('msg', '')}".strip())
+                    if not quiet:
+                        console.print(f"  [red]failed[/red] {errors[-1]}")
+                elif status == "ok" and event.get("changed") and not quiet and event.get("item") is not None:
+                    console.print(f"  [yellow]changed[/yellow] {mod or event['item']}")
+        returncode = proc.wait()
+    finally:
+        timer.cancel()
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+
+    ok = returncode == 0
+    if not ok and not errors:
+        errors.extend(line for line in other if line.strip())
+    if not ok and (unattributed or not failed_modules):
+        failed_modules = None
+    return {
+        "ok": ok,
+        "seconds": round(time.monotonic() - start, 3),
+        "modules": list(modules),
+        "tasks": [{**t, "seconds": round(t["seconds"], 3)} for t in tasks.values()],
+        "module_seconds": {m: round(s, 3) for m, s in module_seconds.items()},
+        "errors": errors,
+        "failed_modules": None if failed_modules is None else sorted(failed_modules),
+    }
+
+
+def record_timings(summary: dict) -> None:
+    """Append a summary to TIMINGS_LOG; logging failures never fail an apply."""
+    entry = {"time": datetime.now().isoformat(timespec="seconds"),
+             **{k: v for k, v in summary.items() if k not in ("errors", "failed_modules")}}
+    try:
+        TIMINGS_LOG.parent.mkdir(parents=True, exist_ok=True)
+        with open(TIMINGS_LOG, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+    except OSError:
+        pass
+
+
+def slowest(summaries: list[dict], top: int = 5) -> tuple[list[tuple[str, float]], list[tuple[str, float]]]:
+    """Return the top (task, seconds) and (module, seconds) across summaries."""
+    task_totals: dict[str, float] = {}
+    module_totals: dict[str, float] = {}
+    for summary in summaries:
+        for t in summary.get("tasks", []):
+            label = f"{t['role']} : {t['task']}" if t.get("role") else t["task"]
+            task_totals[label] = task_totals.get(label, 0.0) + t["seconds"]
+        for name, seconds in summary.get("module_seconds", {}).items():
+            module_totals[name] = module_totals.get(name, 0.0) + seconds
+
+    def top_n(totals: dict[str, float]) -> list[tuple[str, float]]:
+        return sorted(totals.items(), key=lambda kv: kv[1], reverse=True)[:top]
+
+    return top_n(task_totals), top_n(module_totals)
+
+
+def format_slowest(summaries: list[dict], top: int = 5) -> str:
+    """One-line "slowest ..." digest for the sync log; empty when nothing was timed."""
+    tasks, modules = slowest(summaries, top)
+    parts = []
+    if modules:
+        parts.append("slowest modules: " + ", ".join(f"{n} {s:.1f}s" for n, s in modules))
+    if tasks:
+        parts.append("slowest tasks: " + ", ".join(f"{n} {s:.1f}s" for n, s in tasks))
+    return "; ".join(parts)
+
+
+def print_slowest(summaries: list[dict], top: int = 5) -> None:
+    """Print the slowest modules and tasks of this sync."""
+    tasks, modules = slowest(summaries, top)
+    if modules:
+        console.print("[bold]Slowest modules[/bold]")
+        for name, seconds in modules:
+            console.print(f"  {seconds:7.1f}s  {name}")
+    if tasks:
+        console.print("[bold]Slowest tasks[/bold]")
+        for name, seconds in tasks:
+            console.print(f"  {seconds:7.1f}s  {name}")
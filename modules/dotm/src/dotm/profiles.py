@@ -0,0 +1,96 @@
+"""Batched, atomic editing of playbooks/profiles.yml."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+
+class ProfilesDocument:
+    """profiles.yml read and parsed once; base_modules edits are written by one save().
+
+    Only the base_modules block is regenerated on save; comments, host
+    mappings and per-profile overrides are kept line for line. Usable as a
+    context manager that saves on a clean exit:
+
+        with ProfilesDocument(path) as doc:
+            doc.add("git", "zsh")
+            doc.remove("old")
+    """
+
+    def __init__(self, path: Path):
+        import yaml
+
+        self.path = path
+        self.exists = path.exists()
+        self.lines = path.read_text().splitlines(keepends=True) if self.exists else []
+        data = yaml.safe_load("".join(self.lines)) if self.lines else None
+        self.data = data if isinstance(data, dict) else {}
+        self.base_modules: list[str] = list(self.data.get("base_modules") or [])
+        self.dirty = False
+
+    def __enter__(self) -> ProfilesDocument:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.save()
+
+    def add(self, *names: str) -> list[str]:
+        """Add modules to base_modules, keeping it sorted. Returns those newly added."""
+        added = [n for n in dict.fromkeys(names) if n not in self.base_modules]
+        if added:
+            self.base_modules = sorted(self.base_modules + added)
+            self.dirty = True
+        return added
+
+    def remove(self, *names: str) -> list[str]:
+        """Remove modules from base_modules, keeping order. Returns those removed."""
+        removed = [n for n in dict.fromkeys(names) if n in self.base_modules]
+        if removed:
+            self.base_modules = [m for m in self.base_modules if m not in removed]
+            self.dirty = True
+        return removed
+
+    def render(self) -> str:
+        """Return the file text with the base_modules block rebuilt from self.base_modules."""
+        out = []
+        in_base_block = False
+        found = False
+        for line in self.lines:
+            stripped = line.lstrip()
+            if not found and stripped.startswith("base_modules:"):
+                in_base_block = found = True
+                indent = line[: len(line) - len(stripped)]
+                out.append(f"{indent}base_modules:\n")
+                out.extend(f"{indent}  - {mod}\n" for mod in self.base_modules)
+                continue
+            if in_base_block:
+                if stripped.startswith("- ") and not stripped.startswith("- name:"):
+                    continue  # Old entry, replaced above
+                in_base_block = False
+            out.append(line)
+        if not found:
+            if out and not out[-1].endswith("\n"):
+                out[-1] += "\n"
+            out.append("base_modules:\n")
+            out.extend(f"  - {mod}\n" for mod in self.base_modules)
+        return "".join(out)
+
+    def save(self) -> bool:
+        """Write pending edits via a temp file and rename. Returns True if written."""
+        if not self.dirty:
+            return False
+        text = self.render()
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            tmp.write_text(text)
+            if self.exists:
+                os.chmod(tmp, os.stat(self.path).st_mode & 0o7777)
+            os.replace(tmp, self.path)
+        finally:
+            tmp.unlink(missing_ok=True)
+        self.lines = text.splitlines(keepends=True)
+        self.exists = True
+        self.dirty = False
+        return True
@@ -0,0 +1,157 @@
+"""Persistent module index so config.yml files are parsed only when they change."""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+from dotm.config import CONFIG_DIR
+
+INDEX_FILE = CONFIG_DIR / "module-index.json"
+INDEX_VERSION = 1
+
+# In-process snapshots keyed by modules directory
+_snapshots: dict[Path, list[dict]] = {}
+
+
+def _module_entry(name: str, path: Path, config: dict) -> dict:
+    """Build the module dict shape shared by list/status/verify/analyze/catalog."""
+    return {
+        "name": name,
+        "path": path,
+        "config": config,
+        "homebrew_packages": config.get("homebrew_packages", []),
+        "homebrew_casks": config.get("homebrew_casks", []),
+        "homebrew_taps": config.get("homebrew_taps", []),
+        "mas_installed_apps": config.get("mas_installed_apps", []),
+        "stow_dirs": config.get("stow_dirs", []),
+        "mergeable_files": config.get("mergeable_files", []),
+        "depends_on": config.get("depends_on", []),
+    }
+
+
+def _load() -> dict:
+    """The whole index file, empty if missing, from another version or corrupt."""
+    try:
+        with open(INDEX_FILE) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+        return {}
+    return data
+
+
+def _read_index(modules_dir: Path) -> dict:
+    """Load cached entries for modules_dir, empty if missing, stale or corrupt."""
+    data = _load()
+    if data.get("modules_dir") != str(modules_dir):
+        return {}
+    return data.get("modules", {})
+
+
+def _write_index(modules_dir: Path, entries: dict) -> None:
+    """Persist the module entries, keeping the cached profiles entry."""
+    data = _load()
+    data.update(version=INDEX_VERSION, modules_dir=str(modules_dir), modules=entries)
+    _write(data)
+
+
+def _write(data: dict) -> None:
+    """Atomically persist the index; failures only cost a re-parse next time."""
+    tmp = INDEX_FILE.with_suffix(".tmp")
+    try:
+        INDEX_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, INDEX_FILE)
+    except OSError:
+        pass
+
+
+def _json_safe(config) -> bool:
+    """True when config survives a JSON round trip unchanged (no dates, int keys, ...)."""
+    try:
+        return json.loads(json.dumps(config)) == config
+    except (TypeError, ValueError):
+        return False
+
+
+def build_index(modules_dir: Path) -> list[dict]:
+    """Scan modules_dir, re-parsing only config.yml files whose mtime/size changed.
+
+    A config JSON cannot hold exactly is left out of the index file and
+    parsed again on every cold start.
+    """
+    if not modules_dir.exists():
+        return []
+
+    cached = _read_index(modules_dir)
+    entries: dict[str, dict] = {}
+    uncached: set[str] = set()
+    dirty = False
+
+    with os.scandir(modules_dir) as it:
+        mod_dirs = sorted((e for e in it if e.is_dir()), key=lambda e: e.name)
+
+    for mod_dir in mod_dirs:
+        try:
+            st = os.stat(os.path.join(mod_dir.path, "config.yml"))
+        except OSError:
+            continue
+        prev = cached.get(mod_dir.name)
+        if prev and prev["mtime_ns"] == st.st_mtime_ns and prev["size"] == st.st_size:
+            entries[mod_dir.name] = prev
+            continue
+        # Deferred: a fully cached index never needs the YAML parser
+        import yaml
+        with open(os.path.join(mod_dir.path, "config.yml")) as f:
+            config = yaml.safe_load(f) or {}
+        entries[mod_dir.name] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "config": config}
+        if _json_safe(config):
+            dirty = True
+        else:
+            uncached.add(mod_dir.name)
+
+    stored = {name: entry for name, entry in entries.items() if name not in uncached}
+    if dirty or stored.keys() != cached.keys():
+        _write_index(modules_dir, stored)
+
+    return [_module_entry(name, modules_dir / name, entry["config"]) for name, entry in entries.items()]
+
+
+def get_modules(modules_dir: Path) -> list[dict]:
+    """Return the in-process module snapshot, building it on first use.
+
+    Each module dict is a shallow copy, but its lists and "config" are
+    shared by every caller in the process and must not be mutated.
+    """
+    snapshot = _snapshots.get(modules_dir)
+    if snapshot is None:
+        snapshot = build_index(modules_dir)
+        _snapshots[modules_dir] = snapshot
+    return [dict(m) for m in snapshot]
+
+
+def get_base_modules(profiles_path: Path) -> list[str]:
+    """base_modules from profiles.yml, re-parsed only when the file's stat changed."""
+    try:
+        st = os.stat(profiles_path)
+    except OSError:
+        return []
+    key = [str(profiles_path), st.st_mtime_ns, st.st_size, st.st_ino]
+    data = _load()
+    cached = data.get("profiles")
+    if isinstance(cached, dict) and cached.get("key") == key:
+        return list(cached["base_modules"])
+    from dotm.profiles import ProfilesDocument
+    base_modules = ProfilesDocument(profiles_path).base_modules
+    data.update(version=INDEX_VERSION, profiles={"key": key, "base_modules": base_modules})
+    _write(data)
+    return list(base_modules)
+
+
+def invalidate() -> None:
+    """Drop in-process snapshots so the next lookup rescans modules/."""
+    _snapshots.clear()
@@ -0,0 +1,136 @@
+"""Persistent secret-scan result cache keyed by file content hash."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+from dotm.config import CONFIG_DIR
+
+SCAN_CACHE = CONFIG_DIR / "scan-cache.json"
+CACHE_VERSION = 2
+
+# Upper bound on cached content hashes; least recently used are evicted first
+MAX_ENTRIES = 5000
+
+# In-process state, loaded lazily by _state_for()
+_digest: str | None = None
+_hashes: OrderedDict[str, list] = OrderedDict()
+_paths: dict[str, list] = {}
+_new: list[tuple] = []
+_dirty = False
+
+
+def content_hash(data) -> str:
+    """Hash raw file content: bytes or any buffer such as an mmap."""
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def stat_key(st: os.stat_result) -> list:
+    """The cheap pre-check fields: mtime, size and inode."""
+    return [st.st_mtime_ns, st.st_size, st.st_ino]
+
+
+def _state_for(digest: str) -> None:
+    """Load the on-disk cache for this pattern-set digest, once per process."""
+    global _digest, _hashes, _paths, _dirty
+    if _digest == digest:
+        return
+    _digest, _hashes, _paths, _dirty = digest, OrderedDict(), {}, False
+    try:
+        with open(SCAN_CACHE) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return
+    if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+        return
+    if data.get("patterns") != digest:
+        return
+    _hashes = OrderedDict(data.get("hashes", {}))
+    _paths = data.get("paths", {})
+
+
+def _findings(entry: list) -> list[tuple[int, str, str]]:
+    """Convert JSON-decoded findings back to tuples."""
+    return [tuple(finding) for finding in entry]
+
+
+def lookup_path(digest: str, path: str, st: os.stat_result) -> list[tuple[int, str, str]] | None:
+    """Return cached findings if path's mtime/size/inode are unchanged."""
+    _state_for(digest)
+    known = _paths.get(path)
+    if known is None or known[0] != stat_key(st):
+        return None
+    return lookup_hash(digest, known[1])
+
+
+def lookup_hash(digest: str, content_digest: str) -> list[tuple[int, str, str]] | None:
+    """Return cached findings for identical content, marking it recently used."""
+    _state_for(digest)
+    entry = _hashes.get(content_digest)
+    if entry is None:
+        return None
+    _hashes.move_to_end(content_digest)
+    return _findings(entry)
+
+
+def store(digest: str, path: str, st: os.stat_result, content_digest: str,
+          findings: list[tuple[int, str, str]]) -> None:
+    """Record findings for content and remember which content path currently holds."""
+    _state_for(digest)
+    entry = (path, stat_key(st), content_digest, [list(f) for f in findings])
+    _add(entry)
+    _new.append(entry)
+
+
+def _add(entry: tuple) -> None:
+    """Insert one (path, stat_key, content_hash, findings) entry, evicting LRU content."""
+    global _dirty
+    path, key, content_digest, findings = entry
+    _hashes[content_digest] = findings
+    _hashes.move_to_end(content_digest)
+    _paths[path] = [key, content_digest]
+    while len(_hashes) > MAX_ENTRIES:
+        _hashes.popitem(last=False)
+    _dirty = True
+
+
+def drain_new() -> list[tuple]:
+    """Return and forget entries stored since the last drain (for worker hand-back)."""
+    entries = list(_new)
+    _new.clear()
+    return entries
+
+
+def merge(digest: str, entries: list[tuple]) -> None:
+    """Fold entries produced by worker processes into this process's cache."""
+    _state_for(digest)
+    for entry in entries:
+        _add(entry)
+
+
+def save() -> None:
+    """Persist the cache if it changed; path entries for evicted content are dropped."""
+    global _dirty
+    if not _dirty or _digest is None:
+        return
+    paths = {p: v for p, v in _paths.items() if v[1] in _hashes}
+    data = {"version": CACHE_VERSION, "patterns": _digest, "hashes": _hashes, "paths": paths}
+    tmp = SCAN_CACHE.with_name(f"{SCAN_CACHE.name}.{os.getpid()}.tmp")
+    try:
+        SCAN_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, SCAN_CACHE)
+    except OSError:
+        return
+    _dirty = False
+
+
+def invalidate() -> None:
+    """Forget in-process state; the next lookup reloads from disk."""
+    global _digest, _hashes, _paths, _dirty
+    _digest, _hashes, _paths, _dirty = None, OrderedDict(), {}, False
+    _new.clear()
@@ -2,11 +2,22 @@
 
 from __future__ import annotations
 
+import hashlib
+import mmap
+import os
 import re
+from bisect import bisect_right
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+from itertools import accumulate
 from pathlib import Path
 
 from rich.console import Console
 
+from dotm import scancache
+from dotm.config import DEFAULT_CONFIG, get_scan_settings
+
 console = Console()
 
 # Patterns that indicate secrets
@@ -23,6 +34,55 @@ SECRET_PATTERNS = [
     (re.compile(r"(?i)bearer\s+[A-Za-z0-9_.~+/=-]{20,}"), "Bearer token"),
 ]
 
+# Literal keywords every match of the named pattern must contain (case-insensitively).
+# A buffer containing none of them cannot match any pattern and skips the regex pass.
+PATTERN_KEYWORDS = {
+    "Private key": ("-----BEGIN",),
+    "AWS access key": ("AKIA",),
+    "API key/token": ("api", "secret", "access", "auth"),
+    "Password": ("passw", "pwd"),
+    "GitHub personal access token": ("ghp_",),
+    "GitHub OAuth token": ("gho_",),
+    "GitHub fine-grained PAT": ("github_pat_",),
+    "OpenAI API key": ("sk-",),
+    "Slack token": ("xox",),
+    "Bearer token": ("bearer",),
+}
+
+# Characters every match of the named pattern can start with, including what
+# (?i) folds onto them (U+017F LONG S matches "s"). Patterns missing here
+# disable the first-character lookahead in combine_patterns().
+PATTERN_FIRST_CHARS = {
+    "Private key": "-",
+    "AWS access key": "A",
+    "API key/token": "AaSs\u017f",
+    "Password": "Pp",
+    "GitHub personal access token": "g",
+    "GitHub OAuth token": "g",
+    "GitHub fine-grained PAT": "g",
+    "OpenAI API key": "s",
+    "Slack token": "x",
+    "Bearer token": "Bb",
+}
+
+# scan_paths(jobs=None) only starts a process pool for at least this many files
+PARALLEL_MIN_FILES = 200
+
+# Larger files are skipped; the `scan.max_file_bytes` config key overrides this
+MAX_FILE_BYTES = DEFAULT_CONFIG["scan"]["max_file_bytes"]
+
+# Files at least this large are memory-mapped and scanned with the bytes patterns
+MMAP_MIN_BYTES = 1024 * 1024
+
+# A NUL byte within the first block marks a file as binary
+SNIFF_BYTES = 8192
+
+# Bytes kept either side of a match on a very long line (minified JSON and the like)
+LINE_WINDOW = 64 * 1024
+
+# Slice size for newline counting and the prefilter over mapped files
+_CHUNK = 1024 * 1024
+
 # File extensions to skip (binary/non-text)
 SKIP_EXTENSIONS = {
     ".png", ".jpg", ".jpeg", ".gif", ".ico", ".webp", ".svg",
@@ -38,51 +98,464 @@ SKIP_FILES = {
 }
 
 
-def scan_file(filepath: Path) -> list[tuple[int, str, str]]:
-    """Scan a single file for secret patterns. Returns list of (line_num, pattern_name, line)."""
+def combine_patterns(patterns: list[tuple[re.Pattern, str]]) -> re.Pattern:
+    """Compile (pattern, name) pairs into one alternation with a named group each.
+
+    Leading global flags such as (?i) are rewritten as scoped groups so the
+    patterns can share one regex. A lookahead on the first characters from
+    PATTERN_FIRST_CHARS lets the engine skip most positions without trying
+    every alternative. Bytes patterns produce a bytes regex.
+    """
+    is_bytes = isinstance(patterns[0][0].pattern, bytes)
+    parts = []
+    first_chars: set[str] | None = set()
+    for i, (pattern, name) in enumerate(patterns):
+        source = pattern.pattern.decode("latin-1") if is_bytes else pattern.pattern
+        flags = re.match(r"\(\?([aiLmsux]+)\)", source)
+        if flags:
+            source = f"(?{flags.group(1)}:{source[flags.end():]})"
+        parts.append(f"(?P<p{i}>{source})")
+        chars = PATTERN_FIRST_CHARS.get(name)
+        first_chars = None if chars is None or first_chars is None else first_chars | set(chars)
+    if first_chars and is_bytes:
+        # Bytes patterns fold ASCII letters only
+        first_chars = {c for c in first_chars if c.isascii()}
+    if not first_chars:
+        combined = "|".join(parts)
+    else:
+        charset = "".join(sorted(re.escape(c) for c in first_chars))
+        combined = f"(?=[{charset}])(?:{'|'.join(parts)})"
+    return re.compile(combined.encode("latin-1") if is_bytes else combined)
+
+
+COMBINED_PATTERN = combine_patterns(SECRET_PATTERNS)
+
+# Bytes twins for memory-mapped files; here (?i) folds ASCII letters only
+BYTES_PATTERNS = [(re.compile(pattern.pattern.encode()), name) for pattern, name in SECRET_PATTERNS]
+BYTES_COMBINED_PATTERN = combine_patterns(BYTES_PATTERNS)
+
+
+def _prefilter_keywords(patterns: list[tuple[re.Pattern, str]]) -> tuple[str, ...] | None:
+    """Casefolded keyword set for the patterns, None if any pattern has no keywords."""
+    keywords = set()
+    for _pattern, name in patterns:
+        if not PATTERN_KEYWORDS.get(name):
+            return None
+        keywords.update(k.casefold() for k in PATTERN_KEYWORDS[name])
+    # Drop keywords that contain a shorter keyword; the shorter one already matches
+    return tuple(sorted(k for k in keywords if not any(o != k and o in k for o in keywords)))
+
+
+PREFILTER_KEYWORDS = _prefilter_keywords(SECRET_PATTERNS)
+BYTES_KEYWORDS = None if PREFILTER_KEYWORDS is None else tuple(k.encode() for k in PREFILTER_KEYWORDS)
+
+
+def _regex_fold_pairs() -> tuple[tuple[str, str], ...] | None:
+    """(char, partner) pairs the regex engine folds beyond str.casefold(), e.g. dotless i.
+
+    The table lives in a private module of re; None when it is unavailable.
+    """
+    try:
+        from re import _casefix
+        extra_cases = _casefix._EXTRA_CASES
+    except (ImportError, AttributeError):
+        return None
+
+    pairs = set()
+    for base, others in extra_cases.items():
+        group = (base, *others)
+        for member in group:
+            if member != min(group):
+                pairs.add((chr(member), chr(min(group))))
+    return tuple(sorted(pairs))
+
+
+_FOLD_PAIRS = _regex_fold_pairs()
+
+# Counters for the keyword prefilter and scan cache; see reset_scan_stats()
+scan_stats = {"scanned": 0, "prefiltered": 0, "cached": 0, "binary": 0, "oversized": 0}
+
+
+def reset_scan_stats() -> None:
+    """Zero the scan_stats counters."""
+    for key in scan_stats:
+        scan_stats[key] = 0
+
+
+def has_candidate(content: str) -> bool:
+    """Cheap literal check: could any secret pattern match somewhere in content?
+
+    Casefolding is at least as permissive as the patterns' own matching, so a
+    False here is always safe. Each keyword is a C-level substring search,
+    which beats a pure-Python Aho-Corasick automaton for this handful of needles.
+    """
+    if PREFILTER_KEYWORDS is None:
+        return True
+    folded = content.casefold()
+    if not folded.isascii():
+        if _FOLD_PAIRS is None:
+            # Unknown extra folds: only the regex can tell
+            return True
+        for char, partner in _FOLD_PAIRS:
+            if char in folded:
+                folded = folded.replace(char, partner)
+    return any(k in folded for k in PREFILTER_KEYWORDS)
+
+
+def scan_text(content: str) -> list[tuple[int, str, str]]:
+    """Scan a text buffer in a single regex pass. Returns list of (line_num, pattern_name, line).
+
+    The combined pattern runs once over the whole buffer; only the lines its
+    matches touch are checked against the individual patterns, which keeps
+    findings identical to a line-by-line scan. Buffers without any prefilter
+    keyword skip the regex entirely.
+    """
+    scan_stats["scanned"] += 1
+    if not has_candidate(content):
+        scan_stats["prefiltered"] += 1
+        return []
+
+    spans = [m.span() for m in COMBINED_PATTERN.finditer(content)]
+    if not spans:
+        return []
+
+    # Line boundaries use splitlines() semantics so numbering matches
+    lines = content.splitlines()
+    starts = list(accumulate((len(line) for line in content.splitlines(keepends=True)), initial=0))
+    candidates = set()
+    for start, end in spans:
+        first = bisect_right(starts, start) - 1
+        last = bisect_right(starts, max(start, end - 1)) - 1
+        candidates.update(range(first, min(last, len(lines) - 1) + 1))
+
+    findings = []
+    for idx in sorted(candidates):
+        line = lines[idx]
+        for pattern, name in SECRET_PATTERNS:
+            if pattern.search(line):
+                findings.append((idx + 1, name, line.strip()[:120]))
+    return findings
+
+
+def is_binary(head: bytes) -> bool:
+    """Content sniff: text files have no NUL byte in their first block."""
+    return b"\0" in head[:SNIFF_BYTES]
+
+
+def has_candidate_bytes(buf) -> bool:
+    """has_candidate() for a bytes-like buffer, lowercasing one bounded slice at a time."""
+    if BYTES_KEYWORDS is None:
+        return True
+    overlap = max(len(k) for k in BYTES_KEYWORDS) - 1
+    for offset in range(0, len(buf), _CHUNK):
+        chunk = buf[max(0, offset - overlap):offset + _CHUNK].lower()
+        if any(k in chunk for k in BYTES_KEYWORDS):
+            return True
+    return False
+
+
+def _count_newlines(buf, start: int, end: int) -> int:
+    """Count b"\\n" in buf[start:end] without copying more than _CHUNK bytes at once."""
+    return sum(buf[i:min(i + _CHUNK, end)].count(b"\n") for i in range(start, end, _CHUNK))
+
+
+def _line_bounds(buf, pos: int) -> tuple[int, int]:
+    """Return (start, end) of the line holding pos, clipped to LINE_WINDOW either side."""
+    lo = max(0, pos - LINE_WINDOW)
+    start = buf.rfind(b"\n", lo, pos) + 1 or lo
+    hi = min(len(buf), pos + LINE_WINDOW)
+    end = buf.find(b"\n", pos, hi)
+    return start, hi if end == -1 else end
+
+
+def scan_buffer(buf) -> list[tuple[int, str, str]]:
+    """Scan a bytes-like buffer, typically an mmap, without decoding or copying it whole.
+
+    Works like scan_text() with the bytes patterns: one combined pass, then
+    only the lines a match touches are confirmed. Lines split on b"\\n" only.
+    """
+    scan_stats["scanned"] += 1
+    if not has_candidate_bytes(buf):
+        scan_stats["prefiltered"] += 1
+        return []
+
+    found: dict[tuple[int, int], str] = {}
+    line_num, counted = 1, 0
+    for match in BYTES_COMBINED_PATTERN.finditer(buf):
+        start, end = match.span()
+        line_num += _count_newlines(buf, counted, start)
+        counted = start
+        pos, num = start, line_num
+        while True:
+            line_start, line_end = _line_bounds(buf, pos)
+            line = buf[line_start:line_end]
+            for idx, (pattern, _name) in enumerate(BYTES_PATTERNS):
+                if (num, idx) not in found and pattern.search(line):
+                    found[(num, idx)] = line.decode("utf-8", errors="ignore").strip()[:120]
+            # Follow matches that run on past a newline, as scan_text() does
+            if end - 1 <= line_end or buf[line_end:line_end + 1] != b"\n":
+                break
+            pos, num = line_end + 1, num + 1
+    return [(num, BYTES_PATTERNS[idx][1], text) for (num, idx), text in sorted(found.items())]
+
+
+def _patterns_digest() -> str:
+    """Hash of everything that decides scan results, so cached findings never go stale."""
+    material = repr((
+        [(pattern.pattern, pattern.flags, name) for pattern, name in SECRET_PATTERNS],
+        sorted(PATTERN_KEYWORDS.items()),
+        MMAP_MIN_BYTES,
+        LINE_WINDOW,
+    ))
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+PATTERNS_DIGEST = _patterns_digest()
+
+
+def scan_file(filepath: Path, *, use_cache: bool = True,
+              max_bytes: int | None = None) -> list[tuple[int, str, str]]:
+    """Scan a single file for secret patterns. Returns list of (line_num, pattern_name, line).
+
+    Files larger than max_bytes (default MAX_FILE_BYTES) and files with a NUL
+    byte in their first block are skipped. Files of MMAP_MIN_BYTES or more are
+    memory-mapped and scanned in place, so peak memory does not grow with
+    file size. Results are cached by content hash; a file whose mtime, size
+    and inode are unchanged is not even read.
+    """
     if filepath.suffix.lower() in SKIP_EXTENSIONS:
         return []
     if filepath.name in SKIP_FILES:
         return []
 
-    findings = []
     try:
-        content = filepath.read_text(errors="ignore")
-    except (OSError, UnicodeDecodeError):
+        st = os.stat(filepath)
+    except OSError:
+        return []
+    if st.st_size > (MAX_FILE_BYTES if max_bytes is None else max_bytes):
+        scan_stats["oversized"] += 1
         return []
+    if use_cache:
+        cached = scancache.lookup_path(PATTERNS_DIGEST, str(filepath), st)
+        if cached is not None:
+            scan_stats["cached"] += 1
+            return cached
 
-    for i, line in enumerate(content.splitlines(), 1):
-        for pattern, name in SECRET_PATTERNS:
-            if pattern.search(line):
-                findings.append((i, name, line.strip()[:120]))
-    return findings
+    try:
+        with open(filepath, "rb") as f:
+            head = f.read(SNIFF_BYTES)
+            if is_binary(head):
+                scan_stats["binary"] += 1
+                return []
+            if st.st_size >= MMAP_MIN_BYTES:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                    return _scan_content(filepath, st, buf, use_cache)
+            return _scan_content(filepath, st, head + f.read(), use_cache)
+    except (OSError, ValueError):
+        # ValueError: the file was truncated to zero bytes before it could be mapped
+        return []
 
 
-def scan_module(module_path: Path) -> list[tuple[Path, int, str, str]]:
-    """Scan all files in a module for secrets. Returns list of (file, line, pattern, text)."""
-    findings = []
-    for f in module_path.rglob("*"):
-        if f.is_file() and ".git" not in f.parts:
-            for line_num, pattern_name, text in scan_file(f):
-                findings.append((f, line_num, pattern_name, text))
+def _scan_content(filepath: Path, st: os.stat_result, data, use_cache: bool) -> list[tuple[int, str, str]]:
+    """Scan file content held in bytes or an mmap, going through the cache when enabled."""
+    def scan():
+        if isinstance(data, mmap.mmap):
+            return scan_buffer(data)
+        return scan_text(data.decode("utf-8", errors="ignore"))
+
+    if not use_cache:
+        return scan()
+
+    digest = scancache.content_hash(data)
+    findings = scancache.lookup_hash(PATTERNS_DIGEST, digest)
+    if findings is not None:
+        scan_stats["cached"] += 1
+    else:
+        findings = scan()
+    scancache.store(PATTERNS_DIGEST, str(filepath), st, digest, findings)
     return findings
 
 
-def scan_repo(repo_path: Path) -> list[tuple[Path, int, str, str]]:
-    """Scan the entire dotfiles repo for secrets."""
+def _scan_chunk(paths: list[Path],
+                max_bytes: int | None = None) -> tuple[list[tuple[Path, int, str, str]], dict, list[tuple]]:
+    """Scan a chunk of files, returning findings, the scan_stats it added and new cache entries."""
+    before = dict(scan_stats)
     findings = []
+    for f in paths:
+        for line_num, pattern_name, text in scan_file(f, max_bytes=max_bytes):
+            findings.append((f, line_num, pattern_name, text))
+    stats = {key: scan_stats[key] - before[key] for key in before}
+    return findings, stats, scancache.drain_new()
+
+
+def scan_paths(paths: list[Path], jobs: int | None = None, *, max_bytes: int | None = None,
+               keep: Callable[[tuple], bool] | None = None,
+               fail_fast: bool = False) -> list[tuple[Path, int, str, str]]:
+    """Scan files, fanning out across a process pool when worthwhile.
+
+    jobs=1 scans serially, jobs=N uses N worker processes and jobs=None picks
+    the CPU count once there are at least PARALLEL_MIN_FILES files. Findings
+    come back in the order of `paths` regardless of which worker scanned them.
+    Files whose cached stat entry still matches never leave this process.
+    max_bytes defaults to the `scan.max_file_bytes` config setting.
+
+    keep filters findings (e.g. drops baselined ones). With fail_fast the scan
+    stops at the first file or chunk yielding a kept finding, so the result
+    may be partial but is never empty when something new exists.
+    """
+    if max_bytes is None:
+        max_bytes = get_scan_settings()["max_file_bytes"]
+    if keep is None:
+        keep = lambda finding: True  # noqa: E731
+    scancache.drain_new()
+    findings_by_path: dict[Path, list[tuple[Path, int, str, str]]] = {}
+    pending = []
+    for f in paths:
+        try:
+            cached = scancache.lookup_path(PATTERNS_DIGEST, str(f), os.stat(f))
+        except OSError:
+            cached = None
+        if cached is None:
+            pending.append(f)
+        else:
+            scan_stats["cached"] += 1
+            findings_by_path[f] = [(f, *finding) for finding in cached if keep((f, *finding))]
+            if fail_fast and findings_by_path[f]:
+                return findings_by_path[f]
+
+    if jobs is None:
+        jobs = (os.cpu_count() or 1) if len(pending) >= PARALLEL_MIN_FILES else 1
+    if jobs <= 1 or len(pending) < 2:
+        if fail_fast:
+            results = []
+            for f in pending:
+                results.append(_scan_chunk([f], max_bytes))
+                if any(keep(finding) for finding in results[-1][0]):
+                    break
+        else:
+            results = [_scan_chunk(pending, max_bytes)]
+        scancache.drain_new()
+    else:
+        chunk_size = max(1, -(-len(pending) // (jobs * 4)))
+        chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+        with ProcessPoolExecutor(max_workers=min(jobs, len(chunks))) as pool:
+            if fail_fast:
+                results = _first_hit(pool, chunks, max_bytes, keep)
+            else:
+                results = _merge_chunks(pool.map(partial(_scan_chunk, max_bytes=max_bytes), chunks))
+
+    for chunk_findings, _stats, _entries in results:
+        for finding in chunk_findings:
+            if keep(finding):
+                findings_by_path.setdefault(finding[0], []).append(finding)
+    scancache.save()
+
+    return [finding for f in paths for finding in findings_by_path.get(f, [])]
+
+
+def _first_hit(pool: ProcessPoolExecutor, chunks: list[list[Path]], max_bytes: int,
+               keep: Callable[[tuple], bool]) -> list[tuple]:
+    """Merge chunk results as they complete, cancelling the rest once one has a kept finding."""
+    futures = [pool.submit(_scan_chunk, chunk, max_bytes) for chunk in chunks]
+    results = []
+    for future in as_completed(futures):
+        results.extend(_merge_chunks([future.result()]))
+        if any(keep(finding) for finding in results[-1][0]):
+            pool.shutdown(wait=False, cancel_futures=True)
+            break
+    return results
+
+
+def _merge_chunks(results) -> list[tuple]:
+    """Fold worker stats and cache entries into this process, keeping chunk order."""
+    results = list(results)
+    for _findings, stats, entries in results:
+        for key, value in stats.items():
+            scan_stats[key] += value
+        scancache.merge(PATTERNS_DIGEST, entries)
+    return results
+
+
+def git_files(path: Path) -> list[Path] | None:
+    """List tracked plus untracked-but-not-ignored files under path via one `git ls-files -z`.
+
+    Returns None when path is not inside a git work tree (or git is missing).
+    """
+    import subprocess
+
+    try:
+        result = subprocess.run(
+            ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+            capture_output=True, cwd=path, timeout=30,
+        )
+    except (subprocess.TimeoutExpired, FileNotFoundError, NotADirectoryError):
+        return None
+    if result.returncode != 0:
+        return None
+    names = {os.fsdecode(name) for name in result.stdout.split(b"\0") if name}
+    return sorted(f for f in (path / name for name in names) if f.is_file())
+
+
+def module_files(module_path: Path) -> list[Path]:
+    """Return the files in a module that should be scanned, in sorted order.
+
+    Inside a git repo this honours .gitignore (skipping virtualenvs, node_modules
+    and build output); elsewhere it falls back to walking the directory.
+    """
+    files = git_files(module_path)
+    if files is not None:
+        return files
+    return sorted(f for f in module_path.rglob("*") if f.is_file() and ".git" not in f.parts)
+
+
+def scan_module(module_path: Path, jobs: int | None = 1) -> list[tuple[Path, int, str, str]]:
+    """Scan all files in a module for secrets. Returns list of (file, line, pattern, text)."""
+    return scan_paths(module_files(module_path), jobs=jobs)
+
+
+def scan_repo(repo_path: Path, jobs: int | None = None, *, keep: Callable[[tuple], bool] | None = None,
+              fail_fast: bool = False) -> list[tuple[Path, int, str, str]]:
+    """Scan the entire dotfiles repo for secrets. keep/fail_fast as for scan_paths()."""
+    files: list[Path] = []
     modules_dir = repo_path / "modules"
     if modules_dir.exists():
-        for mod_dir in modules_dir.iterdir():
-            if mod_dir.is_dir():
-                findings.extend(scan_module(mod_dir))
-    return findings
+        tracked = git_files(modules_dir)
+        if tracked is not None:
+            # Only files inside a module directory, as with the per-module walk
+            files = [f for f in tracked if len(f.relative_to(modules_dir).parts) > 1]
+        else:
+            for mod_dir in sorted(modules_dir.iterdir()):
+                if mod_dir.is_dir():
+                    files.extend(module_files(mod_dir))
+    return scan_paths(files, jobs=jobs, keep=keep, fail_fast=fail_fast)
 
 
-def scan_changed_files(repo_path: Path) -> list[tuple[Path, int, str, str]]:
-    """Scan only git-changed files for secrets."""
+def scan_baseline_candidates(repo_path: Path, jobs: int | None = None) -> list[tuple[Path, int, str, str]]:
+    """Findings anywhere a push can scan: every tracked or untracked file, plus the diff.
+
+    Covers files outside modules/ (playbooks/, top-level docs) that scan_repo()
+    leaves out but scan_diff() reports, so `--update-baseline` can record them.
+    """
+    files = git_files(repo_path)
+    if files is None:
+        return scan_repo(repo_path, jobs=jobs)
+    findings = scan_paths(files, jobs=jobs)
+    return findings + scan_diff(repo_path, jobs=jobs)
+
+
+def scan_changed_files(repo_path: Path, jobs: int | None = None, *, staged: bool = False,
+                       keep: Callable[[tuple], bool] | None = None,
+                       fail_fast: bool = False) -> list[tuple[Path, int, str, str]]:
+    """Scan only git-changed files for secrets.
+
+    With staged=True the index versions are scanned (see scan_staged) instead
+    of the working-tree files. keep/fail_fast as for scan_paths().
+    """
     import subprocess
 
+    if staged:
+        return scan_staged(repo_path, keep=keep, fail_fast=fail_fast)
+
     try:
         result = subprocess.run(
             ["git", "diff", "--name-only", "--cached", "HEAD"],
@@ -98,15 +571,204 @@ def scan_changed_files(repo_path: Path) -> list[tuple[Path, int, str, str]]:
     except (subprocess.TimeoutExpired, FileNotFoundError):
         return []
 
+    files = [repo_path / rel_path for rel_path in sorted(changed)]
+    return scan_paths([f for f in files if f.is_file()], jobs=jobs, keep=keep, fail_fast=fail_fast)
+
+
+# Tree object git uses for "nothing"; lets `git diff` work before the first commit
+EMPTY_TREE = "4b825dc642cb6eb9a060e54bf8d69288fbee4904"
+
+
+def _unquote_git_path(path: str) -> str:
+    """Undo git's C-style quoting of unusual paths ("a\\tb", "caf\\303\\251")."""
+    if not (path.startswith('"') and path.endswith('"')):
+        return path
+    raw = path[1:-1].encode("latin-1", "backslashreplace").decode("unicode_escape")
+    return raw.encode("latin-1").decode("utf-8", errors="replace")
+
+
+def parse_added_lines(diff: str) -> dict[str, list[tuple[int, str]]]:
+    """Parse `git diff -U0` output into {path: [(new_line_num, text), ...]} of added lines."""
+    added: dict[str, list[tuple[int, str]]] = {}
+    path = None
+    line_num = 0
+    in_hunk = False
+    for line in diff.split("\n"):
+        if line.startswith("diff --git "):
+            path, in_hunk = None, False
+        elif not in_hunk and line.startswith("+++ "):
+            # git ends the header with a TAB when the path holds a space
+            target = line[4:].rstrip("\t")
+            path = None if target == "/dev/null" else _unquote_git_path(target)[2:]
+        elif line.startswith("@@"):
+            # @@ -a,b +c,d @@ — added lines start at c
+            new_range = line.split(" ")[2]
+            line_num = int(new_range[1:].split(",")[0])
+            in_hunk = True
+        elif in_hunk and path is not None and line.startswith("+"):
+            added.setdefault(path, []).append((line_num, line[1:]))
+            line_num += 1
+    return added
+
+
+def scan_added_lines(lines: list[tuple[int, str]]) -> list[tuple[int, str, str]]:
+    """Scan added lines as one buffer, reporting findings at their new-file line numbers."""
+    buffer = "\n".join(text for _, text in lines)
+    # A diff line may hold characters splitlines() treats as breaks (\r, \x0c);
+    # every piece keeps the diff line's number. The "\n" makes a trailing
+    # break count as it does inside the joined buffer.
+    line_map = [num for num, text in lines for _ in range(len((text + "\n").splitlines()))]
+    return [(line_map[idx - 1], name, text) for idx, name, text in scan_text(buffer)]
+
+
+def scan_diff(repo_path: Path, jobs: int | None = None, *, keep: Callable[[tuple], bool] | None = None,
+              fail_fast: bool = False) -> list[tuple[Path, int, str, str]]:
+    """Scan only what a push would add: added diff lines plus untracked files.
+
+    Staged and unstaged changes come from one `git diff -U0 HEAD` stream, so the
+    cost follows the size of the change rather than the size of touched files.
+    Untracked (not ignored) files are new in full and are scanned whole.
+    keep/fail_fast as for scan_paths().
+    """
+    import subprocess
+
+    try:
+        head = subprocess.run(
+            ["git", "rev-parse", "--verify", "-q", "HEAD"],
+            capture_output=True, text=True, cwd=repo_path, timeout=10,
+        )
+        base = "HEAD" if head.returncode == 0 else EMPTY_TREE
+        diff = subprocess.run(
+            # Explicit prefixes: parse_added_lines strips "b/" whatever diff.noprefix
+            # or diff.mnemonicPrefix say
+            ["git", "-c", "core.quotePath=false", "diff", "-U0", "--no-color", "--no-ext-diff",
+             "--no-renames", "--src-prefix=a/", "--dst-prefix=b/", base],
+            capture_output=True, cwd=repo_path, timeout=30,
+        )
+        untracked = subprocess.run(
+            ["git", "ls-files", "-z", "--others", "--exclude-standard"],
+            capture_output=True, cwd=repo_path, timeout=30,
+        )
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        return []
+    if diff.returncode != 0:
+        return []
+
     findings = []
-    for rel_path in changed:
-        f = repo_path / rel_path
-        if f.is_file():
-            for line_num, pattern_name, text in scan_file(f):
-                findings.append((f, line_num, pattern_name, text))
+    added = parse_added_lines(diff.stdout.decode("utf-8", errors="ignore"))
+    for rel_path in sorted(added):
+        filepath = repo_path / rel_path
+        if filepath.suffix.lower() in SKIP_EXTENSIONS or filepath.name in SKIP_FILES:
+            continue
+        for line_num, pattern_name, text in scan_added_lines(added[rel_path]):
+            finding = (filepath, line_num, pattern_name, text)
+            if keep is None or keep(finding):
+                findings.append(finding)
+        if fail_fast and findings:
+            return findings
+
+    new_files = sorted(repo_path / os.fsdecode(name) for name in untracked.stdout.split(b"\0") if name)
+    findings.extend(scan_paths([f for f in new_files if f.is_file()], jobs=jobs, keep=keep, fail_fast=fail_fast))
     return findings
 
 
+def staged_blobs(repo_path: Path) -> list[tuple[str, str]]:
+    """Return [(path, blob_sha)] for files added, copied, modified or renamed in the index."""
+    import subprocess
+
+    try:
+        head = subprocess.run(
+            ["git", "rev-parse", "--verify", "-q", "HEAD"],
+            capture_output=True, text=True, cwd=repo_path, timeout=10,
+        )
+        base = "HEAD" if head.returncode == 0 else EMPTY_TREE
+        result = subprocess.run(
+            ["git", "diff-index", "--cached", "-z", "--no-renames", "--diff-filter=ACM", base],
+            capture_output=True, cwd=repo_path, timeout=30,
+        )
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        return []
+    if result.returncode != 0:
+        return []
+
+    # Records are ":<old mode> <new mode> <old sha> <new sha> <status>\0<path>\0"
+    fields = result.stdout.split(b"\0")
+    blobs = []
+    for meta, path in zip(fields[0::2], fields[1::2]):
+        if meta.startswith(b":"):
+            blobs.append((os.fsdecode(path), meta.split()[3].decode()))
+    return blobs
+
+
+def read_blobs(repo_path: Path, shas: list[str], max_bytes: int | None = None) -> Iterator[tuple[str, bytes | None]]:
+    """Stream blob contents through one long-lived `git cat-file --batch` process.
+
+    Blobs larger than max_bytes (by the batch header) are drained in
+    _CHUNK pieces without being kept and yielded with None as their data.
+    """
+    import subprocess
+
+    if not shas:
+        return
+    proc = subprocess.Popen(
+        ["git", "cat-file", "--batch"],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, cwd=repo_path,
+    )
+    try:
+        for sha in shas:
+            proc.stdin.write(f"{sha}\n".encode())
+            proc.stdin.flush()
+            header = proc.stdout.readline().split()
+            if len(header) != 3:
+                # "<sha> missing" — nothing else to read for this object
+                continue
+            size = int(header[2])
+            if max_bytes is not None and size > max_bytes:
+                while size > 0:
+                    size -= len(proc.stdout.read(min(size, _CHUNK)))
+                data = None
+            else:
+                data = proc.stdout.read(size)
+            proc.stdout.read(1)  # trailing newline
+            yield sha, data
+    finally:
+        proc.stdin.close()
+        proc.stdout.close()
+        proc.wait()
+
+
+def scan_staged(repo_path: Path, *, keep: Callable[[tuple], bool] | None = None,
+                fail_fast: bool = False) -> list[tuple[Path, int, str, str]]:
+    """Scan the staged (index) version of each changed file — exactly what will be committed.
+
+    Suitable as a fast pre-commit hook via `dotm scan --staged`.
+    keep/fail_fast as for scan_paths().
+    """
+    blobs = [(path, sha) for path, sha in staged_blobs(repo_path)
+             if Path(path).suffix.lower() not in SKIP_EXTENSIONS and Path(path).name not in SKIP_FILES]
+    paths_by_sha: dict[str, list[str]] = {}
+    for path, sha in blobs:
+        paths_by_sha.setdefault(sha, []).append(path)
+
+    max_bytes = get_scan_settings()["max_file_bytes"]
+    findings_by_path: dict[str, list[tuple[Path, int, str, str]]] = {}
+    for sha, data in read_blobs(repo_path, list(paths_by_sha), max_bytes=max_bytes):
+        if data is None:
+            scan_stats["oversized"] += 1
+            continue
+        if is_binary(data):
+            scan_stats["binary"] += 1
+            continue
+        found = scan_text(data.decode("utf-8", errors="ignore"))
+        for path in paths_by_sha[sha]:
+            findings_by_path[path] = [(repo_path / path, *finding) for finding in found
+                                      if keep is None or keep((repo_path / path, *finding))]
+        if fail_fast and any(findings_by_path[path] for path in paths_by_sha[sha]):
+            break
+
+    return [finding for path in sorted(findings_by_path) for finding in findings_by_path[path]]
+
+
 def print_scan_results(findings: list[tuple[Path, int, str, str]], base_path: Path | None = None) -> bool:
     """Print scan results. Returns True if secrets were found."""
     if not findings:
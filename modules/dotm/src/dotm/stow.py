@@ -0,0 +1,182 @@
+"""Native symlink deployment for stow-only modules, without an ansible run.
+
+Mirrors what the dotmodules role does for a module with nothing but
+files/: copy the module into ~/.dotmodules/<name>, assemble files shared
+through mergeable_files into ~/.dotmodules/merged, and link every file
+into ~/ the way `stow --adopt` would.
+"""
+
+from __future__ import annotations
+
+import filecmp
+import os
+import shutil
+import threading
+from pathlib import Path
+
+from dotm import targets
+
+# config.yml keys this engine fully handles; any other key (packages, MAS
+# apps, git_repositories, macos_defaults, ...) is role work for ansible
+STOW_ONLY_KEYS = frozenset({"stow_dirs", "mergeable_files", "depends_on"})
+
+# Held while applying modules that share merged files, so concurrent applies
+# never assemble a merged file from a half-mirrored module
+_merge_lock = threading.Lock()
+
+
+def is_stow_only(mod: dict) -> bool:
+    """True when a module only deploys files: no config key beyond STOW_ONLY_KEYS is set."""
+    used = {key for key, value in mod["config"].items() if value}
+    return bool(mod["stow_dirs"]) and used <= STOW_ONLY_KEYS
+
+
+def _dotmodules_dir() -> Path:
+    return Path.home() / ".dotmodules"
+
+
+def _mirror(src: Path, dest: Path) -> None:
+    """Make dest an exact copy of src, copying only files that differ."""
+    dest.mkdir(parents=True, exist_ok=True)
+    wanted = set()
+    for entry in os.scandir(src):
+        wanted.add(entry.name)
+        target = dest / entry.name
+        if entry.is_dir(follow_symlinks=False):
+            if target.is_symlink() or (target.exists() and not target.is_dir()):
+                target.unlink()
+            _mirror(Path(entry.path), target)
+        elif not (target.is_file() and not target.is_symlink()
+                  and filecmp.cmp(entry.path, target, shallow=True)):
+            if target.is_dir() and not target.is_symlink():
+                shutil.rmtree(target)
+            elif target.is_symlink() or target.exists():
+                target.unlink()
+            shutil.copy2(entry.path, target, follow_symlinks=False)
+    for entry in os.scandir(dest):
+        if entry.name not in wanted:
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path)
+            else:
+                os.unlink(entry.path)
+
+
+def _files(files_dir: Path) -> list[str]:
+    """Relative paths of every file under a module's files/ tree."""
+    rels = []
+    for dirpath, _dirnames, filenames in os.walk(files_dir):
+        rel_dir = os.path.relpath(dirpath, files_dir)
+        rels.extend(os.path.normpath(os.path.join(rel_dir, f)) for f in filenames)
+    return rels
+
+
+def is_mergeable(mod: dict, rel: str) -> bool:
+    """True when rel (relative to files/ or ~/) is listed in mergeable_files, by path or name."""
+    return rel in mod["mergeable_files"] or os.path.basename(rel) in mod["mergeable_files"]
+
+
+def merge_sources(modules: list[dict]) -> dict[str, list[Path]]:
+    """Map each mergeable file to its deployed sources, in module name order."""
+    dotmodules = _dotmodules_dir()
+    sources: dict[str, list[Path]] = {}
+    for mod in sorted(modules, key=lambda m: m["name"]):
+        if not mod["stow_dirs"] or not mod["mergeable_files"]:
+            continue
+        files_dir = dotmodules / mod["name"] / "files"
+        for rel in _files(files_dir) if files_dir.is_dir() else []:
+            if is_mergeable(mod, rel):
+                sources.setdefault(rel, []).append(files_dir / rel)
+    return sources
+
+
+def _assemble(rel: str, sources: list[Path]) -> Path:
+    """Write the merged file for rel if its contents changed; return its path."""
+    merged = _dotmodules_dir() / "merged" / rel
+    parts = []
+    for src in sources:
+        text = src.read_text()
+        parts.append(text if text.endswith("\n") or not text else text + "\n")
+    content = "".join(parts)
+    if not merged.is_file() or merged.read_text() != content:
+        merged.parent.mkdir(parents=True, exist_ok=True)
+        tmp = merged.with_name(f"{merged.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(content)
+        os.replace(tmp, merged)
+    return merged
+
+
+def _link(target: Path, src: Path, result: dict) -> None:
+    """Point target at src unless it already resolves there.
+
+    Our own stale links are replaced and regular files are adopted into
+    the deployed copy (stow --adopt); anything else is a conflict.
+    """
+    if os.path.realpath(target) == os.path.realpath(src):
+        return
+    if target.is_symlink():
+        if not os.path.realpath(target).startswith(str(_dotmodules_dir()) + os.sep):
+            result["conflicts"].append(target)
+            return
+        target.unlink()
+    elif target.is_dir():
+        result["conflicts"].append(target)
+        return
+    elif target.exists():
+        os.replace(target, src)
+        result["adopted"].append(target)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.symlink_to(os.path.relpath(src, target.parent))
+    result["linked"].append(target)
+
+
+def apply_modules(names: list[str], modules: list[dict], repo_modules_dir: Path,
+                  refresh: bool = True) -> dict:
+    """Deploy the stow-only modules in names from repo_modules_dir into ~/.
+
+    modules is every installed module: mergeable files are assembled from
+    all of them, as the role does, not just from names. Safe to call from
+    several threads for different modules; pass refresh=False there and
+    refresh the target index once afterwards. Returns the "linked",
+    "removed", "adopted", "kept" and "conflicts" targets.
+    """
+    by_name = {m["name"]: m for m in modules}
+    if any(by_name[name]["mergeable_files"] for name in names):
+        with _merge_lock:
+            return _apply(names, by_name, modules, repo_modules_dir, refresh)
+    return _apply(names, by_name, modules, repo_modules_dir, refresh)
+
+
+def _apply(names: list[str], by_name: dict, modules: list[dict], repo_modules_dir: Path,
+           refresh: bool) -> dict:
+    home = Path.home()
+    dotmodules = _dotmodules_dir()
+    result = {"linked": [], "removed": [], "adopted": [], "kept": [], "conflicts": []}
+
+    previous = {name: targets.module_targets(name) for name in names}
+    for name in names:
+        _mirror(repo_modules_dir / name, dotmodules / name)
+    merges = merge_sources(modules)
+
+    for name in names:
+        mod = by_name[name]
+        files_dir = dotmodules / name / "files"
+        wanted = set()
+        for rel in _files(files_dir) if files_dir.is_dir() else []:
+            target = home / rel
+            wanted.add(target)
+            if is_mergeable(mod, rel):
+                if target.exists() and not target.is_symlink():
+                    # Local edits to a merged file are left alone
+                    result["kept"].append(target)
+                    continue
+                _link(target, _assemble(rel, merges[rel]), result)
+            else:
+                _link(target, files_dir / rel, result)
+        for target, src in previous[name].items():
+            if target not in wanted and target.is_symlink() and os.path.realpath(target) == str(src):
+                target.unlink()
+                result["removed"].append(target)
+
+    if refresh:
+        targets.refresh()
+    return result
@@ -2,17 +2,33 @@
 
 from __future__ import annotations
 
+import json
+import os
 import subprocess
 import sys
+import time
+from datetime import datetime
+from pathlib import Path
 
 from rich.console import Console
 
-from dotm.config import get_dotfiles_repo, get_excluded_modules
-from dotm.modules import get_deploy_modules
-from dotm.security import scan_changed_files, print_scan_results
+from dotm import targets
+from dotm.baseline import BASELINE_NAME, baseline_path, new_findings_filter
+from dotm.config import CONFIG_DIR, LOG_DIR, get_dotfiles_repo, get_excluded_modules, get_modules_dir
+from dotm.modules import get_deploy_modules, list_all_modules
 
 console = Console()
 
+# Commit and module list of the last successful apply, for incremental sync
+SYNC_STATE = CONFIG_DIR / "sync-state.json"
+STATE_VERSION = 1
+
+# One line per sync run; the launchd job also appends its stdout here
+SYNC_LOG = LOG_DIR / "sync.log"
+
+# Repo paths outside modules/ whose changes can affect every module
+FULL_APPLY_PATHS = ("playbooks/", "requirements.yml")
+
 
 def git_pull(repo_path, quiet: bool = False) -> bool:
     """Pull latest changes from remote."""
@@ -31,23 +47,37 @@ def git_pull(repo_path, quiet: bool = False) -> bool:
     return True
 
 
-def ansible_apply(repo_path, excluded: list[str], quiet: bool = False) -> bool:
-    """Run ansible-playbook with the effective module list."""
+def ansible_apply(repo_path, excluded: list[str], quiet: bool = False,
+                  modules: list[str] | None = None, timings: list[dict] | None = None) -> bool:
+    """Run ansible-playbook with the effective module list, or only `modules` if given.
+
+    Playbook events are streamed as they happen and the run's per-task and
+    per-module timings are appended to the timings log and to `timings`.
+    """
+    from dotm.playbook import record_timings, run_playbook
+
     deploy_yml = repo_path / "playbooks" / "deploy.yml"
     if not deploy_yml.exists():
         if not quiet:
             console.print("[red]deploy.yml not found[/red]")
         return False
 
-    all_modules = get_deploy_modules()
-    effective = [m for m in all_modules if m not in excluded]
+    if modules is None:
+        from dotm.graph import dependency_graph, ordered
 
-    if not quiet:
-        console.print(f"[dim]Applying {len(effective)} modules (excluding {len(excluded)})...[/dim]")
+        all_modules = get_deploy_modules()
+        effective = [m for m in all_modules if m not in excluded]
+        # Dependencies first, for roles that deploy in list order
+        effective = ordered(effective, dependency_graph(list_all_modules()))
+        if not quiet:
+            console.print(f"[dim]Applying {len(effective)} modules (excluding {len(excluded)})...[/dim]")
+    else:
+        effective = list(modules)
+        if not quiet:
+            console.print(f"[dim]Applying {len(effective)} changed module(s): {', '.join(effective)}[/dim]")
 
     # Build the install list as extra vars
-    install_json = "[" + ", ".join(f'"{m}"' for m in effective) + "]"
-    extra_vars = f'{{"final_modules": {install_json}}}'
+    extra_vars = json.dumps({"final_modules": effective})
 
     inventory = repo_path / "playbooks" / "inventory"
     cmd = [
@@ -56,36 +86,346 @@ def ansible_apply(repo_path, excluded: list[str], quiet: bool = False) -> bool:
         "--extra-vars", extra_vars,
     ]
 
-    if quiet:
-        result = subprocess.run(cmd, capture_output=True, text=True, cwd=repo_path, timeout=600)
-    else:
-        result = subprocess.run(cmd, text=True, cwd=repo_path, timeout=600)
+    summary = run_playbook(cmd, repo_path, effective, quiet=quiet, timeout=600)
+    record_timings(summary)
+    if timings is not None:
+        timings.append(summary)
 
-    if result.returncode != 0:
+    if not summary["ok"]:
         if not quiet:
             console.print("[red]Ansible apply failed[/red]")
-            if hasattr(result, "stderr") and result.stderr:
-                console.print(result.stderr[:500])
+        for error in summary["errors"][:5]:
+            log_sync(f"ansible: {error}")
         return False
 
+    targets.refresh()
     return True
 
 
-def run_sync(quiet: bool = False) -> bool:
-    """Full sync: pull + apply."""
+def _native_apply(name: str, installed: list[dict], quiet: bool = False,
+                  timings: list[dict] | None = None) -> bool:
+    """Link one stow-only module without ansible; False if any target conflicts."""
+    from dotm.stow import apply_modules
+
+    start = time.monotonic()
+    result = apply_modules([name], installed, get_modules_dir(), refresh=False)
+    if timings is not None:
+        timings.append({"tasks": [], "module_seconds": {name: round(time.monotonic() - start, 3)}})
+    home = Path.home()
+    if not quiet:
+        for key in ("linked", "removed", "adopted"):
+            for target in result[key]:
+                console.print(f"  [dim]{name}: {key}[/dim] ~/{target.relative_to(home)}")
+        for target in result["conflicts"]:
+            console.print(f"  [yellow]{name}: conflict[/yellow] ~/{target.relative_to(home)}")
+    return not result["conflicts"]
+
+
+def scheduled_apply(repo_path, excluded: list[str], names: list[str], effective: list[str],
+                    jobs: int | None = None, quiet: bool = False,
+                    timings: list[dict] | None = None) -> dict[str, str]:
+    """Apply names in depends_on order, independent modules concurrently.
+
+    Stow-only modules are linked natively, each on its own worker; the
+    rest go to ansible-playbook in batches of whatever is ready, one
+    playbook at a time since Homebrew does not tolerate concurrent runs.
+    When a batch fails on loop items naming modules, only those modules
+    fail and the rest of the batch is applied again without them (ansible
+    stops the host at the first failed task). A failure that cannot be
+    tied to a module fails the whole batch. Returns {name: "ok" | "failed" | "skipped"}; raises ValueError on a
+    dependency cycle.
+    """
+    from dotm.graph import dependency_graph, run_graph
+    from dotm.stow import is_stow_only
+
+    all_modules = list_all_modules()
+    by_name = {m["name"]: m for m in all_modules}
+    installed = [by_name[n] for n in effective if n in by_name]
+    native = {n for n in names if n in by_name and is_stow_only(by_name[n])}
+    if not quiet and native:
+        console.print(f"[dim]Linking {len(native)} stow-only module(s) without ansible[/dim]")
+
+    def run(batch: list[str]) -> bool | dict[str, bool]:
+        if batch[0] in native:
+            return _native_apply(batch[0], installed, quiet=quiet, timings=timings)
+        outcome: dict[str, bool] = {}
+        while batch:
+            summaries: list[dict] = []
+            ok = ansible_apply(repo_path, excluded, quiet=quiet, modules=batch, timings=summaries)
+            if timings is not None:
+                timings.extend(summaries)
+            failed = set(summaries[-1].get("failed_modules") or ()) & set(batch) if summaries else set()
+            if ok or not failed or failed == set(batch):
+                outcome.update(dict.fromkeys(batch, ok))
+                break
+            outcome.update(dict.fromkeys(failed, False))
+            batch = [n for n in batch if n not in failed]
+        return outcome
+
+    def on_error(batch: list[str], error: Exception) -> None:
+        if not quiet:
+            console.print(f"[red]{', '.join(batch)} failed:[/red] {error!r}")
+        log_sync(f"{', '.join(batch)}: {error!r}")
+
+    targets.module_targets(names[0])  # Load the target index before the workers share it
+    try:
+        return run_graph(names, dependency_graph(all_modules), run, jobs=jobs,
+                         serial=set(names) - native, on_error=on_error)
+    finally:
+        targets.refresh()
+
+
+def git_head(repo_path) -> str | None:
+    """Return the commit HEAD points at, None if there is none."""
+    result = subprocess.run(
+        ["git", "rev-parse", "--verify", "-q", "HEAD"],
+        capture_output=True, text=True, cwd=repo_path, timeout=10,
+    )
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def remote_head(repo_path) -> str | None:
+    """Return the commit the current branch's upstream points at on the remote.
+
+    Asks the remote directly with `git ls-remote`, which transfers no
+    objects. None when detached, without an upstream, or unreachable.
+    """
+    try:
+        branch = subprocess.run(
+            ["git", "symbolic-ref", "-q", "HEAD"],
+            capture_output=True, text=True, cwd=repo_path, timeout=10,
+        ).stdout.strip()
+        if not branch:
+            return None
+        upstream = subprocess.run(
+            ["git", "for-each-ref", "--format=%(upstream:remotename)%00%(upstream:remoteref)", branch],
+            capture_output=True, text=True, cwd=repo_path, timeout=10,
+        ).stdout.strip()
+        remote, _, ref = upstream.partition("\0")
+        if not remote or not ref:
+            return None
+        result = subprocess.run(
+            ["git", "ls-remote", "--exit-code", remote, ref],
+            capture_output=True, text=True, cwd=repo_path, timeout=30,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.split(maxsplit=1)[0] if result.stdout else None
+
+
+def upstream_unchanged(repo_path) -> bool:
+    """True when HEAD is the last applied commit and the remote has nothing newer."""
+    state = load_sync_state(repo_path)
+    if state is None:
+        return False
+    head = git_head(repo_path)
+    return head == state["commit"] and remote_head(repo_path) == head
+
+
+def log_sync(result: str) -> None:
+    """Append a timestamped result line to the sync log."""
+    try:
+        SYNC_LOG.parent.mkdir(parents=True, exist_ok=True)
+        with open(SYNC_LOG, "a") as f:
+            f.write(f"{datetime.now().isoformat(timespec='seconds')} dotm sync: {result}\n")
+    except OSError:
+        pass
+
+
+def load_sync_state(repo_path) -> dict | None:
+    """Return the last successful apply of repo_path, None if unknown or corrupt."""
+    try:
+        with open(SYNC_STATE) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(state, dict) or state.get("version") != STATE_VERSION:
+        return None
+    if state.get("repo") != str(repo_path) or not state.get("commit"):
+        return None
+    return state
+
+
+def record_sync_state(repo_path, modules: list[str], pending: list[str] = ()) -> None:
+    """Atomically remember HEAD and the effective modules after an apply.
+
+    pending lists modules that failed or were skipped; the next sync
+    retries them even if nothing in them changes.
+    """
+    commit = git_head(repo_path)
+    if commit is None:
+        return
+    state = {"version": STATE_VERSION, "repo": str(repo_path), "commit": commit, "modules": sorted(modules),
+             "pending": sorted(pending)}
+    if load_sync_state(repo_path) == state:
+        return
+    tmp = SYNC_STATE.with_suffix(".tmp")
+    try:
+        SYNC_STATE.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, SYNC_STATE)
+    except OSError:
+        pass
+
+
+def changed_modules(repo_path, since: str) -> set[str] | None:
+    """Modules with files changed since commit `since`, committed or not.
+
+    Returns None when everything must be applied: `since` is unknown (e.g.
+    after a force-push) or files outside modules/ that drive every module
+    changed.
+    """
+    try:
+        diff = subprocess.run(
+            ["git", "diff", "--name-only", "-z", since, "--"],
+            capture_output=True, cwd=repo_path, timeout=30,
+        )
+        untracked = subprocess.run(
+            ["git", "ls-files", "-z", "--others", "--exclude-standard"],
+            capture_output=True, cwd=repo_path, timeout=30,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if diff.returncode != 0 or untracked.returncode != 0:
+        return None
+
+    names = set()
+    for raw in (diff.stdout + untracked.stdout).split(b"\0"):
+        path = os.fsdecode(raw)
+        parts = path.split("/")
+        if parts[0] == "modules" and len(parts) > 2:
+            names.add(parts[1])
+        elif path.startswith(FULL_APPLY_PATHS) and path != "playbooks/profiles.yml":
+            # profiles.yml only changes membership, which the effective list covers
+            return None
+    return names
+
+
+def drifted_modules(names: list[str]) -> list[str]:
+    """Stow modules whose links in ~/ no longer match what was deployed.
+
+    A module drifts when its ~/.dotmodules copy is gone, or a target is
+    missing or points elsewhere. Mergeable targets only need to exist,
+    since they may be links to the merged copy or local files.
+    """
+    from dotm.stow import is_mergeable
+
+    home = Path.home()
+    dotmodules = home / ".dotmodules"
+    by_name = {m["name"]: m for m in list_all_modules()}
+    drifted = []
+    for name in names:
+        mod = by_name.get(name)
+        if mod is None or not mod["stow_dirs"]:
+            continue
+        if not (dotmodules / name).is_dir():
+            drifted.append(name)
+            continue
+        for target, src in targets.module_targets(name).items():
+            if is_mergeable(mod, os.path.relpath(target, home)):
+                ok = target.exists()
+            else:
+                ok = target.resolve() == src
+            if not ok:
+                drifted.append(name)
+                break
+    return drifted
+
+
+def plan_incremental(repo_path, effective: list[str]) -> list[str] | None:
+    """Effective modules changed since the last apply, newly enabled, or drifted.
+
+    Returns None when a full apply is needed instead.
+    """
+    state = load_sync_state(repo_path)
+    if state is None:
+        return None
+    changed = changed_modules(repo_path, state["commit"])
+    if changed is None:
+        return None
+    changed |= set(effective) - set(state.get("modules", []))
+    changed |= set(state.get("pending", []))
+    changed |= set(drifted_modules(effective))
+    return [m for m in effective if m in changed]
+
+
+def run_sync(quiet: bool = False, full: bool = False, jobs: int | None = None) -> bool:
+    """Sync: pull, then apply the modules changed since the last successful apply.
+
+    The pull is skipped when the upstream still points at the last applied
+    commit. Without a recorded apply for this repo, or with full=True,
+    every effective module is applied in one playbook. Otherwise modules
+    are applied per depends_on on up to jobs workers; a failed module only
+    skips its dependents. Each run's outcome goes to SYNC_LOG.
+    """
     repo_path = get_dotfiles_repo()
     excluded = get_excluded_modules()
 
     if not repo_path.exists():
         if not quiet:
             console.print(f"[red]Dotfiles repo not found at {repo_path}[/red]")
+        log_sync(f"failed: repo not found at {repo_path}")
         return False
 
-    pull_ok = git_pull(repo_path, quiet=quiet)
-    if not pull_ok:
+    if not full and upstream_unchanged(repo_path):
+        if not quiet:
+            console.print("[dim]Remote unchanged since last apply; skipping pull.[/dim]")
+    elif not git_pull(repo_path, quiet=quiet):
+        log_sync("failed: git pull")
+        return False
+
+    effective = [m for m in get_deploy_modules() if m not in excluded]
+    modules = None if full else plan_incremental(repo_path, effective)
+    if modules == []:
+        record_sync_state(repo_path, effective)
+        if not quiet:
+            console.print("[green]Sync complete.[/green] [dim]No module changes to apply.[/dim]")
+        log_sync("up to date, nothing to apply")
+        return True
+
+    from dotm.graph import check_acyclic, dependency_graph
+    try:
+        check_acyclic(dependency_graph(list_all_modules()))
+    except ValueError as e:
+        if not quiet:
+            console.print(f"[red]{e}[/red]")
+        log_sync(f"failed: {e}")
         return False
 
-    apply_ok = ansible_apply(repo_path, excluded, quiet=quiet)
+    timings: list[dict] = []
+    if modules is None:
+        apply_ok = ansible_apply(repo_path, excluded, quiet=quiet, timings=timings)
+        if apply_ok:
+            record_sync_state(repo_path, effective)
+            log_sync("applied all modules")
+        else:
+            log_sync("failed: apply of all modules")
+    else:
+        status = scheduled_apply(repo_path, excluded, modules, effective, jobs=jobs, quiet=quiet,
+                                 timings=timings)
+        by_outcome = {}
+        for name, outcome in status.items():
+            by_outcome.setdefault(outcome, []).append(name)
+        pending = by_outcome.get("failed", []) + by_outcome.get("skipped", [])
+        record_sync_state(repo_path, effective, pending)
+        apply_ok = not pending
+        log_sync("; ".join(f"{outcome} {', '.join(names)}" for outcome, names in
+                           (("applied", by_outcome.get("ok")), ("failed", by_outcome.get("failed")),
+                            ("skipped", by_outcome.get("skipped"))) if names))
+        if not quiet:
+            for outcome in ("failed", "skipped"):
+                if by_outcome.get(outcome):
+                    console.print(f"[red]{outcome.capitalize()}:[/red] {', '.join(by_outcome[outcome])}")
+
+    from dotm.playbook import format_slowest, print_slowest
+    digest = format_slowest(timings)
+    if digest:
+        log_sync(digest)
+        if not quiet:
+            print_slowest(timings)
     if not quiet:
         if apply_ok:
             console.print("[green]Sync complete.[/green]")
@@ -95,15 +435,46 @@ def run_sync(quiet: bool = False) -> bool:
     return apply_ok
 
 
-def run_push(message: str | None = None, dry_run: bool = False) -> bool:
-    """Security scan, commit, and push changes."""
+def _stage_changes(repo_path) -> None:
+    """Stage module files and repo infrastructure."""
+    paths = ["modules/", "playbooks/", "CLAUDE.md"]
+    if baseline_path(repo_path).exists():
+        paths.append(BASELINE_NAME)
+    subprocess.run(
+        ["git", "add", *paths],
+        capture_output=True, text=True, cwd=repo_path,
+    )
+
+
+def run_push(message: str | None = None, dry_run: bool = False, jobs: int | None = None,
+             full_files: bool = False, index: bool = False, fail_fast: bool = False) -> bool:
+    """Security scan, commit, and push changes.
+
+    By default only added diff lines and untracked files are scanned;
+    full_files rescans every changed file in full. index stages first and
+    scans the staged blobs, i.e. exactly what will be committed. Findings in
+    the committed baseline are ignored; fail_fast stops at the first new one.
+    """
+    # Deferred so `dotm sync` does not pay for compiling the secret patterns
+    from dotm.security import print_scan_results, scan_changed_files, scan_diff
+
     repo_path = get_dotfiles_repo()
 
     # Security scan first
     console.print("[dim]Scanning for secrets...[/dim]")
-    findings = scan_changed_files(repo_path)
+    keep = new_findings_filter(repo_path)
+    if index:
+        if not dry_run:
+            _stage_changes(repo_path)
+        findings = scan_changed_files(repo_path, staged=True, keep=keep, fail_fast=fail_fast)
+    elif full_files:
+        findings = scan_changed_files(repo_path, jobs=jobs, keep=keep, fail_fast=fail_fast)
+    else:
+        findings = scan_diff(repo_path, jobs=jobs, keep=keep, fail_fast=fail_fast)
     if print_scan_results(findings, base_path=repo_path):
         console.print("[red]Push aborted — secrets detected. Remove them before pushing.[/red]")
+        if index and not dry_run:
+            console.print("[dim]Changes were staged but not committed.[/dim]")
         return False
 
     if dry_run:
@@ -119,11 +490,7 @@ def run_push(message: str | None = None, dry_run: bool = False) -> bool:
         console.print("[dim]Nothing to commit.[/dim]")
         return True
 
-    # Stage module files and repo infrastructure
-    subprocess.run(
-        ["git", "add", "modules/", "playbooks/", "CLAUDE.md"],
-        capture_output=True, text=True, cwd=repo_path,
-    )
+    _stage_changes(repo_path)
 
     # Commit
     if not message:
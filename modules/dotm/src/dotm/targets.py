@@ -0,0 +1,136 @@
+"""Index of managed symlink targets in ~/.dotmodules, persisted between runs."""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+from dotm.config import CONFIG_DIR
+
+TARGET_INDEX = CONFIG_DIR / "target-index.json"
+INDEX_VERSION = 1
+
+# In-process snapshot: {"dotmodules": str, "modules": {name: {"dirs": ..., "files": ...}}}
+_snapshot: dict | None = None
+
+
+def _dotmodules_dir() -> Path:
+    """Return the ansible role's deploy destination."""
+    return Path.home() / ".dotmodules"
+
+
+def _scan_module(files_dir: Path) -> dict:
+    """Walk one module's files/ tree, recording dir mtimes and rel target -> source."""
+    dirs: dict[str, int] = {}
+    files: dict[str, str] = {}
+    for dirpath, _dirnames, filenames in os.walk(files_dir):
+        rel_dir = os.path.relpath(dirpath, files_dir)
+        try:
+            dirs[rel_dir] = os.stat(dirpath).st_mtime_ns
+        except OSError:
+            continue
+        for filename in filenames:
+            src = os.path.join(dirpath, filename)
+            rel = os.path.normpath(os.path.join(rel_dir, filename))
+            files[rel] = os.path.realpath(src)
+    return {"dirs": dirs, "files": files}
+
+
+def _is_fresh(files_dir: Path, entry: dict) -> bool:
+    """A module entry is fresh while none of its directories changed mtime."""
+    for rel_dir, mtime_ns in entry["dirs"].items():
+        try:
+            if os.stat(files_dir / rel_dir).st_mtime_ns != mtime_ns:
+                return False
+        except OSError:
+            return False
+    return bool(entry["dirs"])
+
+
+def _read_index(dotmodules: Path) -> dict:
+    """Load cached module entries, empty if missing, stale or corrupt."""
+    try:
+        with open(TARGET_INDEX) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+        return {}
+    if data.get("dotmodules") != str(dotmodules):
+        return {}
+    return data.get("modules", {})
+
+
+def _write_index(dotmodules: Path, modules: dict) -> None:
+    """Atomically persist the index; failures only cost a re-walk next time."""
+    data = {"version": INDEX_VERSION, "dotmodules": str(dotmodules), "modules": modules}
+    tmp = TARGET_INDEX.with_suffix(".tmp")
+    try:
+        TARGET_INDEX.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, TARGET_INDEX)
+    except OSError:
+        pass
+
+
+def build_target_index(*, force: bool = False) -> dict[str, dict]:
+    """Load the target index, re-walking only modules whose directories changed."""
+    dotmodules = _dotmodules_dir()
+    if not dotmodules.is_dir():
+        return {}
+
+    cached = {} if force else _read_index(dotmodules)
+    modules: dict[str, dict] = {}
+    dirty = False
+    with os.scandir(dotmodules) as it:
+        names = sorted(e.name for e in it if e.is_dir())
+    for name in names:
+        files_dir = dotmodules / name / "files"
+        if not files_dir.is_dir():
+            continue
+        entry = cached.get(name)
+        if entry is None or not _is_fresh(files_dir, entry):
+            entry = _scan_module(files_dir)
+            dirty = True
+        modules[name] = entry
+
+    if dirty or modules.keys() != cached.keys():
+        _write_index(dotmodules, modules)
+    return modules
+
+
+def _modules() -> dict[str, dict]:
+    """Return the in-process snapshot, loading it on first use."""
+    global _snapshot
+    dotmodules = str(_dotmodules_dir())
+    if _snapshot is None or _snapshot["dotmodules"] != dotmodules:
+        _snapshot = {"dotmodules": dotmodules, "modules": build_target_index()}
+    return _snapshot["modules"]
+
+
+def module_targets(name: str) -> dict[Path, Path]:
+    """Return {target in ~/: source in ~/.dotmodules} for one module."""
+    home = Path.home()
+    entry = _modules().get(name)
+    if entry is None:
+        return {}
+    return {home / rel: Path(src) for rel, src in entry["files"].items()}
+
+
+def managed_sources() -> set[Path]:
+    """Reverse lookup set: every resolved source a managed symlink may point at."""
+    return {Path(src) for entry in _modules().values() for src in entry["files"].values()}
+
+
+def refresh() -> None:
+    """Rebuild the persisted index from scratch (called after a successful apply)."""
+    global _snapshot
+    _snapshot = {"dotmodules": str(_dotmodules_dir()), "modules": build_target_index(force=True)}
+
+
+def invalidate() -> None:
+    """Drop the in-process snapshot; the next lookup revalidates against disk."""
+    global _snapshot
+    _snapshot = None
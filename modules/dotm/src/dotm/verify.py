@@ -7,61 +7,51 @@ from pathlib import Path
 
 from rich.console import Console
 
+from dotm.inventory import gather_inventory, kinds_for_modules
 from dotm.modules import list_all_modules, get_deploy_modules
+from dotm.targets import module_targets
 
 console = Console()
 
 
-def _run(cmd: list[str]) -> set[str]:
-    """Run a command and return output as a set of lines."""
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-        if result.returncode != 0:
-            return set()
-        return {line.strip() for line in result.stdout.strip().splitlines() if line.strip()}
-    except (FileNotFoundError, subprocess.TimeoutExpired):
-        return set()
+def verify_module(mod: dict, inventory: dict | None = None) -> list[tuple[str, bool, str]]:
+    """Verify a single module's state. Returns list of (check_name, passed, detail).
 
-
-def verify_module(mod: dict) -> list[tuple[str, bool, str]]:
-    """Verify a single module's state. Returns list of (check_name, passed, detail)."""
+    inventory is a snapshot from gather_inventory(); without one, just the
+    kinds this module needs are gathered.
+    """
     checks = []
     name = mod["name"]
     home = Path.home()
     dotmodules_dir = home / ".dotmodules" / name
 
+    if inventory is None:
+        inventory = gather_inventory(kinds_for_modules([mod]))
+
     # Check homebrew packages
     if mod["homebrew_packages"]:
-        installed = _run(["brew", "list", "--formula", "-1"])
+        installed = inventory.get("formulae", set())
         for pkg in mod["homebrew_packages"]:
             present = pkg in installed
             checks.append((f"brew:{pkg}", present, "installed" if present else "missing"))
 
     # Check homebrew casks
     if mod["homebrew_casks"]:
-        installed = _run(["brew", "list", "--cask", "-1"])
+        installed = inventory.get("casks", set())
         for cask in mod["homebrew_casks"]:
             present = cask in installed
             checks.append((f"cask:{cask}", present, "installed" if present else "missing"))
 
     # Check homebrew taps
     if mod["homebrew_taps"]:
-        taps = _run(["brew", "tap"])
+        taps = inventory.get("taps", set())
         for tap in mod["homebrew_taps"]:
             present = tap in taps
             checks.append((f"tap:{tap}", present, "tapped" if present else "missing"))
 
     # Check MAS apps
     if mod["mas_installed_apps"]:
-        mas_raw = _run(["mas", "list"])
-        mas_ids = set()
-        for line in mas_raw:
-            parts = line.split(None, 1)
-            if parts:
-                try:
-                    mas_ids.add(int(parts[0]))
-                except ValueError:
-                    pass
+        mas_ids = inventory.get("mas", {})
         for app_id in mod["mas_installed_apps"]:
             present = app_id in mas_ids
             checks.append((f"mas:{app_id}", present, "installed" if present else "missing"))
@@ -70,14 +60,10 @@ def verify_module(mod: dict) -> list[tuple[str, bool, str]]:
     if mod["stow_dirs"]:
         files_dir = dotmodules_dir / "files"
         if files_dir.exists():
-            for src_file in files_dir.rglob("*"):
-                if src_file.is_dir():
-                    continue
-                rel = src_file.relative_to(files_dir)
-                target = home / rel
+            for target, expected in sorted(module_targets(name).items()):
+                rel = target.relative_to(home)
                 if target.is_symlink():
                     actual = target.resolve()
-                    expected = src_file.resolve()
                     if actual == expected:
                         checks.append((f"link:{rel}", True, "ok"))
                     else:
@@ -96,8 +82,13 @@ def verify_module(mod: dict) -> list[tuple[str, bool, str]]:
     return checks
 
 
-def run_verification(module_names: list[str] | None = None) -> dict[str, list[tuple[str, bool, str]]]:
-    """Run verification for specified modules (or all installed)."""
+def run_verification(module_names: list[str] | None = None, *,
+                     max_age: float = 0) -> dict[str, list[tuple[str, bool, str]]]:
+    """Run verification for specified modules (or all installed).
+
+    One inventory snapshot is gathered for the whole run (reusing a cached one
+    younger than max_age seconds) and shared by every module check.
+    """
     modules = list_all_modules()
     deployed = get_deploy_modules()
 
@@ -106,9 +97,11 @@ def run_verification(module_names: list[str] | None = None) -> dict[str, list[tu
     else:
         modules = [m for m in modules if m["name"] in deployed]
 
+    inventory = gather_inventory(kinds_for_modules(modules), max_age=max_age)
+
     results = {}
     for mod in modules:
-        results[mod["name"]] = verify_module(mod)
+        results[mod["name"]] = verify_module(mod, inventory)
     return results
 
 
@@ -132,8 +125,8 @@ def print_verification(results: dict[str, list[tuple[str, bool, str]]]) -> bool:
     return all_passed
 
 
-def run_doctor() -> list[tuple[str, bool, str]]:
-    """Run system-wide health checks."""
+def run_doctor(jobs: int | None = None, fail_fast: bool = False) -> list[tuple[str, bool, str]]:
+    """Run system-wide health checks. jobs and fail_fast are passed to the secret scan."""
     checks = []
 
     # uv installed?
@@ -180,10 +173,15 @@ def run_doctor() -> list[tuple[str, bool, str]]:
                     "loaded" if agent_loaded else "not loaded"))
 
     # Security scan
-    from dotm.security import scan_repo
-    findings = scan_repo(repo)
+    from dotm.baseline import new_findings_filter
+    from dotm.security import reset_scan_stats, scan_repo, scan_stats
+    reset_scan_stats()
+    findings = scan_repo(repo, jobs=jobs, keep=new_findings_filter(repo), fail_fast=fail_fast)
+    scanned = (f"{scan_stats['scanned']} files scanned, {scan_stats['prefiltered']} skipped by prefilter, "
+               f"{scan_stats['cached']} cached")
     checks.append(("secrets_scan", len(findings) == 0,
-                    "clean" if not findings else f"{len(findings)} potential secret(s) found"))
+                    f"clean ({scanned})" if not findings
+                    else f"{len(findings)} new potential secret(s) found ({scanned})"))
 
     return checks
 
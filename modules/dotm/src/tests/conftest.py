@@ -0,0 +1,33 @@
+"""Shared pytest fixtures for dotm tests."""
+
+import pytest
+
+from dotm import config, inventory, playbook, registry, scancache, sync, targets
+
+
+@pytest.fixture(autouse=True)
+def _isolate_caches(tmp_path, monkeypatch):
+    """Keep on-disk caches out of the real ~/.config/dotm and reset in-process state."""
+    monkeypatch.setattr(config, "CONFIG_DIR", tmp_path / "config")
+    monkeypatch.setattr(config, "CONFIG_FILE", tmp_path / "config" / "config.yml")
+    monkeypatch.setattr(config, "LOG_DIR", tmp_path / "config" / "logs")
+    monkeypatch.setattr(config, "CONFIG_CACHE", tmp_path / "config" / "config-cache.json")
+    monkeypatch.setattr(registry, "INDEX_FILE", tmp_path / "cache" / "module-index.json")
+    monkeypatch.setattr(inventory, "INVENTORY_CACHE", tmp_path / "cache" / "inventory.json")
+    # Never read the host's real Homebrew prefix from tests
+    monkeypatch.setattr(inventory, "HOMEBREW_PREFIXES", ())
+    monkeypatch.delenv("HOMEBREW_PREFIX", raising=False)
+    monkeypatch.setattr(targets, "TARGET_INDEX", tmp_path / "cache" / "target-index.json")
+    monkeypatch.setattr(scancache, "SCAN_CACHE", tmp_path / "cache" / "scan-cache.json")
+    monkeypatch.setattr(sync, "SYNC_STATE", tmp_path / "config" / "sync-state.json")
+    monkeypatch.setattr(sync, "SYNC_LOG", tmp_path / "config" / "logs" / "sync.log")
+    monkeypatch.setattr(playbook, "TIMINGS_LOG", tmp_path / "config" / "logs" / "apply-timings.jsonl")
+    config.invalidate()
+    registry.invalidate()
+    targets.invalidate()
+    scancache.invalidate()
+    yield
+    config.invalidate()
+    registry.invalidate()
+    targets.invalidate()
+    scancache.invalidate()
@@ -1,13 +1,19 @@
 """Tests for dotm.analyze module."""
 
+import subprocess
+import sys
+import threading
+import time
 from unittest.mock import patch
 
 from dotm.analyze import (
     analyze_brew,
     analyze_cask,
+    analyze_dotfiles,
     analyze_mas,
     get_managed_packages,
     get_managed_casks,
+    run_analysis,
 )
 
 
@@ -41,7 +47,7 @@ def test_get_managed_casks():
 def test_analyze_brew_with_mock():
     mods = _mock_modules(packages=["curl", "git"])
     with patch("dotm.analyze.list_all_modules", return_value=mods), \
-         patch("dotm.analyze._run", return_value=["curl", "git", "wget", "jq"]):
+         patch("dotm.inventory._run", return_value=["curl", "git", "wget", "jq"]):
         result = analyze_brew()
     assert result["installed"] == 4
     assert result["managed"] == 2
@@ -51,7 +57,7 @@ def test_analyze_brew_with_mock():
 def test_analyze_brew_all_managed():
     mods = _mock_modules(packages=["curl", "git"])
     with patch("dotm.analyze.list_all_modules", return_value=mods), \
-         patch("dotm.analyze._run", return_value=["curl", "git"]):
+         patch("dotm.inventory._run", return_value=["curl", "git"]):
         result = analyze_brew()
     assert result["unmanaged"] == []
 
@@ -59,7 +65,7 @@ def test_analyze_brew_all_managed():
 def test_analyze_cask_with_mock():
     mods = _mock_modules(casks=["firefox"])
     with patch("dotm.analyze.list_all_modules", return_value=mods), \
-         patch("dotm.analyze._run", return_value=["firefox", "slack", "zoom"]):
+         patch("dotm.inventory._run", return_value=["firefox", "slack", "zoom"]):
         result = analyze_cask()
     assert result["installed"] == 3
     assert result["managed"] == 1
@@ -69,7 +75,7 @@ def test_analyze_cask_with_mock():
 def test_analyze_mas_with_mock():
     mods = _mock_modules(mas=[123])
     with patch("dotm.analyze.list_all_modules", return_value=mods), \
-         patch("dotm.analyze._run", return_value=["123 MyApp (1.0)", "456 OtherApp (2.0)"]):
+         patch("dotm.inventory._run", return_value=["123 MyApp (1.0)", "456 OtherApp (2.0)"]):
         result = analyze_mas()
     assert result["installed"] == 2
     assert result["managed"] == 1
@@ -80,7 +86,118 @@ def test_analyze_mas_with_mock():
 def test_analyze_brew_command_fails():
     mods = _mock_modules(packages=["curl"])
     with patch("dotm.analyze.list_all_modules", return_value=mods), \
-         patch("dotm.analyze._run", return_value=[]):
+         patch("dotm.inventory._run", return_value=[]):
         result = analyze_brew()
     assert result["installed"] == 0
     assert result["unmanaged"] == []
+
+
+def test_run_analysis_runs_concurrently():
+    barrier = threading.Barrier(2, timeout=5)
+
+    def brew():
+        barrier.wait()
+        return {"installed": 1, "managed": 1, "unmanaged": []}
+
+    def cask():
+        barrier.wait()
+        return {"installed": 0, "managed": 0, "unmanaged": []}
+
+    with patch("dotm.analyze.list_all_modules", return_value=[]), \
+         patch("dotm.analyze.analyze_brew", brew), \
+         patch("dotm.analyze.analyze_cask", cask):
+        results = run_analysis(brew=True, cask=True)
+    assert set(results) == {"brew", "cask"}
+
+
+def test_run_analysis_partial_results_on_failure():
+    def boom():
+        raise RuntimeError("mas not installed")
+
+    with patch("dotm.analyze.list_all_modules", return_value=[]), \
+         patch("dotm.analyze.analyze_brew", return_value={"installed": 0, "managed": 0, "unmanaged": []}), \
+         patch("dotm.analyze.analyze_mas", boom):
+        results = run_analysis(brew=True, mas=True)
+    assert "brew" in results
+    assert "mas" not in results
+    assert results["errors"] == {"mas": "mas not installed"}
+
+
+def test_run_analysis_timeout():
+    release = threading.Event()
+
+    def slow():
+        release.wait(5)
+        return {"orphan_symlinks": []}
+
+    with patch("dotm.analyze.list_all_modules", return_value=[]), \
+         patch("dotm.analyze.analyze_brew", return_value={"installed": 0, "managed": 0, "unmanaged": []}), \
+         patch("dotm.analyze.analyze_dotfiles", slow):
+        results = run_analysis(brew=True, dotfiles=True, timeout=0.1)
+    release.set()
+    assert "brew" in results
+    assert "timed out" in results["errors"]["dotfiles"]
+
+
+def test_timed_out_analysis_does_not_delay_exit():
+    script = (
+        "import time\n"
+        "from unittest.mock import patch\n"
+        "from dotm.analyze import run_analysis\n"
+        "with patch('dotm.analyze.list_all_modules', return_value=[]), \\\n"
+        "     patch('dotm.analyze.analyze_dotfiles', lambda: time.sleep(10)):\n"
+        "    run_analysis(dotfiles=True, timeout=0.1)\n"
+    )
+    start = time.monotonic()
+    subprocess.run([sys.executable, "-c", script], check=True, timeout=30)
+    assert time.monotonic() - start < 5
+
+
+def _fake_home(tmp_path):
+    home = tmp_path / "home"
+    src = home / ".dotmodules" / "git" / "files" / ".gitconfig"
+    src.parent.mkdir(parents=True)
+    src.write_text("[user]\n")
+    (home / ".gitconfig").symlink_to(src)
+    elsewhere = tmp_path / "elsewhere"
+    elsewhere.mkdir()
+    (home / ".orphanrc").symlink_to(elsewhere)
+    deep = home / ".config" / "a" / "b" / "c"
+    deep.mkdir(parents=True)
+    (deep / "deep-link").symlink_to(elsewhere)
+    cache = home / ".config" / "node_modules"
+    cache.mkdir()
+    (cache / "pruned-link").symlink_to(elsewhere)
+    (home / ".config" / "shallow-link").symlink_to(elsewhere)
+    return home
+
+
+def test_analyze_dotfiles_prunes_and_bounds_depth(tmp_path):
+    home = _fake_home(tmp_path)
+    settings = {"max_depth": 1, "prune": ["node_modules"]}
+    with patch("dotm.analyze.Path.home", return_value=home), \
+         patch("dotm.analyze.get_analyze_settings", return_value=settings):
+        result = analyze_dotfiles()
+    assert result["orphan_symlinks"] == [".config/shallow-link", ".orphanrc"]
+    assert result["visited"] > 0
+    assert result["truncated"] is False
+
+
+def test_analyze_dotfiles_stops_at_limit(tmp_path):
+    home = _fake_home(tmp_path)
+    settings = {"max_depth": 6, "prune": []}
+    with patch("dotm.analyze.Path.home", return_value=home), \
+         patch("dotm.analyze.get_analyze_settings", return_value=settings):
+        result = analyze_dotfiles(limit=1)
+    assert len(result["orphan_symlinks"]) == 1
+    assert result["truncated"] is True
+
+
+def test_analyze_dotfiles_exactly_at_limit_is_not_truncated(tmp_path):
+    home = _fake_home(tmp_path)
+    settings = {"max_depth": 1, "prune": ["node_modules"]}
+    with patch("dotm.analyze.Path.home", return_value=home), \
+         patch("dotm.analyze.get_analyze_settings", return_value=settings):
+        result = analyze_dotfiles(limit=2)
+    assert result["orphan_symlinks"] == [".config/shallow-link", ".orphanrc"]
+    assert result["truncated"] is False
@@ -0,0 +1,89 @@
+"""Tests for dotm.baseline module."""
+
+import subprocess
+
+from dotm.baseline import (
+    BASELINE_NAME,
+    fingerprint,
+    load_baseline,
+    new_findings_filter,
+    write_baseline,
+)
+from dotm.security import scan_baseline_candidates, scan_diff, scan_repo
+
+
+def _repo(tmp_path, secrets=3):
+    repo = tmp_path / "repo"
+    mod_dir = repo / "modules" / "docs"
+    mod_dir.mkdir(parents=True)
+    for i in range(secrets):
+        (mod_dir / f"file{i}.md").write_text(f"example {i}\npassword = example-password-{i}\n")
+    return repo
+
+
+def test_fingerprint_ignores_line_number_and_whitespace():
+    assert fingerprint("a.md", "Password", "password =  x  y") == fingerprint("a.md", "Password", "password = x y")
+    assert fingerprint("a.md", "Password", "password = x") != fingerprint("b.md", "Password", "password = x")
+
+
+def test_write_and_load_baseline(tmp_path):
+    repo = _repo(tmp_path)
+    count = write_baseline(repo, scan_repo(repo, jobs=1))
+    assert count == 3
+    assert (repo / BASELINE_NAME).exists()
+    assert len(load_baseline(repo)) == 3
+
+
+def test_load_baseline_missing_or_corrupt(tmp_path):
+    assert load_baseline(tmp_path) == set()
+    (tmp_path / BASELINE_NAME).write_text("{not json")
+    assert load_baseline(tmp_path) == set()
+
+
+def test_baselined_findings_are_suppressed(tmp_path):
+    repo = _repo(tmp_path)
+    write_baseline(repo, scan_repo(repo, jobs=1))
+    assert scan_repo(repo, jobs=1, keep=new_findings_filter(repo)) == []
+
+    new = repo / "modules" / "docs" / "file0.md"
+    new.write_text(new.read_text() + "token=ghp_" + "A" * 36 + "\n")
+    findings = scan_repo(repo, jobs=1, keep=new_findings_filter(repo))
+    assert [f[2] for f in findings] == ["GitHub personal access token"]
+
+
+def test_baseline_survives_moved_lines(tmp_path):
+    repo = _repo(tmp_path, secrets=1)
+    write_baseline(repo, scan_repo(repo, jobs=1))
+    f = repo / "modules" / "docs" / "file0.md"
+    f.write_text("new intro\n\n" + f.read_text())
+    assert scan_repo(repo, jobs=1, keep=new_findings_filter(repo)) == []
+
+
+def test_fail_fast_stops_at_first_new_finding(tmp_path):
+    repo = _repo(tmp_path, secrets=5)
+    assert len(scan_repo(repo, jobs=1)) == 5
+    findings = scan_repo(repo, jobs=1, keep=new_findings_filter(repo), fail_fast=True)
+    assert len(findings) == 1
+
+
+def test_fail_fast_parallel_returns_new_findings(tmp_path):
+    repo = _repo(tmp_path, secrets=8)
+    findings = scan_repo(repo, jobs=2, keep=new_findings_filter(repo), fail_fast=True)
+    assert 1 <= len(findings) <= 8
+
+
+def test_baseline_covers_files_push_scans_outside_modules(tmp_path):
+    repo = _repo(tmp_path, secrets=1)
+    git = ["git", "-c", "user.name=t", "-c", "user.email=t@example.com"]
+    subprocess.run(["git", "init", "-q"], cwd=repo, check=True)
+    subprocess.run(["git", "add", "."], cwd=repo, check=True)
+    subprocess.run([*git, "commit", "-qm", "init"], cwd=repo, check=True)
+    (repo / "playbooks").mkdir()
+    (repo / "playbooks" / "vars.yml").write_text("password = example-password-vars\n")
+    subprocess.run(["git", "add", "playbooks"], cwd=repo, check=True)
+    assert len(scan_diff(repo, jobs=1)) == 1
+
+    write_baseline(repo, scan_baseline_candidates(repo, jobs=1))
+
+    assert scan_diff(repo, jobs=1, keep=new_findings_filter(repo)) == []
+    assert scan_repo(repo, jobs=1, keep=new_findings_filter(repo)) == []
@@ -0,0 +1,34 @@
+"""Tests for the scanner benchmark corpus and baseline comparison."""
+
+from benchmarks.bench_security import compare
+from benchmarks.corpus import DEFAULT_SPEC, generate_corpus
+from dotm.security import scan_repo
+
+SMALL_SPEC = {**DEFAULT_SPEC, "modules": 3, "files_per_module": 6, "file_bytes": 2048,
+              "binary_ratio": 0.2, "secret_density": 0.02}
+
+
+def _snapshot(root):
+    return {p.relative_to(root): p.read_bytes() for p in sorted(root.rglob("*")) if p.is_file()}
+
+
+def test_corpus_is_reproducible(tmp_path):
+    first = generate_corpus(tmp_path / "a", SMALL_SPEC)
+    second = generate_corpus(tmp_path / "b", SMALL_SPEC)
+    assert _snapshot(tmp_path / "a") == _snapshot(tmp_path / "b")
+    assert first["files"] == 18
+    assert first["bytes"] == second["bytes"]
+
+
+def test_corpus_secrets_are_detected(tmp_path):
+    manifest = generate_corpus(tmp_path, SMALL_SPEC)
+    assert manifest["secrets"] > 0
+    assert len(scan_repo(tmp_path, jobs=1)) >= manifest["secrets"]
+
+
+def test_compare_flags_throughput_and_memory_regressions():
+    baseline = {"results": {"scan_repo": {"mb_per_s": 10.0, "peak_kb": 1000}}}
+    ok = {"results": {"scan_repo": {"mb_per_s": 9.0, "peak_kb": 1100}}}
+    slow = {"results": {"scan_repo": {"mb_per_s": 5.0, "peak_kb": 4000}}}
+    assert compare(ok, baseline) == []
+    assert len(compare(slow, baseline)) == 2
@@ -0,0 +1,104 @@
+"""Tests for dotm.cli module."""
+
+import json
+import os
+import subprocess
+import sys
+from unittest.mock import patch
+
+import yaml
+from click.testing import CliRunner
+
+from dotm import config
+from dotm.cli import main
+
+
+def test_import_defers_rich_and_yaml():
+    code = "import sys, dotm.cli, dotm.modules; print(sorted(m for m in ('rich', 'yaml') if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
+
+
+def test_version_and_help_skip_config_bootstrap():
+    runner = CliRunner()
+    with patch("dotm.cli.init_config") as init:
+        assert runner.invoke(main, ["--version"]).exit_code == 0
+        assert runner.invoke(main, ["--help"]).exit_code == 0
+        assert runner.invoke(main, ["status", "--help"]).exit_code == 0
+    init.assert_not_called()
+
+
+def test_help_as_option_value_still_bootstraps_config():
+    runner = CliRunner()
+    with patch("dotm.cli.init_config") as init, \
+         patch("dotm.sync.run_push", return_value=True) as push:
+        assert runner.invoke(main, ["push", "-m", "--help"]).exit_code == 0
+    init.assert_called_once()
+    assert push.call_args.kwargs["message"] == "--help"
+
+
+def test_init_config_writes_only_on_first_run(tmp_path):
+    with patch("dotm.config.CONFIG_DIR", config.CONFIG_FILE.parent), \
+         patch("dotm.config.LOG_DIR", tmp_path / "logs"):
+        config.init_config()
+        assert config.CONFIG_FILE.exists()
+        with patch("pathlib.Path.write_text") as write, patch("pathlib.Path.mkdir") as mkdir:
+            config.init_config()
+        write.assert_not_called()
+        mkdir.assert_not_called()
+
+
+def _dotfiles(tmp_path, installed=()):
+    repo = tmp_path / "dotfiles"
+    for name in ("git", "zsh", "tmux", "bat"):
+        (repo / "modules" / name).mkdir(parents=True)
+        (repo / "modules" / name / "config.yml").write_text("homebrew_packages: []\n")
+    (repo / "playbooks").mkdir()
+    (repo / "playbooks" / "profiles.yml").write_text(
+        "---\nbase_modules:\n" + "".join(f"  - {name}\n" for name in installed)
+    )
+    return repo
+
+
+def test_install_many_modules_with_one_ansible_run(tmp_path):
+    repo = _dotfiles(tmp_path, installed=["git"])
+    ok = subprocess.CompletedProcess([], 0, "", "")
+    with patch("dotm.modules.get_dotfiles_repo", return_value=repo), \
+         patch("dotm.modules.get_modules_dir", return_value=repo / "modules"), \
+         patch("dotm.modules.subprocess.run", return_value=ok) as run, \
+         patch("dotm.targets.refresh"), \
+         patch("dotm.profiles.os.replace", wraps=os.replace) as replace:
+        result = CliRunner().invoke(main, ["install", "zsh", "git", "tmux"])
+
+    assert result.exit_code == 0, result.output
+    assert run.call_count == 1
+    cmd = run.call_args[0][0]
+    assert json.loads(cmd[cmd.index("--extra-vars") + 1]) == {"final_modules": ["zsh", "git", "tmux"]}
+    assert [c.args[1].name for c in replace.call_args_list].count("profiles.yml") == 1
+    profiles = yaml.safe_load((repo / "playbooks" / "profiles.yml").read_text())
+    assert profiles["base_modules"] == ["git", "tmux", "zsh"]
+
+
+def test_install_rejects_unknown_modules_before_changing_anything(tmp_path):
+    repo = _dotfiles(tmp_path)
+    with patch("dotm.modules.get_dotfiles_repo", return_value=repo), \
+         patch("dotm.modules.get_modules_dir", return_value=repo / "modules"), \
+         patch("dotm.modules.subprocess.run") as run:
+        result = CliRunner().invoke(main, ["install", "zsh", "nope"])
+
+    assert result.exit_code == 1
+    assert "Module 'nope' not found" in result.output
+    run.assert_not_called()
+    assert yaml.safe_load((repo / "playbooks" / "profiles.yml").read_text())["base_modules"] is None
+
+
+def test_uninstall_many_modules_writes_profiles_once(tmp_path):
+    repo = _dotfiles(tmp_path, installed=["bat", "git", "zsh"])
+    with patch("dotm.modules.get_dotfiles_repo", return_value=repo), \
+         patch("dotm.modules.remove_module_symlinks", return_value=[]), \
+         patch("dotm.profiles.os.replace", wraps=os.replace) as replace:
+        result = CliRunner().invoke(main, ["uninstall", "git", "zsh"])
+
+    assert result.exit_code == 0, result.output
+    assert replace.call_count == 1
+    assert yaml.safe_load((repo / "playbooks" / "profiles.yml").read_text())["base_modules"] == ["bat"]
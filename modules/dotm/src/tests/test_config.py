@@ -9,10 +9,12 @@ from dotm.config import (
     DEFAULT_CONFIG,
     ensure_config,
     exclude_module,
+    get_dotfiles_repo,
     get_excluded_modules,
     include_module,
     load_config,
     save_config,
+    snapshot,
 )
 
 
@@ -68,3 +70,51 @@ def test_include_module(tmp_path):
         assert "test-mod" not in get_excluded_modules()
         # Include non-excluded module — should not error
         include_module("other")
+
+
+def test_snapshot_parses_once_until_file_changes(tmp_path):
+    config_file = tmp_path / "config.yml"
+    config_file.write_text(yaml.dump({**DEFAULT_CONFIG, "dotfiles_repo": "/srv/dotfiles"}))
+    with patch("dotm.config.CONFIG_FILE", config_file), \
+         patch("yaml.safe_load", wraps=yaml.safe_load) as safe_load:
+        assert get_dotfiles_repo() == Path("/srv/dotfiles")
+        assert snapshot().modules_dir == Path("/srv/dotfiles/modules")
+        get_excluded_modules()
+        assert safe_load.call_count == 1
+
+        config_file.write_text(yaml.dump({**DEFAULT_CONFIG, "dotfiles_repo": "/srv/other-dotfiles"}))
+        assert get_dotfiles_repo() == Path("/srv/other-dotfiles")
+        assert safe_load.call_count == 2
+
+
+def test_load_config_returns_mutable_copy(tmp_path):
+    with patch("dotm.config.CONFIG_FILE", tmp_path / "nonexistent.yml"):
+        config = load_config()
+        config["excluded_modules"].append("foo")
+        config["sync"]["interval_minutes"] = 5
+        assert get_excluded_modules() == []
+        assert load_config()["sync"]["interval_minutes"] == 30
+
+
+def test_save_config_invalidates_snapshot(tmp_path):
+    config_file = tmp_path / "config.yml"
+    with patch("dotm.config.CONFIG_FILE", config_file), \
+         patch("dotm.config.CONFIG_DIR", tmp_path), \
+         patch("dotm.config._stamp", return_value=("fixed",)):
+        save_config({**DEFAULT_CONFIG, "excluded_modules": ["a"]})
+        assert get_excluded_modules() == ["a"]
+        save_config({**DEFAULT_CONFIG, "excluded_modules": ["b"]})
+        assert get_excluded_modules() == ["b"]
+
+
+def test_parsed_config_is_reused_by_a_new_process(tmp_path):
+    from dotm import config
+
+    config.CONFIG_FILE.parent.mkdir(parents=True)
+    config.CONFIG_FILE.write_text(yaml.dump({**DEFAULT_CONFIG, "dotfiles_repo": "/srv/dotfiles"}))
+    assert get_dotfiles_repo() == Path("/srv/dotfiles")
+    config.invalidate()
+
+    with patch("yaml.safe_load") as safe_load:
+        assert get_dotfiles_repo() == Path("/srv/dotfiles")
+    safe_load.assert_not_called()
@@ -0,0 +1,94 @@
+"""Tests for dotm.graph dependency ordering and scheduling."""
+
+import threading
+import time
+
+import pytest
+
+from dotm import graph
+
+
+def test_dependency_graph_drops_unknown_modules():
+    modules = [{"name": "zsh", "depends_on": ["git", "missing"]}, {"name": "git", "depends_on": []}]
+    assert graph.dependency_graph(modules) == {"zsh": ["git"], "git": []}
+
+
+def test_find_cycle():
+    assert graph.find_cycle({"a": ["b"], "b": ["c"], "c": []}) is None
+    assert graph.find_cycle({"a": ["b"], "b": ["c"], "c": ["a"]}) == ["a", "b", "c", "a"]
+    assert graph.find_cycle({"a": ["a"]}) == ["a", "a"]
+    with pytest.raises(ValueError, match="a -> b -> a"):
+        graph.check_acyclic({"a": ["b"], "b": ["a"]})
+
+
+def test_ordered_puts_dependencies_first():
+    deps = {"zsh": ["git", "fonts"], "git": ["fonts"], "fonts": [], "tmux": []}
+    assert graph.ordered(["zsh", "tmux", "git", "fonts"], deps) == ["fonts", "git", "zsh", "tmux"]
+
+
+def test_run_graph_respects_dependencies_and_runs_independent_modules_concurrently():
+    deps = {"zsh": ["git"], "git": [], "tmux": []}
+    started, lock = [], threading.Lock()
+    both_running = threading.Barrier(2, timeout=5)
+
+    def run(batch):
+        with lock:
+            started.append(batch[0])
+        if batch[0] in ("git", "tmux"):
+            both_running.wait()
+        return True
+
+    status = graph.run_graph(["git", "tmux", "zsh"], deps, run, jobs=2)
+
+    assert status == {"git": "ok", "tmux": "ok", "zsh": "ok"}
+    assert started.index("zsh") > started.index("git")
+
+
+def test_run_graph_skips_dependents_of_failures_only():
+    deps = {"a": [], "b": ["a"], "c": ["b"], "d": []}
+
+    def run(batch):
+        if batch == ["a"]:
+            raise RuntimeError("boom")
+        return True
+
+    errors = []
+    status = graph.run_graph(["a", "b", "c", "d"], deps, run,
+                             on_error=lambda batch, e: errors.append((batch, str(e))))
+
+    assert status == {"a": "failed", "b": "skipped", "c": "skipped", "d": "ok"}
+    assert errors == [(["a"], "boom")]
+
+
+def test_run_graph_follows_dependencies_through_modules_not_applied():
+    deps = {"zsh": ["shell"], "shell": ["git"], "git": []}
+    order = []
+    graph.run_graph(["zsh", "git"], deps, lambda batch: order.append(batch) or True, jobs=4)
+    assert order == [["git"], ["zsh"]]
+
+
+def test_run_graph_batches_serial_modules_one_batch_at_a_time():
+    deps = {"a": [], "b": [], "c": ["a"], "links": []}
+    batches, active, overlap = [], [0], []
+
+    def run(batch):
+        if batch != ["links"]:
+            active[0] += 1
+            overlap.append(active[0])
+            time.sleep(0.01)
+            active[0] -= 1
+        batches.append(batch)
+        return True
+
+    status = graph.run_graph(["a", "b", "c", "links"], deps, run, jobs=4, serial={"a", "b", "c"})
+
+    assert set(status.values()) == {"ok"}
+    assert ["a", "b"] in batches and ["c"] in batches
+    assert max(overlap) == 1
+
+
+def test_run_graph_takes_per_module_results_from_a_batch():
+    deps = {"a": [], "b": [], "c": ["a"], "d": ["b"]}
+    status = graph.run_graph(["a", "b", "c", "d"], deps, lambda batch: {n: n != "a" for n in batch},
+                             serial={"a", "b", "c", "d"})
+    assert status == {"a": "failed", "b": "ok", "c": "skipped", "d": "ok"}
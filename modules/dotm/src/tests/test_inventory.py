@@ -0,0 +1,124 @@
+"""Tests for dotm.inventory module."""
+
+from unittest.mock import patch
+
+from dotm import inventory
+from dotm.inventory import gather_inventory, kinds_for_modules, parse_mas_list
+
+
+def test_parse_mas_list():
+    lines = ["123 MyApp (1.0)", "456 Other App (2.0)", "garbage"]
+    assert parse_mas_list(lines) == {123: "MyApp", 456: "Other App"}
+
+
+def test_kinds_for_modules():
+    mods = [
+        {"homebrew_packages": ["a"], "homebrew_casks": [], "homebrew_taps": [], "mas_installed_apps": []},
+        {"homebrew_packages": [], "homebrew_casks": [], "homebrew_taps": [], "mas_installed_apps": [1]},
+    ]
+    assert kinds_for_modules(mods) == {"formulae", "mas"}
+
+
+def test_gather_inventory_one_call_per_kind():
+    with patch("dotm.inventory._run", return_value=["curl"]) as run:
+        inv = gather_inventory({"formulae", "casks"})
+    assert run.call_count == 2
+    assert inv == {"formulae": {"curl"}, "casks": {"curl"}}
+
+
+def test_gather_inventory_reuses_cache_within_max_age():
+    with patch("dotm.inventory._run", return_value=["123 App (1.0)"]):
+        gather_inventory({"mas"}, max_age=60)
+    with patch("dotm.inventory._run") as run:
+        inv = gather_inventory({"mas"}, max_age=60)
+    run.assert_not_called()
+    assert inv == {"mas": {123: "App"}}
+
+
+def test_gather_inventory_fetches_only_kinds_missing_from_cache():
+    with patch("dotm.inventory._run", return_value=["curl"]):
+        gather_inventory({"formulae"}, max_age=60)
+    with patch("dotm.inventory._run", return_value=["firefox"]) as run:
+        inv = gather_inventory({"formulae", "casks"}, max_age=60)
+    run.assert_called_once()
+    assert inv == {"formulae": {"curl"}, "casks": {"firefox"}}
+
+
+def test_gather_inventory_without_ttl_leaves_cache_alone():
+    with patch("dotm.inventory._run", return_value=["curl"]):
+        gather_inventory({"formulae", "casks"}, max_age=60)
+    before = inventory.INVENTORY_CACHE.read_text()
+    with patch("dotm.inventory._run", return_value=["git"]):
+        assert gather_inventory({"formulae"}) == {"formulae": {"git"}}
+    assert inventory.INVENTORY_CACHE.read_text() == before
+
+
+def test_gather_inventory_merges_kinds_into_cache():
+    with patch("dotm.inventory._run", return_value=["curl"]):
+        gather_inventory({"formulae", "casks"}, max_age=60)
+    with patch("dotm.inventory._run", return_value=["user/tap"]):
+        gather_inventory({"taps"}, max_age=60)
+    with patch("dotm.inventory._run") as run:
+        inv = gather_inventory({"formulae", "casks", "taps"}, max_age=60)
+    run.assert_not_called()
+    assert inv["taps"] == {"user/tap"}
+
+
+def test_gather_inventory_expired_cache(monkeypatch):
+    with patch("dotm.inventory._run", return_value=["curl"]):
+        gather_inventory({"formulae"}, max_age=60)
+    monkeypatch.setattr(inventory.time, "time", lambda: 10**12)
+    with patch("dotm.inventory._run", return_value=["git"]) as run:
+        inv = gather_inventory({"formulae"}, max_age=60)
+    run.assert_called_once()
+    assert inv["formulae"] == {"git"}
+
+
+def _fake_prefix(root):
+    """Build a minimal Homebrew prefix tree."""
+    for formula in ("git", "curl"):
+        (root / "Cellar" / formula / "1.0").mkdir(parents=True)
+    (root / "Cellar" / ".keepme").mkdir()
+    (root / "Caskroom" / "firefox").mkdir(parents=True)
+    (root / "Library" / "Taps" / "homebrew" / "homebrew-bundle").mkdir(parents=True)
+    (root / "Library" / "Taps" / "jesseduffield" / "homebrew-lazygit").mkdir(parents=True)
+    return root
+
+
+def test_scan_homebrew_fake_prefix(tmp_path):
+    prefix = _fake_prefix(tmp_path / "brew")
+    assert inventory.scan_homebrew("formulae", prefix) == {"git", "curl"}
+    assert inventory.scan_homebrew("casks", prefix) == {"firefox"}
+    assert inventory.scan_homebrew("taps", prefix) == {"homebrew/bundle", "jesseduffield/lazygit"}
+
+
+def test_scan_homebrew_intel_taps_layout(tmp_path):
+    prefix = tmp_path / "usr-local"
+    (prefix / "Cellar").mkdir(parents=True)
+    (prefix / "Homebrew" / "Library" / "Taps" / "user" / "homebrew-tools").mkdir(parents=True)
+    assert inventory.scan_homebrew("taps", prefix) == {"user/tools"}
+    assert inventory.scan_homebrew("casks", prefix) == set()
+
+
+def test_gather_inventory_prefers_prefix_scan(tmp_path, monkeypatch):
+    prefix = _fake_prefix(tmp_path / "brew")
+    monkeypatch.setenv("HOMEBREW_PREFIX", str(prefix))
+    with patch("dotm.inventory._run") as run:
+        inv = gather_inventory({"formulae", "casks", "taps"})
+    run.assert_not_called()
+    assert inv["formulae"] == {"git", "curl"}
+
+
+def test_gather_inventory_falls_back_without_taps_dir(tmp_path, monkeypatch):
+    prefix = tmp_path / "brew"
+    (prefix / "Cellar" / "git").mkdir(parents=True)
+    monkeypatch.setenv("HOMEBREW_PREFIX", str(prefix))
+    with patch("dotm.inventory._run", return_value=["custom/tap"]) as run:
+        inv = gather_inventory({"formulae", "taps"})
+    run.assert_called_once_with(["brew", "tap"])
+    assert inv == {"formulae": {"git"}, "taps": {"custom/tap"}}
+
+
+def test_find_homebrew_prefix_unrecognised(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOMEBREW_PREFIX", str(tmp_path))
+    assert inventory.find_homebrew_prefix() is None
@@ -0,0 +1,94 @@
+"""Tests for dotm.playbook streaming and timing capture."""
+
+import json
+import sys
+
+import pytest
+
+from dotm import playbook
+
+
+def _fake_playbook(events, exit_code=0, extra_lines=()):
+    """A command that prints events as dotm_events would, then exits."""
+    lines = [json.dumps(e) for e in events] + list(extra_lines)
+    script = f"import sys\nfor line in {lines!r}:\n    print(line, flush=True)\nsys.exit({exit_code})\n"
+    return [sys.executable, "-c", script]
+
+
+EVENTS = [
+    {"event": "playbook_start", "playbook": "deploy.yml"},
+    {"event": "task_start", "task": "Gathering Facts", "role": None},
+    {"event": "result", "task": "Gathering Facts", "role": None, "status": "ok", "duration": 1.5},
+    {"event": "task_start", "task": "Stow modules", "role": "dotmodules"},
+    {"event": "result", "task": "Stow modules", "role": "dotmodules", "status": "ok", "changed": True,
+     "duration": 0.5, "item": "git"},
+    {"event": "result", "task": "Stow modules", "role": "dotmodules", "status": "ok",
+     "duration": 2.0, "item": {"name": "zsh", "dir": "x"}},
+    {"event": "task_start", "task": "Install packages", "role": "dotmodules"},
+    {"event": "result", "task": "Install packages", "role": "dotmodules", "status": "failed",
+     "duration": 4.0, "item": "zsh", "msg": "brew exploded"},
+    {"event": "stats", "hosts": {}},
+]
+
+
+def test_run_playbook_collects_task_and_module_timings(tmp_path):
+    summary = playbook.run_playbook(_fake_playbook(EVENTS, exit_code=2), tmp_path, ["git", "zsh"], quiet=True)
+
+    assert not summary["ok"]
+    assert [(t["task"], t["seconds"], t["status"]) for t in summary["tasks"]] == [
+        ("Gathering Facts", 1.5, "ok"), ("Stow modules", 2.5, "ok"), ("Install packages", 4.0, "failed"),
+    ]
+    assert summary["module_seconds"] == {"git": 0.5, "zsh": 6.0}
+    assert summary["errors"] == ["Install packages (zsh): brew exploded"]
+    assert summary["failed_modules"] == ["zsh"]
+
+
+def test_run_playbook_keeps_plain_output_for_errors(tmp_path, capsys):
+    cmd = _fake_playbook([], exit_code=4, extra_lines=["ERROR! the role 'dotmodules' was not found"])
+
+    summary = playbook.run_playbook(cmd, tmp_path, ["git"], quiet=False)
+
+    assert summary["errors"] == ["ERROR! the role 'dotmodules' was not found"]
+    assert summary["failed_modules"] is None
+    assert "was not found" in capsys.readouterr().out
+
+
+def test_run_playbook_kills_on_timeout(tmp_path):
+    cmd = [sys.executable, "-c", "import time; time.sleep(30)"]
+    summary = playbook.run_playbook(cmd, tmp_path, [], quiet=True, timeout=0.2)
+    assert not summary["ok"]
+    assert summary["seconds"] < 10
+
+
+def test_playbook_env_enables_bundled_callback(monkeypatch):
+    monkeypatch.setenv("ANSIBLE_CALLBACK_PLUGINS", "/elsewhere")
+    env = playbook.playbook_env()
+    assert env["ANSIBLE_STDOUT_CALLBACK"] == "dotm_events"
+    assert env["ANSIBLE_CALLBACK_PLUGINS"].split(":") == [str(playbook.PLUGIN_DIR), "/elsewhere"]
+    assert (playbook.PLUGIN_DIR / "dotm_events.py").is_file()
+
+
+def test_record_timings_and_slowest(tmp_path):
+    summary = playbook.run_playbook(_fake_playbook(EVENTS), tmp_path, ["git", "zsh"], quiet=True)
+    playbook.record_timings(summary)
+    native = {"tasks": [], "module_seconds": {"tmux": 0.1}}
+
+    entry = json.loads(playbook.TIMINGS_LOG.read_text())
+    assert entry["module_seconds"] == {"git": 0.5, "zsh": 6.0}
+    assert "errors" not in entry
+
+    tasks, modules = playbook.slowest([summary, native], top=2)
+    assert tasks == [("dotmodules : Install packages", 4.0), ("dotmodules : Stow modules", 2.5)]
+    assert modules == [("zsh", 6.0), ("git", 0.5)]
+    assert playbook.format_slowest([native]) == "slowest modules: tmux 0.1s"
+    assert playbook.format_slowest([]) == ""
+
+
+def test_callback_plugin_loads():
+    pytest.importorskip("ansible")
+    import importlib.util
+
+    spec = importlib.util.spec_from_file_location("dotm_events", playbook.PLUGIN_DIR / "dotm_events.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    assert module.CallbackModule.CALLBACK_NAME == "dotm_events"
@@ -0,0 +1,82 @@
+"""Tests for dotm.profiles module."""
+
+import os
+from unittest.mock import patch
+
+import yaml
+
+from dotm.modules import add_to_deploy, get_deploy_modules, remove_from_deploy
+from dotm.profiles import ProfilesDocument
+
+PROFILES = """---
+# Hostname-to-profile mapping
+hostname_to_profile:
+  mini: personal
+
+# Base modules installed on ALL systems
+base_modules:
+  - git
+  - zsh
+
+# Per-profile overrides
+profiles:
+  personal:
+    include:
+      - openclaw
+    exclude: []
+"""
+
+
+def _write(tmp_path, text=PROFILES):
+    path = tmp_path / "playbooks" / "profiles.yml"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return path
+
+
+def test_batched_add_and_remove_write_once(tmp_path):
+    path = _write(tmp_path)
+    with patch("dotm.profiles.os.replace", wraps=os.replace) as replace:
+        with ProfilesDocument(path) as doc:
+            assert doc.add("tmux", "bat", "git") == ["tmux", "bat"]
+            assert doc.remove("zsh", "missing") == ["zsh"]
+    assert replace.call_count == 1
+
+    data = yaml.safe_load(path.read_text())
+    assert data["base_modules"] == ["bat", "git", "tmux"]
+    assert data["profiles"]["personal"]["include"] == ["openclaw"]
+    assert "# Per-profile overrides\n" in path.read_text()
+    assert list(path.parent.iterdir()) == [path]
+
+
+def test_unchanged_document_is_not_written(tmp_path):
+    path = _write(tmp_path)
+    with patch("dotm.profiles.os.replace") as replace:
+        with ProfilesDocument(path) as doc:
+            doc.add("git")
+            doc.remove("missing")
+    replace.assert_not_called()
+
+
+def test_flow_style_list_is_rewritten(tmp_path):
+    path = _write(tmp_path, "---\nbase_modules: [git, zsh]\nother: 1\n")
+    with ProfilesDocument(path) as doc:
+        doc.add("bat")
+    assert yaml.safe_load(path.read_text()) == {"base_modules": ["bat", "git", "zsh"], "other": 1}
+
+
+def test_missing_block_is_appended(tmp_path):
+    path = _write(tmp_path, "---\nhostname_to_profile: {}")
+    with ProfilesDocument(path) as doc:
+        doc.add("git")
+    assert yaml.safe_load(path.read_text()) == {"hostname_to_profile": {}, "base_modules": ["git"]}
+
+
+def test_module_helpers_use_one_read_and_write(tmp_path):
+    _write(tmp_path)
+    with patch("dotm.modules.get_dotfiles_repo", return_value=tmp_path):
+        with patch("dotm.profiles.os.replace", wraps=os.replace) as replace:
+            assert add_to_deploy("a", "b", "c") == ["a", "b", "c"]
+            assert remove_from_deploy("a", "git") == ["a", "git"]
+        assert replace.call_count == 2
+        assert get_deploy_modules() == ["b", "c", "zsh"]
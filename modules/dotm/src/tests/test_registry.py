@@ -0,0 +1,121 @@
+"""Tests for dotm.registry module."""
+
+import datetime
+import json
+import os
+from unittest.mock import patch
+
+import yaml
+
+from dotm import registry
+
+
+def _write_config(modules_dir, name, config):
+    mod_dir = modules_dir / name
+    mod_dir.mkdir(parents=True, exist_ok=True)
+    (mod_dir / "config.yml").write_text(yaml.dump(config))
+    return mod_dir
+
+
+def test_build_index_writes_index(tmp_path):
+    modules_dir = tmp_path / "modules"
+    _write_config(modules_dir, "git", {"homebrew_packages": ["git"]})
+    _write_config(modules_dir, "tmux", {"stow_dirs": ["tmux"]})
+
+    modules = registry.build_index(modules_dir)
+
+    assert [m["name"] for m in modules] == ["git", "tmux"]
+    data = json.loads(registry.INDEX_FILE.read_text())
+    assert data["modules_dir"] == str(modules_dir)
+    assert set(data["modules"]) == {"git", "tmux"}
+
+
+def test_build_index_reparses_only_changed(tmp_path):
+    modules_dir = tmp_path / "modules"
+    _write_config(modules_dir, "git", {"homebrew_packages": ["git"]})
+    tmux = _write_config(modules_dir, "tmux", {"homebrew_packages": ["tmux"]})
+    registry.build_index(modules_dir)
+
+    (tmux / "config.yml").write_text(yaml.dump({"homebrew_packages": ["tmux", "sesh"]}))
+    st = (tmux / "config.yml").stat()
+    os.utime(tmux / "config.yml", ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    with patch("yaml.safe_load", wraps=yaml.safe_load) as load:
+        modules = registry.build_index(modules_dir)
+
+    assert load.call_count == 1
+    by_name = {m["name"]: m for m in modules}
+    assert by_name["tmux"]["homebrew_packages"] == ["tmux", "sesh"]
+    assert by_name["git"]["homebrew_packages"] == ["git"]
+
+
+def test_build_index_drops_removed_modules(tmp_path):
+    modules_dir = tmp_path / "modules"
+    _write_config(modules_dir, "git", {})
+    gone = _write_config(modules_dir, "gone", {})
+    registry.build_index(modules_dir)
+
+    (gone / "config.yml").unlink()
+    modules = registry.build_index(modules_dir)
+
+    assert [m["name"] for m in modules] == ["git"]
+    assert set(json.loads(registry.INDEX_FILE.read_text())["modules"]) == {"git"}
+
+
+def test_get_modules_shares_snapshot(tmp_path):
+    modules_dir = tmp_path / "modules"
+    _write_config(modules_dir, "git", {})
+
+    with patch("dotm.registry.build_index", wraps=registry.build_index) as build:
+        registry.get_modules(modules_dir)
+        registry.get_modules(modules_dir)
+        assert build.call_count == 1
+        registry.invalidate()
+        registry.get_modules(modules_dir)
+        assert build.call_count == 2
+
+
+def test_corrupt_index_is_rebuilt(tmp_path):
+    modules_dir = tmp_path / "modules"
+    _write_config(modules_dir, "git", {"homebrew_packages": ["git"]})
+    registry.INDEX_FILE.parent.mkdir(parents=True)
+    registry.INDEX_FILE.write_text("{not json")
+
+    modules = registry.build_index(modules_dir)
+
+    assert modules[0]["homebrew_packages"] == ["git"]
+
+
+def test_base_modules_are_cached_until_profiles_change(tmp_path):
+    profiles = tmp_path / "profiles.yml"
+    profiles.write_text("base_modules:\n  - git\n")
+    assert registry.get_base_modules(profiles) == ["git"]
+
+    with patch("yaml.safe_load", wraps=yaml.safe_load) as load:
+        assert registry.get_base_modules(profiles) == ["git"]
+        assert load.call_count == 0
+        profiles.write_text("base_modules:\n  - git\n  - zsh\n")
+        assert registry.get_base_modules(profiles) == ["git", "zsh"]
+        assert load.call_count == 1
+    assert registry.get_base_modules(tmp_path / "missing.yml") == []
+
+
+def test_config_json_cannot_hold_is_not_cached(tmp_path):
+    modules_dir = tmp_path / "modules"
+    _write_config(modules_dir, "git", {"homebrew_packages": ["git"]})
+    (_write_config(modules_dir, "dated", {}) / "config.yml").write_text("since: 2024-01-02\n")
+
+    cold = registry.build_index(modules_dir)
+
+    assert set(json.loads(registry.INDEX_FILE.read_text())["modules"]) == {"git"}
+    assert registry.build_index(modules_dir) == cold
+    assert cold[0]["config"]["since"] == datetime.date(2024, 1, 2)
+
+
+def test_get_modules_returns_copies(tmp_path):
+    modules_dir = tmp_path / "modules"
+    _write_config(modules_dir, "git", {})
+
+    registry.get_modules(modules_dir)[0]["name"] = "changed"
+
+    assert registry.get_modules(modules_dir)[0]["name"] == "git"
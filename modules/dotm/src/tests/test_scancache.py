@@ -0,0 +1,90 @@
+"""Tests for dotm.scancache module."""
+
+import os
+from unittest.mock import patch
+
+from dotm import scancache, security
+from dotm.security import reset_scan_stats, scan_file, scan_repo, scan_stats
+
+SECRET = "token=ghp_" + "A" * 36 + "\n"
+
+
+def _bump_mtime(path):
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def test_repeat_scan_skips_regex_work(tmp_path):
+    f = tmp_path / "env"
+    f.write_text(SECRET)
+    first = scan_file(f)
+    scancache.save()
+    scancache.invalidate()  # force a reload from disk
+
+    with patch("dotm.security.scan_text") as scan_text, \
+         patch("pathlib.Path.read_text") as read_text:
+        assert scan_file(f) == first
+    scan_text.assert_not_called()
+    read_text.assert_not_called()
+
+
+def test_touched_file_hits_content_hash(tmp_path):
+    f = tmp_path / "env"
+    f.write_text(SECRET)
+    first = scan_file(f)
+    _bump_mtime(f)
+    with patch("dotm.security.scan_text") as scan_text:
+        assert scan_file(f) == first
+    scan_text.assert_not_called()
+
+
+def test_edited_file_is_rescanned(tmp_path):
+    f = tmp_path / "env"
+    f.write_text(SECRET)
+    assert len(scan_file(f)) == 1
+    f.write_text("clean\n")
+    _bump_mtime(f)
+    assert scan_file(f) == []
+
+
+def test_pattern_change_invalidates_cache(tmp_path, monkeypatch):
+    f = tmp_path / "env"
+    f.write_text(SECRET)
+    scan_file(f)
+    scancache.save()
+    monkeypatch.setattr(security, "PATTERNS_DIGEST", "different")
+    with patch("dotm.security.scan_text", return_value=[]) as scan_text:
+        scan_file(f)
+    scan_text.assert_called_once()
+
+
+def test_lru_eviction(tmp_path, monkeypatch):
+    monkeypatch.setattr(scancache, "MAX_ENTRIES", 2)
+    files = []
+    for i in range(3):
+        f = tmp_path / f"f{i}"
+        f.write_text(f"content {i}\n")
+        files.append(f)
+    scan_file(files[0])
+    scan_file(files[1])
+    scan_file(files[0])  # refresh f0 so f1 is least recently used
+    scan_file(files[2])
+    with patch("dotm.security.scan_text", return_value=[]) as scan_text:
+        scan_file(files[0])
+        scan_file(files[1])
+    assert scan_text.call_count == 1
+
+
+def test_scan_repo_parallel_populates_cache(tmp_path):
+    repo = tmp_path / "repo"
+    mod_dir = repo / "modules" / "mod"
+    mod_dir.mkdir(parents=True)
+    for i in range(4):
+        (mod_dir / f"f{i}").write_text(f"line {i}\n{SECRET}")
+    first = scan_repo(repo, jobs=2)
+    scancache.invalidate()
+
+    reset_scan_stats()
+    assert scan_repo(repo, jobs=2) == first
+    assert scan_stats["cached"] == 4
+    assert scan_stats["scanned"] == 0
@@ -0,0 +1,104 @@
+"""Tests for dotm.stow native symlink deployment."""
+
+import os
+
+import pytest
+
+from dotm import stow
+
+
+@pytest.fixture
+def home(tmp_path, monkeypatch):
+    home = tmp_path / "home"
+    home.mkdir()
+    monkeypatch.setenv("HOME", str(home))
+    return home
+
+
+def _module(modules_dir, name, files, **config):
+    for rel, text in files.items():
+        path = modules_dir / name / "files" / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+    mod = {"name": name, "stow_dirs": [name], "mergeable_files": [], "homebrew_packages": [],
+           "homebrew_casks": [], "homebrew_taps": [], "mas_installed_apps": []}
+    mod.update(config)
+    mod["config"] = {"stow_dirs": [name], **config}
+    return mod
+
+
+def test_is_stow_only():
+    def mod(**config):
+        return {"stow_dirs": config.get("stow_dirs", []), "config": config}
+
+    assert stow.is_stow_only(mod(stow_dirs=["git"], mergeable_files=[".zshrc"], depends_on=["zsh"]))
+    assert stow.is_stow_only(mod(stow_dirs=["git"], homebrew_packages=[]))
+    assert not stow.is_stow_only(mod(stow_dirs=["git"], homebrew_packages=["git"]))
+    assert not stow.is_stow_only(mod(stow_dirs=["zsh"], git_repositories=[{"repo": "x", "dest": "y"}]))
+    assert not stow.is_stow_only(mod(stow_dirs=["iterm"], macos_defaults=[{"domain": "x"}]))
+    assert not stow.is_stow_only(mod(homebrew_packages=[]))
+
+
+def test_links_files_and_is_idempotent(tmp_path, home):
+    modules_dir = tmp_path / "repo" / "modules"
+    mod = _module(modules_dir, "git", {".gitconfig": "[user]\n", ".config/git/ignore": "*.swp\n"})
+
+    result = stow.apply_modules(["git"], [mod], modules_dir)
+
+    assert sorted(result["linked"]) == [home / ".config/git/ignore", home / ".gitconfig"]
+    assert (home / ".gitconfig").is_symlink()
+    assert (home / ".gitconfig").read_text() == "[user]\n"
+    assert not os.path.isabs(os.readlink(home / ".gitconfig"))
+    assert stow.apply_modules(["git"], [mod], modules_dir)["linked"] == []
+
+
+def test_removes_links_for_deleted_files(tmp_path, home):
+    modules_dir = tmp_path / "repo" / "modules"
+    mod = _module(modules_dir, "tmux", {".tmux.conf": "a\n", ".tmux.old": "b\n"})
+    stow.apply_modules(["tmux"], [mod], modules_dir)
+
+    (modules_dir / "tmux" / "files" / ".tmux.old").unlink()
+    (modules_dir / "tmux" / "files" / ".tmux.conf").write_text("changed\n")
+    result = stow.apply_modules(["tmux"], [mod], modules_dir)
+
+    assert result["removed"] == [home / ".tmux.old"]
+    assert not os.path.lexists(home / ".tmux.old")
+    assert (home / ".tmux.conf").read_text() == "changed\n"
+
+
+def test_adopts_regular_files_and_reports_foreign_links(tmp_path, home):
+    modules_dir = tmp_path / "repo" / "modules"
+    mod = _module(modules_dir, "zsh", {".zprofile": "repo\n", ".zlogin": "repo\n"})
+    (home / ".zprofile").write_text("local\n")
+    (home / ".zlogin").symlink_to(tmp_path)
+
+    result = stow.apply_modules(["zsh"], [mod], modules_dir)
+
+    assert result["adopted"] == [home / ".zprofile"]
+    assert (home / ".zprofile").is_symlink()
+    assert (home / ".zprofile").read_text() == "local\n"
+    assert result["conflicts"] == [home / ".zlogin"]
+    assert os.readlink(home / ".zlogin") == str(tmp_path)
+
+
+def test_mergeable_files_are_assembled_from_all_installed(tmp_path, home):
+    modules_dir = tmp_path / "repo" / "modules"
+    git = _module(modules_dir, "git", {".zshrc": "# git\n"}, mergeable_files=[".zshrc"])
+    zsh = _module(modules_dir, "zsh", {".zshrc": "# zsh"}, mergeable_files=[".zshrc"])
+    stow.apply_modules(["git"], [git, zsh], modules_dir)
+
+    stow.apply_modules(["zsh"], [git, zsh], modules_dir)
+
+    assert (home / ".zshrc").resolve() == (home / ".dotmodules" / "merged" / ".zshrc").resolve()
+    assert (home / ".zshrc").read_text() == "# git\n# zsh\n"
+
+
+def test_local_merged_file_is_kept(tmp_path, home):
+    modules_dir = tmp_path / "repo" / "modules"
+    zsh = _module(modules_dir, "zsh", {".zshrc": "# zsh\n"}, mergeable_files=[".zshrc"])
+    (home / ".zshrc").write_text("mine\n")
+
+    result = stow.apply_modules(["zsh"], [zsh], modules_dir)
+
+    assert result["kept"] == [home / ".zshrc"]
+    assert (home / ".zshrc").read_text() == "mine\n"
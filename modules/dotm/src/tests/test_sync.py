@@ -0,0 +1,316 @@
+"""Tests for dotm.sync incremental apply."""
+
+import json
+import subprocess
+from unittest.mock import patch
+
+from dotm import sync
+
+GIT = ["git", "-c", "user.name=t", "-c", "user.email=t@example.com"]
+
+
+def _repo(tmp_path, names=("git", "tmux", "zsh")):
+    repo = tmp_path / "dotfiles"
+    for name in names:
+        mod = repo / "modules" / name
+        mod.mkdir(parents=True)
+        (mod / "config.yml").write_text(f"stow_dirs:\n  - {name}\n")
+    (repo / "playbooks").mkdir()
+    (repo / "playbooks" / "deploy.yml").write_text("---\n")
+    (repo / "playbooks" / "profiles.yml").write_text(
+        "base_modules:\n" + "".join(f"  - {n}\n" for n in names))
+    subprocess.run(["git", "init", "-q"], cwd=repo, check=True)
+    _commit(repo)
+    return repo
+
+
+def _modules(stow_only=(), depends_on=None):
+    """Registry-shaped module dicts; all but stow_only have package work."""
+    depends_on = depends_on or {}
+    return [{"name": n, "stow_dirs": [n], "mergeable_files": [], "depends_on": depends_on.get(n, []),
+             "homebrew_packages": [] if n in stow_only else [n], "homebrew_casks": [],
+             "homebrew_taps": [], "mas_installed_apps": [],
+             "config": {"stow_dirs": [n]} if n in stow_only else {"stow_dirs": [n], "homebrew_packages": [n]}}
+            for n in ("git", "tmux", "zsh")]
+
+
+def _commit(repo):
+    subprocess.run(["git", "add", "-A"], cwd=repo, check=True)
+    subprocess.run([*GIT, "commit", "-qm", "change"], cwd=repo, check=True)
+
+
+def _sync(repo, full=False, apply_ok=True):
+    with patch("dotm.sync.get_dotfiles_repo", return_value=repo), \
+         patch("dotm.sync.get_excluded_modules", return_value=[]), \
+         patch("dotm.sync.get_deploy_modules", return_value=["git", "tmux", "zsh"]), \
+         patch("dotm.sync.git_pull", return_value=True), \
+         patch("dotm.sync.drifted_modules", return_value=[]), \
+         patch("dotm.sync.list_all_modules", return_value=_modules()), \
+         patch("dotm.sync.ansible_apply", return_value=apply_ok) as apply:
+        ok = sync.run_sync(quiet=True, full=full)
+    return ok, apply
+
+
+def test_first_sync_applies_everything_and_records_head(tmp_path):
+    repo = _repo(tmp_path)
+    ok, apply = _sync(repo)
+
+    assert ok
+    assert apply.call_args.kwargs.get("modules") is None
+    state = json.loads(sync.SYNC_STATE.read_text())
+    assert state["commit"] == sync.git_head(repo)
+    assert state["modules"] == ["git", "tmux", "zsh"]
+
+
+def test_sync_applies_only_changed_modules(tmp_path):
+    repo = _repo(tmp_path)
+    _sync(repo)
+    (repo / "modules" / "tmux" / "files").mkdir()
+    (repo / "modules" / "tmux" / "files" / ".tmux.conf").write_text("set -g mouse on\n")
+    _commit(repo)
+    (repo / "modules" / "zsh" / "new.txt").write_text("untracked\n")
+
+    _ok, apply = _sync(repo)
+
+    assert apply.call_args.kwargs["modules"] == ["tmux", "zsh"]
+
+
+def test_sync_with_no_changes_skips_ansible(tmp_path):
+    repo = _repo(tmp_path)
+    _sync(repo)
+
+    ok, apply = _sync(repo)
+
+    assert ok
+    apply.assert_not_called()
+
+
+def test_playbook_change_or_full_flag_applies_everything(tmp_path):
+    repo = _repo(tmp_path)
+    _sync(repo)
+    (repo / "playbooks" / "deploy.yml").write_text("---\n# changed\n")
+    _commit(repo)
+
+    assert _sync(repo)[1].call_args.kwargs.get("modules") is None
+    assert _sync(repo, full=True)[1].call_args.kwargs.get("modules") is None
+
+
+def test_failed_module_is_retried_next_sync(tmp_path):
+    repo = _repo(tmp_path)
+    _sync(repo)
+    (repo / "modules" / "git" / "config.yml").write_text("stow_dirs: []\n")
+    _commit(repo)
+
+    ok, _apply = _sync(repo, apply_ok=False)
+
+    assert not ok
+    assert json.loads(sync.SYNC_STATE.read_text())["pending"] == ["git"]
+    assert _sync(repo)[1].call_args.kwargs["modules"] == ["git"]
+    assert json.loads(sync.SYNC_STATE.read_text())["pending"] == []
+
+
+def test_failed_full_apply_keeps_previous_state(tmp_path):
+    repo = _repo(tmp_path)
+    _sync(repo)
+    before = sync.SYNC_STATE.read_text()
+    (repo / "modules" / "git" / "config.yml").write_text("stow_dirs: []\n")
+    _commit(repo)
+
+    ok, _apply = _sync(repo, full=True, apply_ok=False)
+
+    assert not ok
+    assert sync.SYNC_STATE.read_text() == before
+
+
+def test_unknown_commit_means_full_apply(tmp_path):
+    repo = _repo(tmp_path)
+    assert sync.changed_modules(repo, "0" * 40) is None
+
+
+def test_drifted_modules(tmp_path, monkeypatch):
+    home = tmp_path / "home"
+    monkeypatch.setenv("HOME", str(home))
+    for name in ("ok", "broken"):
+        src = home / ".dotmodules" / name / "files" / f".{name}rc"
+        src.parent.mkdir(parents=True)
+        src.write_text("x\n")
+    (home / ".okrc").symlink_to(home / ".dotmodules" / "ok" / "files" / ".okrc")
+    (home / ".brokenrc").write_text("local edit\n")
+    mods = [{"name": n, "stow_dirs": [n], "mergeable_files": []} for n in ("ok", "broken", "gone")]
+
+    with patch("dotm.sync.list_all_modules", return_value=mods):
+        assert sync.drifted_modules(["ok", "broken", "gone"]) == ["broken", "gone"]
+
+
+def _clone_with_remote(tmp_path):
+    """A bare remote seeded from _repo(), and a clone of it tracking origin."""
+    seed = _repo(tmp_path)
+    remote = tmp_path / "remote.git"
+    subprocess.run(["git", "clone", "-q", "--bare", str(seed), str(remote)], check=True)
+    clone = tmp_path / "clone"
+    subprocess.run(["git", "clone", "-q", str(remote), str(clone)], check=True)
+    return seed, remote, clone
+
+
+def _sync_real_pull(repo):
+    with patch("dotm.sync.get_dotfiles_repo", return_value=repo), \
+         patch("dotm.sync.get_excluded_modules", return_value=[]), \
+         patch("dotm.sync.get_deploy_modules", return_value=["git", "tmux", "zsh"]), \
+         patch("dotm.sync.drifted_modules", return_value=[]), \
+         patch("dotm.sync.list_all_modules", return_value=_modules()), \
+         patch("dotm.sync.git_pull", wraps=sync.git_pull) as pull, \
+         patch("dotm.sync.ansible_apply", return_value=True) as apply:
+        ok = sync.run_sync(quiet=True)
+    return ok, pull, apply
+
+
+def test_unchanged_remote_skips_pull_and_apply(tmp_path):
+    _seed, remote, clone = _clone_with_remote(tmp_path)
+    _sync_real_pull(clone)
+    assert sync.remote_head(clone) == sync.git_head(clone)
+
+    ok, pull, apply = _sync_real_pull(clone)
+
+    assert ok
+    pull.assert_not_called()
+    apply.assert_not_called()
+    assert sync.SYNC_LOG.read_text().splitlines()[-1].endswith("up to date, nothing to apply")
+
+
+def test_new_remote_commit_is_pulled_and_applied(tmp_path):
+    seed, remote, clone = _clone_with_remote(tmp_path)
+    _sync_real_pull(clone)
+    (seed / "modules" / "zsh" / "config.yml").write_text("stow_dirs: []\n")
+    _commit(seed)
+    subprocess.run(["git", "push", "-q", str(remote), "HEAD"], cwd=seed, check=True)
+
+    ok, pull, apply = _sync_real_pull(clone)
+
+    assert ok
+    pull.assert_called_once()
+    assert apply.call_args.kwargs["modules"] == ["zsh"]
+    assert sync.git_head(clone) == sync.git_head(seed)
+    assert sync.SYNC_LOG.read_text().splitlines()[-1].endswith("applied zsh")
+
+
+def test_remote_head_without_upstream(tmp_path):
+    assert sync.remote_head(_repo(tmp_path)) is None
+
+
+def _touch_all(repo):
+    for name in ("git", "tmux", "zsh"):
+        (repo / "modules" / name / "config.yml").write_text("stow_dirs: []\n")
+    _commit(repo)
+
+
+def _sync_scheduled(repo, modules, ansible_ok=lambda batch: True):
+    with patch("dotm.sync.get_dotfiles_repo", return_value=repo), \
+         patch("dotm.sync.get_excluded_modules", return_value=[]), \
+         patch("dotm.sync.get_deploy_modules", return_value=["git", "tmux", "zsh"]), \
+         patch("dotm.sync.git_pull", return_value=True), \
+         patch("dotm.sync.drifted_modules", return_value=[]), \
+         patch("dotm.sync.list_all_modules", return_value=modules), \
+         patch("dotm.stow.apply_modules", return_value={"conflicts": []}) as native, \
+         patch("dotm.sync.ansible_apply",
+               side_effect=lambda *a, modules, **kw: ansible_ok(modules)) as apply:
+        ok = sync.run_sync(quiet=True)
+    return ok, native, apply
+
+
+def test_stow_only_modules_skip_ansible(tmp_path):
+    repo = _repo(tmp_path)
+    _sync(repo)
+    _touch_all(repo)
+
+    ok, native, apply = _sync_scheduled(repo, _modules(stow_only=("tmux",)))
+
+    assert ok
+    assert native.call_args.args[0] == ["tmux"]
+    assert apply.call_args.kwargs["modules"] == ["git", "zsh"]
+    assert "slowest modules: tmux" in sync.SYNC_LOG.read_text()
+
+
+def test_dependents_of_failed_module_are_skipped_and_retried(tmp_path):
+    repo = _repo(tmp_path)
+    _sync(repo)
+    _touch_all(repo)
+    modules = _modules(depends_on={"zsh": ["git"]})
+
+    ok, _native, apply = _sync_scheduled(repo, modules, ansible_ok=lambda batch: batch != ["git", "tmux"])
+
+    assert not ok
+    assert [c.kwargs["modules"] for c in apply.call_args_list] == [["git", "tmux"]]
+    assert json.loads(sync.SYNC_STATE.read_text())["pending"] == ["git", "tmux", "zsh"]
+    assert "skipped zsh" in sync.SYNC_LOG.read_text()
+
+    ok, _native, apply = _sync_scheduled(repo, modules)
+
+    assert ok
+    assert [c.kwargs["modules"] for c in apply.call_args_list] == [["git", "tmux"], ["zsh"]]
+    assert json.loads(sync.SYNC_STATE.read_text())["pending"] == []
+
+
+def test_dependency_cycle_fails_sync(tmp_path):
+    repo = _repo(tmp_path)
+    _sync(repo)
+    _touch_all(repo)
+
+    ok, _native, apply = _sync_scheduled(repo, _modules(depends_on={"git": ["zsh"], "zsh": ["git"]}))
+
+    assert not ok
+    apply.assert_not_called()
+    assert "cycle: git -> zsh -> git" in sync.SYNC_LOG.read_text()
+
+
+def test_nested_mergeable_file_is_not_drift(tmp_path, monkeypatch):
+    home = tmp_path / "home"
+    monkeypatch.setenv("HOME", str(home))
+    src = home / ".dotmodules" / "git" / "files" / ".config" / "shared" / "env"
+    src.parent.mkdir(parents=True)
+    src.write_text("x\n")
+    (home / ".config" / "shared").mkdir(parents=True)
+    (home / ".config" / "shared" / "env").write_text("merged\n")
+    mods = [{"name": "git", "stow_dirs": ["git"], "mergeable_files": [".config/shared/env"]}]
+
+    with patch("dotm.sync.list_all_modules", return_value=mods):
+        assert sync.drifted_modules(["git"]) == []
+
+
+def test_apply_exception_is_logged_with_module(tmp_path):
+    repo = _repo(tmp_path)
+    _sync(repo)
+    _touch_all(repo)
+
+    def ansible_ok(batch):
+        raise RuntimeError("playbook exploded")
+
+    ok, _native, _apply = _sync_scheduled(repo, _modules(), ansible_ok=ansible_ok)
+
+    assert not ok
+    assert "git, tmux, zsh: RuntimeError('playbook exploded')" in sync.SYNC_LOG.read_text()
+
+
+def test_failed_module_in_ansible_batch_fails_alone(tmp_path):
+    repo = _repo(tmp_path)
+    _sync(repo)
+    _touch_all(repo)
+    batches = []
+
+    def apply(*args, modules, timings, **kwargs):
+        batches.append(modules)
+        ok = "git" not in modules
+        timings.append({"tasks": [], "module_seconds": {}, "failed_modules": [] if ok else ["git"]})
+        return ok
+
+    with patch("dotm.sync.get_dotfiles_repo", return_value=repo), \
+         patch("dotm.sync.get_excluded_modules", return_value=[]), \
+         patch("dotm.sync.get_deploy_modules", return_value=["git", "tmux", "zsh"]), \
+         patch("dotm.sync.git_pull", return_value=True), \
+         patch("dotm.sync.drifted_modules", return_value=[]), \
+         patch("dotm.sync.list_all_modules", return_value=_modules(depends_on={"zsh": ["tmux"]})), \
+         patch("dotm.sync.ansible_apply", side_effect=apply):
+        ok = sync.run_sync(quiet=True)
+
+    assert not ok
+    assert batches == [["git", "tmux"], ["tmux"], ["zsh"]]
+    assert json.loads(sync.SYNC_STATE.read_text())["pending"] == ["git"]
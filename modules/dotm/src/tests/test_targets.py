@@ -0,0 +1,69 @@
+"""Tests for dotm.targets module."""
+
+import json
+from unittest.mock import patch
+
+from dotm import targets
+from dotm.modules import remove_module_symlinks
+
+
+def _fake_dotmodules(home):
+    files = home / ".dotmodules" / "git" / "files"
+    (files / ".config" / "git").mkdir(parents=True)
+    (files / ".gitconfig").write_text("[user]\n")
+    (files / ".config" / "git" / "ignore").write_text("*.swp\n")
+    return files
+
+
+def test_module_targets(tmp_path):
+    home = tmp_path / "home"
+    files = _fake_dotmodules(home)
+    with patch("dotm.targets.Path.home", return_value=home):
+        result = targets.module_targets("git")
+        assert targets.module_targets("missing") == {}
+    assert result == {
+        home / ".gitconfig": (files / ".gitconfig").resolve(),
+        home / ".config" / "git" / "ignore": (files / ".config" / "git" / "ignore").resolve(),
+    }
+
+
+def test_index_persisted_and_reused(tmp_path):
+    home = tmp_path / "home"
+    _fake_dotmodules(home)
+    with patch("dotm.targets.Path.home", return_value=home):
+        targets.build_target_index()
+        data = json.loads(targets.TARGET_INDEX.read_text())
+        assert set(data["modules"]["git"]["files"]) == {".gitconfig", ".config/git/ignore"}
+        with patch("dotm.targets._scan_module") as scan:
+            targets.build_target_index()
+        scan.assert_not_called()
+
+
+def test_index_invalidated_by_dir_mtime(tmp_path):
+    home = tmp_path / "home"
+    files = _fake_dotmodules(home)
+    with patch("dotm.targets.Path.home", return_value=home):
+        targets.build_target_index()
+        (files / ".config" / "git" / "attributes").write_text("* text=auto\n")
+        modules = targets.build_target_index()
+    assert ".config/git/attributes" in modules["git"]["files"]
+
+
+def test_managed_sources(tmp_path):
+    home = tmp_path / "home"
+    files = _fake_dotmodules(home)
+    with patch("dotm.targets.Path.home", return_value=home):
+        assert (files / ".gitconfig").resolve() in targets.managed_sources()
+
+
+def test_remove_module_symlinks_uses_index(tmp_path):
+    home = tmp_path / "home"
+    files = _fake_dotmodules(home)
+    (home / ".gitconfig").symlink_to(files / ".gitconfig")
+    (home / ".config" / "git").mkdir(parents=True)
+    (home / ".config" / "git" / "ignore").write_text("not a link\n")
+    with patch("dotm.targets.Path.home", return_value=home):
+        removed = remove_module_symlinks("git")
+    assert removed == [home / ".gitconfig"]
+    assert not (home / ".gitconfig").exists()
+    assert (home / ".config" / "git" / "ignore").exists()
@@ -3,7 +3,7 @@
 from pathlib import Path
 from unittest.mock import patch
 
-from dotm.verify import verify_module
+from dotm.verify import run_verification, verify_module
 
 
 def _make_module(name, **kwargs):
@@ -23,7 +23,7 @@ def _make_module(name, **kwargs):
 
 def test_verify_packages_all_present():
     mod = _make_module("test", packages=["curl", "git"])
-    with patch("dotm.verify._run", return_value={"curl", "git", "wget"}):
+    with patch("dotm.inventory._run", return_value={"curl", "git", "wget"}):
         checks = verify_module(mod)
     assert all(ok for _, ok, _ in checks)
     assert len(checks) == 2
@@ -31,7 +31,7 @@ def test_verify_packages_all_present():
 
 def test_verify_packages_missing():
     mod = _make_module("test", packages=["curl", "missing-pkg"])
-    with patch("dotm.verify._run", return_value={"curl", "git"}):
+    with patch("dotm.inventory._run", return_value={"curl", "git"}):
         checks = verify_module(mod)
     passed = [c for c in checks if c[1]]
     failed = [c for c in checks if not c[1]]
@@ -42,7 +42,7 @@ def test_verify_packages_missing():
 
 def test_verify_casks():
     mod = _make_module("test", casks=["firefox", "slack"])
-    with patch("dotm.verify._run", return_value={"firefox"}):
+    with patch("dotm.inventory._run", return_value={"firefox"}):
         checks = verify_module(mod)
     passed = [c for c in checks if c[1]]
     failed = [c for c in checks if not c[1]]
@@ -52,7 +52,7 @@ def test_verify_casks():
 
 def test_verify_taps():
     mod = _make_module("test", taps=["homebrew/core", "custom/tap"])
-    with patch("dotm.verify._run", return_value={"homebrew/core"}):
+    with patch("dotm.inventory._run", return_value={"homebrew/core"}):
         checks = verify_module(mod)
     passed = [c for c in checks if c[1]]
     failed = [c for c in checks if not c[1]]
@@ -87,3 +87,24 @@ def test_verify_empty_module():
     mod = _make_module("empty")
     checks = verify_module(mod)
     assert checks == []
+
+
+def test_verify_uses_shared_inventory():
+    mod = _make_module("test", packages=["curl"], casks=["slack"], mas=[123])
+    inventory = {"formulae": {"curl"}, "casks": set(), "mas": {123: "App"}}
+    with patch("dotm.inventory._run") as run:
+        checks = verify_module(mod, inventory)
+    run.assert_not_called()
+    assert dict((name, ok) for name, ok, _ in checks) == {
+        "brew:curl": True, "cask:slack": False, "mas:123": True,
+    }
+
+
+def test_run_verification_gathers_inventory_once():
+    mods = [_make_module("a", packages=["curl"]), _make_module("b", packages=["git"], taps=["x/y"])]
+    with patch("dotm.verify.list_all_modules", return_value=mods), \
+         patch("dotm.verify.get_deploy_modules", return_value=["a", "b"]), \
+         patch("dotm.inventory._run", return_value=["curl", "git"]) as run:
+        results = run_verification()
+    assert run.call_count == 2  # formulae + taps, independent of module count
+    assert all(ok for ok in (c[1] for c in results["a"]))